@@ -0,0 +1,123 @@
+"""
+Checks the precompiled, cached dimension parsers against the original
+row-by-row parsing of stock descriptions and component sizes, then times
+them on a first (cold) and a repeated (warm) pass.
+
+Usage: python -m benchmarks.description_parse_benchmark [repeats]
+"""
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_processing import DescriptionDimensionProcessor, DescriptionParseCache
+from data_processing.constants import STOCK_TO_UNITS_MAP
+from product_profile_calculator import ProductAreaCalculator
+from utils import convert_inches_to_mm
+
+
+def legacy_rod_dimensions(rod_description):
+    """The original rod parser, compiling its patterns on every call"""
+    dimension_string = rod_description
+    units_of_measurement = None
+    for indicator, units in STOCK_TO_UNITS_MAP.items():
+        if indicator.lower() in dimension_string.lower():
+            dimension_string = re.sub(
+                re.escape(indicator), '', dimension_string, flags=re.IGNORECASE
+            ).strip()
+            units_of_measurement = units
+            break
+    if units_of_measurement:
+        dimension_values = re.findall(r'\d+\.?\d*', dimension_string)
+        if dimension_values:
+            return f'{max(map(float, dimension_values))}{units_of_measurement}'
+    return rod_description.strip()
+
+
+def legacy_non_rod_dimensions(dimension_string):
+    """The original sheet and patti parser, applied row by row"""
+    if pd.isna(dimension_string):
+        return [0.0, 0.0]
+    standardized_string = str(dimension_string).strip().replace('\'\'', '"').strip()
+    stored_dimensions = []
+    for value, inch_indicator, _ in re.findall(
+            r'(\d+\.?\d*)\s*(")?\s*(mm|MM)?', standardized_string):
+        value = float(value)
+        if '"' == inch_indicator:
+            value = convert_inches_to_mm(value)
+        stored_dimensions.append(value)
+    largest_dimensions = sorted(stored_dimensions, reverse=True)[:2]
+    return [round(dimension, 2) for dimension in largest_dimensions]
+
+
+def legacy_plate_areas(string):
+    matches = re.findall(r'(\d+(\.\d+)?)\s*[xX]\s*(\d+(\.\d+)?)', string)
+    return [float(match[0]) * float(match[2]) for match in matches]
+
+
+def build_descriptions(seed: int = 0):
+    """Descriptions in the shapes found on the raw stock sheet"""
+    rng = np.random.default_rng(seed)
+    sizes = ['6', '8', '10', '12.5', '19.05', '25', '32']
+    rods = [
+        f'{shape} {size}{unit}' for shape in ['Round Rod', 'Brass Hex Rod', 'SQUARE ROD']
+        for size in sizes for unit in ['', 'mm', ' MM']
+    ]
+    sheets = [
+        f'{first}{unit} x {second}{unit} x {thickness}'
+        for first in ['1', '1.5', '300', '610'] for second in ['2', '1220', '915']
+        for thickness in ['1.6mm', '3 MM', "1/8''"] for unit in ['', '"', 'mm']
+    ]
+    plates = [
+        f'{length} X {width}' + (f' & {width} x {length}' if length > width else '')
+        for length in [10, 12.5, 20, 40] for width in [3, 5, 8.5]
+    ]
+    return rng.choice(rods, 2000), rng.choice(sheets, 2000), rng.choice(plates, 2000)
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rods, sheets, plates = build_descriptions()
+    rods = pd.DataFrame({'Dimensions': np.tile(rods, repeats)})
+    sheets = pd.DataFrame({'Dimensions': np.tile(sheets, repeats)})
+    plates = pd.DataFrame({'Component Sizes': np.tile(plates, repeats)})
+
+    timings = {}
+    start = time.perf_counter()
+    expected_rods = rods['Dimensions'].apply(legacy_rod_dimensions)
+    expected_sheets = sheets['Dimensions'].apply(legacy_non_rod_dimensions)
+    expected_plates = plates['Component Sizes'].apply(legacy_plate_areas)
+    timings['legacy apply'] = time.perf_counter() - start
+
+    parse_cache = DescriptionParseCache()
+    processor = DescriptionDimensionProcessor(parse_cache=parse_cache)
+    area_calculator = ProductAreaCalculator(parse_cache)
+    for name in ['cold cache', 'warm cache']:
+        start = time.perf_counter()
+        parsed_rods = processor.add_rod_dimensions_to_dataframe(rods, 'Dimensions')
+        parsed_sheets = processor.add_non_rod_dimensions_to_dataframe(sheets, 'Dimensions')
+        parsed_plates = area_calculator.calculate_areas_for_rectangular_shapes(
+            {'plate': plates})['plate']
+        timings[name] = time.perf_counter() - start
+
+    pd.testing.assert_series_equal(parsed_rods['Dimensions'], expected_rods)
+    for position, column in enumerate(['Dimension_1', 'Dimension_2']):
+        pd.testing.assert_series_equal(
+            parsed_sheets[column],
+            expected_sheets.apply(lambda x: x[position] if len(x) > position else 0.0),
+            check_names=False, check_exact=True
+        )
+    pd.testing.assert_series_equal(
+        parsed_plates['Rectangular_Area_1'],
+        expected_plates.apply(lambda x: x[0] if x else None),
+        check_names=False, check_exact=True
+    )
+    print(f'{len(rods) + len(sheets) + len(plates)} descriptions, outputs identical')
+    print({name: round(seconds, 4) for name, seconds in timings.items()})
+    print(parse_cache.stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Measures the peak resident memory of a full requirements run on a
+synthetic catalogue, with and without pandas copy-on-write.
+
+Each mode runs in a fresh interpreter, so that one run's high-water mark
+does not hide the other's. The inputs are generated once and shared by
+every run. Peak RSS is the process high-water mark; the pipeline's own
+share is the growth over the mark reached after loading the inputs.
+Bytes per order line are those of the prepared order lines, strings included.
+
+Usage: python -m benchmarks.memory_benchmark [--skus 100000]
+       [--order-lines 100000] [--stock-rows 1000] [--seed 0]
+       [--output memory_benchmark.json]
+"""
+import argparse
+import json
+import os
+import pickle
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict
+
+import pandas as pd
+
+from benchmarks.pipeline_benchmark import describe_version
+from benchmarks.synthetic_data import build_synthetic_inputs
+
+INPUTS_FILE = 'inputs.pkl'
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2 ** 20 if 'darwin' == sys.platform else 2 ** 10), 1)
+
+
+def run_worker(directory: str, copy_on_write: bool) -> Dict:
+    """Runs the pipeline once in this process and measures it"""
+    pd.set_option('mode.copy_on_write', copy_on_write)
+    # Imported here, so the parent process never loads the pipeline
+    from inventory_calculation import BrassStockRequirementsSummary
+    with open(os.path.join(directory, INPUTS_FILE), 'rb') as inputs_file:
+        config, live_sheets = pickle.load(inputs_file)
+    loaded_rss_mb = peak_rss_mb()
+    start = time.perf_counter()
+    summary = BrassStockRequirementsSummary(config, live_sheets)
+    total_requirements = summary.total_requirements
+    items_df = summary.items_df
+    return {
+        'copy_on_write': copy_on_write,
+        'seconds': round(time.perf_counter() - start, 3),
+        'loaded_rss_mb': loaded_rss_mb,
+        'peak_rss_mb': peak_rss_mb(),
+        'pipeline_rss_mb': round(peak_rss_mb() - loaded_rss_mb, 1),
+        'bytes_per_order_line': round(
+            items_df.memory_usage(deep=True).sum() / max(len(items_df), 1), 1),
+        'stock_types': len(total_requirements),
+    }
+
+
+def run_mode(directory: str, copy_on_write: bool) -> Dict:
+    completed = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.memory_benchmark', '--worker', directory]
+        + (['--copy-on-write'] if copy_on_write else []),
+        capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f'Benchmark run failed:\n{completed.stderr}')
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare peak memory of the pipeline with and without copy-on-write')
+    parser.add_argument('--skus', type=int, default=100_000)
+    parser.add_argument('--order-lines', type=int, default=100_000)
+    parser.add_argument('--stock-rows', type=int, default=1_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='memory_benchmark.json')
+    parser.add_argument('--worker', metavar='DIRECTORY', help=argparse.SUPPRESS)
+    parser.add_argument('--copy-on-write', action='store_true', help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+
+    if arguments.worker:
+        print(json.dumps(run_worker(arguments.worker, arguments.copy_on_write)))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        inputs = build_synthetic_inputs(
+            directory, arguments.skus, arguments.order_lines,
+            arguments.stock_rows, arguments.seed)
+        with open(os.path.join(directory, INPUTS_FILE), 'wb') as inputs_file:
+            pickle.dump(inputs, inputs_file)
+        # The first run fills the workbook cache, so both modes read it
+        run_mode(directory, copy_on_write=False)
+        runs = [run_mode(directory, copy_on_write) for copy_on_write in (False, True)]
+    results = {
+        'version': describe_version(),
+        'skus': arguments.skus,
+        'order_lines': arguments.order_lines,
+        'stock_rows': arguments.stock_rows,
+        'runs': runs,
+    }
+    for run in runs:
+        print(f"copy-on-write {'on ' if run['copy_on_write'] else 'off'}: "
+              f"peak RSS {run['peak_rss_mb']} MB, pipeline {run['pipeline_rss_mb']} MB, "
+              f"{run['bytes_per_order_line']} B per order line, {run['seconds']}s")
+    with open(arguments.output, 'w') as json_file:
+        json.dump(results, json_file, indent=2)
+    print(f'Results written to {arguments.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""
+Times and memory-profiles every stage of the requirements pipeline on
+synthetic inputs at several scales, writing the results to JSON so that
+runs of different versions can be compared.
+
+A scale is the number of order lines; the catalogue has a tenth as many
+SKUs and the stock sheet a hundredth as many rows. Peak memory is
+measured with tracemalloc, which slows the stages down; pass
+--no-memory for timings only.
+
+Usage: python -m benchmarks.pipeline_benchmark [--scales 1k 10k 100k]
+       [--output pipeline_benchmark.json] [--seed 0] [--no-memory]
+"""
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_data import build_synthetic_inputs
+from data_modeling.products.product_manufacturing_data import DimensionUpdater
+from data_modeling.raw_materials import BrassStockModeler
+from inventory_calculation import BrassStockRequirementsSummary, DataPreparer
+from product_profile_calculator import (
+    ProductComponents, ProfileCalculator, finalize_component_table
+)
+
+
+class StagedRequirementsSummary(BrassStockRequirementsSummary):
+    """A summary whose steps are left for the benchmark to run one by one"""
+    def __init__(self, data_preparer: DataPreparer, component_table: pd.DataFrame) -> None:
+        self.data_preparer = data_preparer
+        self.items_df = data_preparer.products_dataframe
+        self.component_table = component_table
+
+
+def parse_scale(scale: str) -> int:
+    multipliers = {'k': 1_000, 'm': 1_000_000}
+    suffix = scale[-1].lower()
+    if suffix in multipliers:
+        return int(float(scale[:-1]) * multipliers[suffix])
+    return int(scale)
+
+
+def count_rows(result: Any) -> int:
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, dict):
+        return sum(count_rows(value) for value in result.values())
+    if isinstance(result, (list, tuple)):
+        return sum(count_rows(value) for value in result)
+    return 0
+
+
+def run_stage(
+    stage: Callable[[], Any], measure_memory: bool
+) -> tuple:
+    if measure_memory:
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = stage()
+    measurement = {'seconds': round(time.perf_counter() - start, 4)}
+    if measure_memory:
+        peak = tracemalloc.get_traced_memory()[1] - start_memory
+        measurement['peak_memory_mb'] = round(peak / 2 ** 20, 2)
+    measurement['rows'] = count_rows(result)
+    return result, measurement
+
+
+def benchmark_pipeline(config, live_sheets, measure_memory: bool = True) -> Dict:
+    """Runs the pipeline stage by stage, measuring each stage"""
+    profile_calculator = ProfileCalculator(config, live_sheets)
+    summary = None
+    stages: Dict[str, Dict] = {}
+
+    def clean_sheets():
+        data_preparer = DataPreparer(live_sheets)
+        stock_modeler = BrassStockModeler(live_sheets)
+        # Both build their frames on first access
+        data_preparer.products_dataframe
+        stock_modeler.inventory_dict
+        return data_preparer, stock_modeler
+
+    def categorize():
+        dimension_updater = DimensionUpdater(config)
+        dimension_updater.update_dimensions_with_hardcoded_data()
+        return dimension_updater.product_engineering_categories
+
+    def aggregate():
+        summary.aggregated_results = summary.aggregate_volumes()
+        summary.stacked_dataframe = summary.stack_columns()
+        return summary.find_total_requirements()
+
+    if measure_memory:
+        tracemalloc.start()
+    try:
+        (data_preparer, stock_modeler), stages['sheet cleaning'] = run_stage(
+            clean_sheets, measure_memory)
+        stages['sheet cleaning']['rows'] = (
+            len(data_preparer.products_dataframe)
+            + len(stock_modeler.raw_stock_available))
+        categories, stages['categorization'] = run_stage(categorize, measure_memory)
+        (products, components), stages['area parsing'] = run_stage(
+            lambda: profile_calculator.calculate_component_areas(categories),
+            measure_memory)
+        matched_components, stages['source linking'] = run_stage(
+            lambda: profile_calculator.source_linker.match_components(
+                components, stock_modeler.inventory_dict),
+            measure_memory)
+        component_volumes, stages['volume calculation'] = run_stage(
+            lambda: profile_calculator.volume_calculator.calculate_volumes(
+                matched_components, products),
+            measure_memory)
+        component_table, stages['component table'] = run_stage(
+            lambda: finalize_component_table(
+                ProductComponents(products, component_volumes)),
+            measure_memory)
+        summary = StagedRequirementsSummary(data_preparer, component_table)
+        _, stages['aggregation'] = run_stage(aggregate, measure_memory)
+    finally:
+        if measure_memory:
+            tracemalloc.stop()
+    return stages
+
+
+def describe_version() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the requirements pipeline on synthetic inputs')
+    parser.add_argument('--scales', nargs='+', default=['1k', '10k', '100k'])
+    parser.add_argument('--output', default='pipeline_benchmark.json')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true')
+    arguments = parser.parse_args()
+
+    results = {
+        'version': describe_version(),
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'memory_profiled': not arguments.no_memory,
+        'runs': [],
+    }
+    for scale in arguments.scales:
+        order_lines = parse_scale(scale)
+        skus = max(order_lines // 10, 100)
+        stock_rows = max(order_lines // 100, 50)
+        with tempfile.TemporaryDirectory() as directory:
+            config, live_sheets = build_synthetic_inputs(
+                directory, skus, order_lines, stock_rows, arguments.seed)
+            stages = benchmark_pipeline(
+                config, live_sheets, measure_memory=not arguments.no_memory)
+        total_seconds = round(sum(stage['seconds'] for stage in stages.values()), 4)
+        results['runs'].append({
+            'scale': scale,
+            'order_lines': order_lines,
+            'skus': skus,
+            'stock_rows': stock_rows,
+            'total_seconds': total_seconds,
+            'stages': stages,
+        })
+        print(f'{scale}: {order_lines} order lines, {skus} SKUs, '
+              f'{stock_rows} stock rows, {total_seconds}s')
+        for name, stage in stages.items():
+            print(f'    {name:<20}', stage)
+    with open(arguments.output, 'w') as json_file:
+        json.dump(results, json_file, indent=2)
+    print(f'Results written to {arguments.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Checks remove_textures, its memo and remove_textures_series against the
+original implementation on a corpus of item codes, then times them.
+tests/test_remove_textures.py holds the golden corpus they must match.
+
+Usage: python -m benchmarks.remove_textures_benchmark [repeats]
+"""
+import re
+import sys
+import time
+
+import pandas as pd
+
+from utils import remove_textures, remove_textures_series, remove_textures_cache_stats
+
+
+def legacy_remove_textures(product):
+    """The original implementation, compiling its pattern on every call"""
+    string = str(product).replace('\'\'', '"').replace('-', '')
+    string = re.sub(r'(LH|RH)$', '', string, flags=re.IGNORECASE)
+    textures = 'LH|RH|KH|RT|H|K|B|R|T|HR|HL|ES|S|RR|RL|HO|HI|HA|NL|L'
+    pattern = re.compile(rf'(\d+)({textures})(?=\.\d+|$)', re.IGNORECASE)
+    string = pattern.sub(r'\1', string)
+    return string.lower()
+
+
+def build_corpus():
+    """Item codes in the shapes found on the SOL and SEA order sheets"""
+    corpus = [
+        'DP173', 'DP173RH', 'DP173-LH', "AP12''", 'BTB-400K', 'TE55S.1',
+        'HK12HR.25', 'KN-9L', '12RR', 'DP173 RH', "9''L", 'D12ES', '12NL.5X',
+        None, float('nan'), 5, 5.0, '',
+    ]
+    textures = ['', 'LH', 'RH', 'KH', 'RT', 'H', 'K', 'B', 'R', 'T', 'HR', 'HL',
+                'ES', 'S', 'RR', 'RL', 'HO', 'HI', 'HA', 'NL', 'L', 'Q']
+    for prefix in ['DP', 'AP', 'BP', 'BTB', 'TE', 'kn', '']:
+        for number in ['1', '12', '173', '2040']:
+            for texture in textures:
+                for suffix in ['', '.1', '.25', '-X', '.']:
+                    corpus.append(f'{prefix}{number}{texture}{suffix}')
+    return corpus
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    corpus = build_corpus()
+    expected = [legacy_remove_textures(product) for product in corpus]
+    if [remove_textures(product) for product in corpus] != expected:
+        raise AssertionError('remove_textures differs from the original')
+    if remove_textures_series(pd.Series(corpus)).tolist() != expected:
+        raise AssertionError('remove_textures_series differs from the original')
+    # Order sheets repeat the same codes many times
+    products = pd.Series(corpus * repeats)
+    timings = {}
+    start = time.perf_counter()
+    products.apply(legacy_remove_textures)
+    timings['legacy apply'] = time.perf_counter() - start
+    start = time.perf_counter()
+    products.apply(remove_textures)
+    timings['memoized apply'] = time.perf_counter() - start
+    start = time.perf_counter()
+    remove_textures_series(products)
+    timings['series'] = time.perf_counter() - start
+    print(f'{len(products)} codes, {len(corpus)} distinct, outputs identical')
+    print({name: round(seconds, 4) for name, seconds in timings.items()})
+    print(remove_textures_cache_stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Measures worksheet fetching latency against a fake spreadsheet
+with a simulated per-request delay.
+
+Usage: python -m benchmarks.sheet_fetch_benchmark [call_delay_seconds]
+"""
+import sys
+import time
+from typing import Dict, List
+
+from data_processing import GoogleSheetsClient
+from data_processing.constants import PIPELINE_SHEET_TITLES
+from tests.support import FakeSpreadsheet
+
+
+def build_fake_sheets(
+    extra_tabs: int = 12, rows: int = 200
+) -> Dict[str, List[List[str]]]:
+    """Builds the pipeline tabs plus a number of tabs it never reads"""
+    titles = PIPELINE_SHEET_TITLES + [f'UNUSED TAB {i}' for i in range(extra_tabs)]
+    return {
+        title: [['A', 'B', 'C']] + [[str(i), str(i * 2), ''] for i in range(rows)]
+        for title in titles
+    }
+
+
+def time_fetch(call_delay: float, **client_options) -> Dict[str, float]:
+    spreadsheet = FakeSpreadsheet(build_fake_sheets(), call_delay=call_delay)
+    start = time.perf_counter()
+    GoogleSheetsClient({}, spreadsheet=spreadsheet, **client_options)
+    return {
+        'seconds': round(time.perf_counter() - start, 4),
+        'requests': spreadsheet.calls,
+        'max_concurrent_requests': spreadsheet.max_concurrent_calls,
+    }
+
+
+def main():
+    call_delay = float(sys.argv[1]) if len(sys.argv) > 1 else 0.2
+    scenarios = {
+        'all tabs, serial': {},
+        'declared tabs, threads': {
+            'sheet_titles': PIPELINE_SHEET_TITLES, 'fetch_mode': 'threads'
+        },
+        'declared tabs, batch': {
+            'sheet_titles': PIPELINE_SHEET_TITLES, 'fetch_mode': 'batch'
+        },
+    }
+    for name, options in scenarios.items():
+        print(f'{name:<24}', time_fetch(call_delay, **options))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Compares the rod top areas and the stock volumes of BrassStockModeler
+against the original row-wise applies, checking the outputs match and
+timing both.
+
+Usage: python -m benchmarks.stock_inventory_benchmark [stock_rows]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_data import generate_raw_stock_sheet
+from data_modeling.raw_materials import BrassStockModeler
+from utils import calculate_rod_top_area, calculate_rod_top_areas, calculate_volume_from_weight
+
+
+def legacy_stock_columns(rod_inventory: pd.DataFrame, sheet_patti_inventory: pd.DataFrame):
+    """The original per-row callbacks"""
+    top_areas = rod_inventory.apply(
+        lambda x: calculate_rod_top_area(x['Stock Type'], x['Dimensions']), axis=1)
+    rod_volumes = rod_inventory['Current Stock (kg)'].apply(calculate_volume_from_weight)
+    sheet_volumes = sheet_patti_inventory['Current Stock (kg)'].apply(
+        calculate_volume_from_weight)
+    return top_areas.to_numpy(), rod_volumes.to_numpy(), sheet_volumes.to_numpy()
+
+
+def vectorized_stock_columns(rod_inventory: pd.DataFrame, sheet_patti_inventory: pd.DataFrame):
+    top_areas = calculate_rod_top_areas(
+        rod_inventory['Stock Type'], rod_inventory['Dimensions'])
+    rod_volumes = calculate_volume_from_weight(rod_inventory['Current Stock (kg)'])
+    sheet_volumes = calculate_volume_from_weight(
+        sheet_patti_inventory['Current Stock (kg)'])
+    return top_areas, rod_volumes.to_numpy(), sheet_volumes.to_numpy()
+
+
+def main():
+    stock_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    live_sheets = {
+        'RAW MATERIALS MAIN ORDERS': generate_raw_stock_sheet(
+            stock_rows, np.random.default_rng(0))
+    }
+    brass_stock_modeler = BrassStockModeler(live_sheets)
+    inventory_dict = brass_stock_modeler.inventory_dict
+    inventories = (inventory_dict['Rods'], inventory_dict['Patti_Sheets'])
+    timings = {}
+    results = {}
+    for name, stock_columns in [
+        ('legacy', legacy_stock_columns), ('vectorized', vectorized_stock_columns)
+    ]:
+        start = time.perf_counter()
+        results[name] = stock_columns(*inventories)
+        timings[name] = round(time.perf_counter() - start, 4)
+    # Python's float power and NumPy's square can differ in the last bit
+    for legacy, vectorized in zip(results['legacy'], results['vectorized']):
+        np.testing.assert_allclose(vectorized, legacy, rtol=1e-15)
+    print(f'{len(inventories[0])} rods, {len(inventories[1])} sheets and patti: {timings}, '
+          f'{timings["legacy"] / max(timings["vectorized"], 1e-9):.0f}x')
+
+
+if __name__ == '__main__':
+    main()
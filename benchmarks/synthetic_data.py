@@ -0,0 +1,192 @@
+"""
+Synthetic stand-ins for every input of the pipeline: the two order
+sheets, the raw stock sheet, the reference workbooks and the hardcoded
+dimensions, sized by SKU count, order lines and stock rows.
+"""
+import json
+import os
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+PRODUCT_PREFIXES = ['DP', 'AP', 'BP', 'BTB', 'TE', 'KN', 'HK', 'CH', 'MH']
+TEXTURE_SUFFIXES = ['', '', 'RH', 'LH', 'K', 'B', '-B', 'S', '.1', 'HR']
+
+
+def _diameter(rng: np.random.Generator) -> str:
+    return str(rng.choice([6, 8, 10, 12, 16, 19, 22, 25, 32, 40]))
+
+
+def _plate(rng: np.random.Generator, separator: str = 'X') -> str:
+    return f'{rng.integers(10, 80)} {separator} {rng.choice([3, 4, 5, 6, 8, 10])}'
+
+
+# One generator per engineering category, covering the notations in the workbooks
+SIZE_GENERATORS: Dict[str, Callable[[np.random.Generator], str]] = {
+    'round_rod': lambda rng: f'{_diameter(rng)} Dia',
+    'plate': lambda rng: _plate(rng, rng.choice(['X', 'x'])),
+    'square_rod': lambda rng: f'{rng.choice([8, 10, 12, 16, 20])} Sq',
+    'scrap': lambda rng: 'Scrap',
+    'ring_pull_stock': lambda rng: (
+        f'{_diameter(rng)} Dia & {_plate(rng)} & {_plate(rng, "x")}'),
+    'round_rect_single_rods_stock': lambda rng: f'{_diameter(rng)} Dia & {_plate(rng)}',
+    'pipe_composite_stock': lambda rng: (
+        f'{_diameter(rng)} Dia Pipe & {_diameter(rng)} Dia'),
+    'three_distinct_round_rods': lambda rng: (
+        f'{_diameter(rng)} Dia & {_diameter(rng)} Dia & {_diameter(rng)} Dia'),
+    'two_distinct_round_rods': lambda rng: f'{_diameter(rng)} Dia & {_diameter(rng)} Dia',
+    'round_square_single_rods_stock': lambda rng: (
+        f'{_diameter(rng)} Dia & {rng.choice([8, 10, 12])} Sq'),
+    'two_rectangular_plates': lambda rng: f'{_plate(rng)} Rect & {_plate(rng)} Rect',
+    'metal_sheet': lambda rng: f'Sheet {rng.choice(["1.6", "2", "3"])} & {_plate(rng)}',
+}
+# Roughly how often each category shows up in the catalogue
+SIZE_WEIGHTS = np.array([30, 20, 8, 3, 4, 6, 4, 3, 8, 4, 3, 7], dtype=float)
+
+
+def generate_product_codes(skus: int) -> List[str]:
+    return [
+        f'{PRODUCT_PREFIXES[i % len(PRODUCT_PREFIXES)]}{1000 + i}' for i in range(skus)
+    ]
+
+
+def generate_component_sizes(count: int, rng: np.random.Generator) -> List[str]:
+    categories = rng.choice(
+        list(SIZE_GENERATORS), count, p=SIZE_WEIGHTS / SIZE_WEIGHTS.sum())
+    return [SIZE_GENERATORS[category](rng) for category in categories]
+
+
+def generate_reference_workbooks(
+    directory: str, product_codes: List[str], rng: np.random.Generator,
+    ordered_sheets: int = 3
+) -> Tuple[str, str]:
+    """
+    Writes the regular items workbook and the ordered items workbook,
+    whose item names carry texture suffixes and span several sheets
+
+    Returns:
+    - Tuple[str, str]: Paths of the regular and ordered items workbooks
+    """
+    regular_codes = product_codes[:len(product_codes) // 2]
+    ordered_codes = product_codes[len(product_codes) // 2:]
+    regular_items = pd.DataFrame({
+        'ITEM': regular_codes,
+        'WORK METHOD': rng.choice(['CUT', 'CNC', 'FORGED'], len(regular_codes)),
+        'MATERIALS SIZES(MM)': generate_component_sizes(len(regular_codes), rng),
+        'Top Dim (mm)': rng.integers(5, 60, len(regular_codes)).astype(float),
+        'Length Dim (mm)': rng.integers(10, 300, len(regular_codes)).astype(float),
+    })
+    regular_path = os.path.join(directory, 'regular_items.xlsx')
+    regular_items.to_excel(regular_path, index=False)
+
+    ordered_path = os.path.join(directory, 'ordered_items.xlsx')
+    with pd.ExcelWriter(ordered_path) as writer:
+        for sheet, codes in enumerate(np.array_split(ordered_codes, ordered_sheets)):
+            pd.DataFrame({
+                'ITEM NAME': [code + rng.choice(TEXTURE_SUFFIXES) for code in codes],
+                'QTY': rng.integers(1, 9, len(codes)),
+                'WORK METHODE': rng.choice(['CAST', 'CUT'], len(codes)),
+                'MATERIALS SIZES(MM)': generate_component_sizes(len(codes), rng),
+            }).to_excel(writer, sheet_name=f'ORDER {sheet + 1}', index=False)
+    return regular_path, ordered_path
+
+
+def generate_hardcoded_dimensions(
+    path: str, product_codes: List[str], rng: np.random.Generator,
+    share: float = 0.05
+) -> str:
+    """Writes dimensions that override the workbook for a share of the products"""
+    # Each product is overridden at most once, as in the real file
+    overrides = rng.choice(
+        product_codes, max(1, int(len(product_codes) * share)), replace=False)
+    loaded_data: Dict[str, list] = {}
+    for code in overrides:
+        category = rng.choice(['round_rod', 'plate', 'square_rod', 'metal_sheet'])
+        loaded_data.setdefault(category, []).append(
+            [code, float(rng.integers(5, 60)), float(rng.integers(10, 300))])
+    with open(path, 'w') as json_file:
+        json.dump(loaded_data, json_file)
+    return path
+
+
+def generate_order_sheet(
+    product_codes: List[str], order_lines: int, item_column: str,
+    rng: np.random.Generator
+) -> pd.DataFrame:
+    """An order sheet as fetched from Google Sheets: text cells, some lines closed"""
+    return pd.DataFrame({
+        'P.O': rng.integers(1000, 1000 + max(order_lines // 20, 1), order_lines).astype(str),
+        item_column: [
+            code + suffix for code, suffix in zip(
+                rng.choice(product_codes, order_lines),
+                rng.choice(TEXTURE_SUFFIXES, order_lines))
+        ],
+        'FINISH': rng.choice(['PVD', 'ANTIQUE', 'SATIN', 'POLISHED'], order_lines),
+        'QTY': rng.integers(1, 500, order_lines).astype(str),
+        'UNIT': 'PCS',
+        'P.O DATE': '2024-01-01',
+        'STATUS': rng.choice(['', '', '', 'DISPATCHED'], order_lines),
+        'TRACKING': rng.choice(['', '', 'SHIPPED'], order_lines),
+    })
+
+
+def generate_raw_stock_sheet(stock_rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """
+    The raw stock sheet with its offset layout: the real header is the
+    first row and the first column is blank
+    """
+    descriptions = []
+    for i in range(stock_rows):
+        stock_type = i % 5
+        if 0 == stock_type:
+            descriptions.append(f'Round Rod {rng.integers(4, 60)}mm')
+        elif 1 == stock_type:
+            descriptions.append(f'Hex Rod {rng.integers(4, 40)}')
+        elif 2 == stock_type:
+            descriptions.append(f'Square Rod {rng.integers(4, 40)}mm')
+        elif 3 == stock_type:
+            descriptions.append(
+                f'Brass Patti {rng.integers(10, 80)} x {rng.integers(2, 12)}mm')
+        else:
+            descriptions.append(
+                f'Brass Sheet 48" x 14" x {rng.choice(["1.6", "2", "3"])}mm')
+    return pd.DataFrame({
+        '': [''] * (stock_rows + 1),
+        'STOCK': ['ROUND ROD'] + descriptions,
+        'WEIGHT': ['Closing Wt.'] + [str(w) for w in rng.integers(0, 500, stock_rows)],
+        'MINIMUM': ['Minimum Stock in KGs'] + list(
+            rng.choice(['-', '5', '10', '25'], stock_rows)),
+    })
+
+
+def build_synthetic_inputs(
+    directory: str, skus: int, order_lines: int, stock_rows: int, seed: int = 0
+) -> Tuple[Dict[str, str], Dict[str, pd.DataFrame]]:
+    """
+    Generates every pipeline input, writing the files into 'directory'
+
+    Returns:
+    - Tuple[dict, dict]: The config and the live sheets
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    product_codes = generate_product_codes(skus)
+    regular_path, ordered_path = generate_reference_workbooks(
+        directory, product_codes, rng)
+    hardcoded_path = generate_hardcoded_dimensions(
+        os.path.join(directory, 'hardcoded_dimensions.json'), product_codes, rng)
+    config = {
+        'ORDERED_ITEMS_MATERIAL_REQUIREMENTS_PATH': ordered_path,
+        'REGULAR_ITEMS_MATERIAL_REQUIREMENTS_PATH': regular_path,
+        'HARDCODED_DATA_FILEPATH': hardcoded_path,
+        'WORKBOOK_CACHE_DIR': os.path.join(directory, 'workbook_cache'),
+    }
+    live_sheets = {
+        'SOL NEW CONSOLIDATED': generate_order_sheet(
+            product_codes, order_lines // 2, 'ITEM CODE', rng),
+        'SEA ORDERS': generate_order_sheet(
+            product_codes, order_lines - order_lines // 2, 'ITEM NAME', rng),
+        'RAW MATERIALS MAIN ORDERS': generate_raw_stock_sheet(stock_rows, rng),
+    }
+    return config, live_sheets
@@ -0,0 +1,50 @@
+"""
+Compares the volume totals of the component table against the original
+row-by-row tally of requirements onto wide order lines, checking the
+totals match and timing both. tests/test_requirements_tally.py runs the
+same comparison on small inputs.
+
+Usage: python -m benchmarks.tally_benchmark [order_lines] [products]
+"""
+import sys
+import time
+from typing import Dict, List
+
+import pandas as pd
+
+from product_profile_calculator import join_order_lines
+from tests.support.legacy_tally import (
+    GROUP_COLUMNS, build_tally_inputs, legacy_volume_totals, tabulate_requirement_frames
+)
+
+
+def component_volume_totals(
+    items_df: pd.DataFrame, requirement_frames: List[pd.DataFrame]
+) -> pd.DataFrame:
+    component_table = tabulate_requirement_frames(dict(enumerate(requirement_frames)))
+    line_volumes = join_order_lines(component_table, items_df).astype(
+        {column: str for column in GROUP_COLUMNS})
+    return line_volumes.groupby(GROUP_COLUMNS)['Volume'].sum().reset_index()
+
+
+def main():
+    order_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    products = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    items_df, requirement_frames = build_tally_inputs(order_lines, products)
+    timings = {}
+    results: Dict[str, pd.DataFrame] = {}
+    for name, volume_totals in [
+        ('legacy', legacy_volume_totals),
+        ('component table', component_volume_totals),
+    ]:
+        start = time.perf_counter()
+        totals = volume_totals(items_df, requirement_frames)
+        timings[name] = round(time.perf_counter() - start, 4)
+        # The wide lines also carry empty families, which add up to nothing
+        results[name] = totals[totals['Volume'] != 0].reset_index(drop=True)
+    pd.testing.assert_frame_equal(results['legacy'], results['component table'])
+    print(f'{order_lines} order lines, {products} products: {timings}')
+
+
+if __name__ == '__main__':
+    main()
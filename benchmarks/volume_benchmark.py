@@ -0,0 +1,142 @@
+"""
+Compares the volume post-processing (the BTB, TE and DP/AP/BP
+multipliers and the sheet volumes) against the original row-by-row
+implementations, function by function, checking the outputs are
+bit-identical and timing both.
+
+Usage: python -m benchmarks.volume_benchmark [products]
+"""
+import sys
+import time
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_data import PRODUCT_PREFIXES
+from product_profile_calculator import ProductAreaCalculator, ProductVolumeCalculator
+from utils import get_column_by_keyword
+
+
+def legacy_adjust_volume_for_posts(
+    dataframe: pd.DataFrame, volume_column: str
+) -> pd.DataFrame:
+    df = dataframe.copy()
+    item_column = get_column_by_keyword(df, 'item')
+    df[volume_column] = np.where(
+        df[item_column].str.contains('DP|AP|BP'),
+        df[volume_column] * 2, df[volume_column]
+    )
+    return df
+
+
+def legacy_adjust_volume_for_btb_products(
+    dataframe: pd.DataFrame, item_column: str
+) -> pd.DataFrame:
+    for col in dataframe.columns:
+        if col.endswith('Volume'):
+            dataframe[col] = dataframe.apply(
+                lambda x: x[col] * 2 if 'BTB' in x[item_column] else x[col], axis=1
+            )
+    return dataframe
+
+
+def legacy_volume_multipliers(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """The original posts adjustment of a cylinder followed by the BTB pass"""
+    df = legacy_adjust_volume_for_posts(dataframe, 'Cylinder_1_Volume')
+    return legacy_adjust_volume_for_btb_products(df, 'ITEM')
+
+
+def legacy_calculate_sheet_volume(
+    area_calculator: ProductAreaCalculator, dataframe: pd.DataFrame
+) -> pd.DataFrame:
+    """The original sheet volumes: five row-wise applies"""
+    df = dataframe.copy()
+    item_column = get_column_by_keyword(df, 'item')
+    areas = df.apply(
+        lambda row: area_calculator.parse_areas_for_flush_pulls(
+            row['Component Sizes'], row['Length Dim (mm)']
+        ), axis=1
+    )
+    df['Top_Area'], df['Side_Area'] = zip(*areas)
+    df['Front_Plate_Area'] = df.apply(area_calculator.calculate_front_plate_area, axis=1)
+    df['Back_Plate_Area'] = df.apply(area_calculator.calculate_back_plate_area, axis=1)
+    thickness_multiplier = df['Component Sizes'].apply(lambda x: 1.6 if '1.6' in x else 3)
+    df['Sheet_Volume'] = (
+        (df['Top_Area'] + df['Side_Area']
+            + df['Front_Plate_Area'] + df['Back_Plate_Area']
+         ) * thickness_multiplier
+    )
+    if item_column:
+        df['Sheet_Volume'] = df.apply(
+            lambda x: x['Sheet_Volume'] * 2 if 'TE' in x[item_column]
+            else x['Sheet_Volume'], axis=1
+        )
+    df['Matched_FirstCol'] = 'Brass Sheet'
+    df['Matched_SecondCol'] = df.apply(
+        lambda row: 'BRASS SHEET 1.6MM (48"X14"X1.6MM)' if '1.6' in row['Component Sizes']
+        else 'BRASS SHEET 3MM', axis=1
+    )
+    return df
+
+
+def build_items(products: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    prefixes = rng.choice(PRODUCT_PREFIXES + ['BTB-DP', 'TE-BTB'], products)
+    thickness = rng.choice(['1.6', '2', '3'], products)
+    flush_pulls = rng.choice(['', ' & 40 X 6', ' & 25 x 10'], products)
+    return pd.DataFrame({
+        'ITEM': [f'{prefix}{1000 + i}' for i, prefix in enumerate(prefixes)],
+        'Component Sizes': [
+            f'Sheet {size}{pull}' for size, pull in zip(thickness, flush_pulls)],
+        'Top Dim (mm)': rng.choice([np.nan, 10.0, 12.5, 40.0], products),
+        'Length Dim (mm)': rng.uniform(20, 300, products).round(1),
+        'Cylinder_1_Volume': rng.uniform(100, 5000, products),
+        'Cylinder_2_Volume': rng.choice([np.nan, 250.0, 1200.5], products),
+    })
+
+
+def compare(
+    name: str, legacy: Callable[[], pd.DataFrame], vectorized: Callable[[], pd.DataFrame]
+) -> Dict[str, float]:
+    timings = {}
+    results = {}
+    for label, function in [('legacy', legacy), ('vectorized', vectorized)]:
+        start = time.perf_counter()
+        results[label] = function()
+        timings[label] = round(time.perf_counter() - start, 4)
+    pd.testing.assert_frame_equal(
+        results['legacy'], results['vectorized'], check_exact=True)
+    print(f'{name}: {timings}, {timings["legacy"] / max(timings["vectorized"], 1e-9):.0f}x')
+    return timings
+
+
+def main():
+    products = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    items_df = build_items(products)
+    area_calculator = ProductAreaCalculator()
+    volume_calculator = ProductVolumeCalculator(area_calculator)
+    print(f'{products} products')
+    compare(
+        'volume multipliers',
+        lambda: legacy_volume_multipliers(items_df),
+        lambda: volume_calculator.apply_volume_multipliers(
+            items_df.copy(), 'ITEM', ['Cylinder_1_Volume']),
+    )
+    compare(
+        'sheet volume',
+        lambda: legacy_calculate_sheet_volume(area_calculator, items_df),
+        lambda: volume_calculator.calculate_sheet_volume(items_df),
+    )
+    # Without a single flush pull or thin sheet, the areas stay integers
+    plain_sheets = items_df.assign(**{
+        'Component Sizes': 'Sheet 3', 'Top Dim (mm)': 10, 'Length Dim (mm)': 100})
+    compare(
+        'sheet volume, integer dimensions',
+        lambda: legacy_calculate_sheet_volume(area_calculator, plain_sheets),
+        lambda: volume_calculator.calculate_sheet_volume(plain_sheets),
+    )
+
+
+if __name__ == '__main__':
+    main()
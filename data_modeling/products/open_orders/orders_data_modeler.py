@@ -1,13 +1,24 @@
 import pandas as pd
 
 from data_modeling.base import BaseDataModeler
+from data_processing.column_schema import apply_compact_schema
 
 
 class OrdersDataModeler(BaseDataModeler):
     def __init__(self, live_sheets):
         super().__init__(live_sheets)
-        self.orders_dataframe = None
-        self.load_data_frame()
+        self._orders_dataframe = None
+
+    @property
+    def orders_dataframe(self) -> pd.DataFrame:
+        """The open SOL and SEA orders, loaded the first time they are needed"""
+        if self._orders_dataframe is None:
+            self.load_data_frame()
+        return self._orders_dataframe
+
+    @orders_dataframe.setter
+    def orders_dataframe(self, orders_dataframe: pd.DataFrame):
+        self._orders_dataframe = orders_dataframe
 
     def load_data_frame(self):
         """
@@ -34,9 +45,9 @@ class OrdersDataModeler(BaseDataModeler):
             rename_columns={'ITEM NAME': 'ITEM'}
         )
         
-        self.orders_dataframe = pd.concat(
+        self.orders_dataframe = apply_compact_schema(pd.concat(
             [sol_open_orders, sea_open_orders],
             ignore_index=True
-        )
+        ))
     def clean_and_prepare_data(self):
         pass
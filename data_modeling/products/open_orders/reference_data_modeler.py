@@ -1,10 +1,11 @@
 import pandas as pd
 
 from utils import (
-    remove_textures, combine_products_creation_information,
+    remove_textures_series, combine_products_creation_information,
+    instrumentation,
 )
 from data_modeling.base import BaseDataModeler
-from data_processing import ProductAggregator
+from data_processing import ProductAggregator, WorkbookSidecarCache
 
 
 class ReferenceDataModeler(BaseDataModeler):
@@ -22,42 +23,60 @@ class ReferenceDataModeler(BaseDataModeler):
         super().__init__(config)
         self.ordered_items_file_path = config['ORDERED_ITEMS_MATERIAL_REQUIREMENTS_PATH']
         self.regular_items_file_path = config['REGULAR_ITEMS_MATERIAL_REQUIREMENTS_PATH']
+        # Columnar copies of the workbooks, rebuilt only when a workbook changes
+        self.workbook_cache = WorkbookSidecarCache(
+            config.get('WORKBOOK_CACHE_DIR', '.cache/workbooks'))
         self.product_engineering_categories = {}
-        self.product_material_requirements_df = None
-        self.load_data_frame()
+        self._product_material_requirements_df = None
 
+    @property
+    def product_material_requirements_df(self) -> pd.DataFrame:
+        """Manufacturing information per product, loaded the first time it is needed"""
+        if self._product_material_requirements_df is None:
+            self.load_data_frame()
+        return self._product_material_requirements_df
+
+    @product_material_requirements_df.setter
+    def product_material_requirements_df(self, dataframe: pd.DataFrame):
+        self._product_material_requirements_df = dataframe
+
+    @instrumentation.instrumented(
+        'reference workbooks: load',
+        rows_out=lambda result, modeler: modeler._product_material_requirements_df
+    )
     def load_data_frame(self):
         """
         Prepares and aggregated manufaturing dataframes into a single DataFrame
         """
         # Load ordered items and concatenate into a single DataFrame
+        relevant_columns = ['ITEM NAME', 'QTY', 'WORK METHODE', 'MATERIALS SIZES(MM)']
         try:
-            all_items_on_order = pd.read_excel(
-                self.ordered_items_file_path, sheet_name=None)
             # The following df includes regular products + ordered items
             # Including details of from what stock source they have been manufactured
-            big_dataframe = pd.concat(
-                all_items_on_order.values(), ignore_index=True)
+            big_dataframe = self.workbook_cache.read_workbook(
+                self.ordered_items_file_path, all_sheets=True,
+                columns=relevant_columns
+            )
+        except KeyError:
+            raise
         except Exception as e:
             print(f'Error loading ordered items: {e}')
             return
         # Use relevant columns
-        big_dataframe = big_dataframe[
-            ['ITEM NAME', 'QTY', 'WORK METHODE', 'MATERIALS SIZES(MM)']
-        ].rename(
+        big_dataframe = big_dataframe.rename(
             columns={'MATERIALS SIZES(MM)': 'Component Sizes',
                      'WORK METHODE': 'WORK TYPE'}
         )
-        big_dataframe['MOD_ITEM NAME'] = big_dataframe['ITEM NAME'].apply(
-            lambda x: remove_textures(x).upper()
-        )
+        big_dataframe['MOD_ITEM NAME'] = remove_textures_series(
+            big_dataframe['ITEM NAME']).str.upper()
         big_dataframe.drop(columns=['ITEM NAME'], inplace=True)
         big_dataframe.rename(
             columns={'MOD_ITEM NAME': 'ITEM NAME'}, inplace=True)
         big_dataframe.drop_duplicates(
             subset='ITEM NAME', keep='first', inplace=True)
         try:
-            regular_items = pd.read_excel(self.regular_items_file_path)
+            regular_items = self.workbook_cache.read_workbook(
+                self.regular_items_file_path)
         except Exception as e:
             print(f'Error loading regular items: {e}')
         self.product_material_requirements_df = ProductAggregator.combine_products_creation_information(
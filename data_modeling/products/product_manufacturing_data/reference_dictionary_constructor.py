@@ -1,4 +1,7 @@
-from typing import Dict, Tuple, Callable
+from typing import Dict, Callable
+import re
+
+import numpy as np
 import pandas as pd
 
 from data_modeling.base import BaseDataModeler
@@ -11,15 +14,41 @@ class ReferenceDictionaryConstructor(BaseDataModeler):
     Constructs a detailed product dictionary
     categorizing products by stock requirements
     """
+    # Exact-case tokens come before their case-insensitive counterparts
+    SIZE_TOKEN_PATTERN = re.compile(
+        r'(?P<X>X)|(?P<x_other>x)|(?P<Dia>Dia)|(?P<dia_other>(?i:dia))'
+        r'|(?P<Pipe>Pipe)|(?P<Sq>Sq)|(?P<sq_other>(?i:sq))|(?P<Rect>Rect)'
+        r'|(?P<Sheet>Sheet)|(?P<amp>&)|(?P<scrap>(?i:scrap))'
+    )
+    # Every category the products end up in once composites are split
+    ENGINEERING_CATEGORIES = (
+        'scrap', 'round_rod', 'plate', 'square_rod', 'ring_pull_stock',
+        'round_rect_single_rods_stock', 'pipe_composite_stock',
+        'three_distinct_round_rods', 'two_distinct_round_rods',
+        'round_square_single_rods_stock', 'two_rectangular_plates', 'metal_sheet'
+    )
 
     def __init__(self, config):
         super().__init__(config)
         self.reference_data_modeler = ReferenceDataModeler(config)
-        self.product_material_requirements_df = \
-            self.reference_data_modeler.product_material_requirements_df
-        self.product_engineering_categories = {}
-        self.categorize_product_per_stock_requirement()
-        self.finalize_dictionary_construction()
+        self.composite_token_counts = None
+        self._product_engineering_categories = None
+
+    @property
+    def product_material_requirements_df(self) -> pd.DataFrame:
+        return self.reference_data_modeler.product_material_requirements_df
+
+    @property
+    def product_engineering_categories(self) -> Dict[str, pd.DataFrame]:
+        """Products grouped by stock requirement, categorized on first use"""
+        if self._product_engineering_categories is None:
+            self.categorize_product_per_stock_requirement()
+            self.finalize_dictionary_construction()
+        return self._product_engineering_categories
+
+    @product_engineering_categories.setter
+    def product_engineering_categories(self, categories: Dict[str, pd.DataFrame]):
+        self._product_engineering_categories = categories
 
     def clean_and_prepare_data(self):
         pass
@@ -27,6 +56,38 @@ class ReferenceDictionaryConstructor(BaseDataModeler):
     def load_data_frame(self):
         pass
 
+    def count_size_tokens(self, sizes: pd.Series) -> pd.DataFrame:
+        """
+        Counts every token the categorization rules look at in a single
+        regex pass over the size strings.
+
+        Args:
+            sizes (pd.Series): The component size strings.
+
+        Returns:
+            pd.DataFrame: One row per size string, positionally aligned, with
+            case-sensitive counts ('X', 'Dia', 'Pipe', 'Sq', 'Rect', 'Sheet', '&')
+            and case-insensitive counts ('x', 'dia', 'sq', 'scrap').
+        """
+        sizes = sizes.astype(object).reset_index(drop=True)
+        matches = sizes.str.extractall(self.SIZE_TOKEN_PATTERN)
+        found = matches.notna().groupby(level=0).sum().reindex(
+            range(len(sizes)), fill_value=0
+        ).astype('int32')
+        return pd.DataFrame({
+            'X': found['X'],
+            'x': found['X'] + found['x_other'],
+            'Dia': found['Dia'],
+            'dia': found['Dia'] + found['dia_other'],
+            'Pipe': found['Pipe'],
+            'Sq': found['Sq'],
+            'sq': found['Sq'] + found['sq_other'],
+            'Rect': found['Rect'],
+            'Sheet': found['Sheet'],
+            '&': found['amp'],
+            'scrap': found['scrap'],
+        })
+
     def categorize_product_per_stock_requirement(self):
         """
         Categorize products by stock requirements based on component sizes.
@@ -35,28 +96,27 @@ class ReferenceDictionaryConstructor(BaseDataModeler):
         size_column = get_column_by_keyword(df, 'size')
         if size_column is None:
             raise ValueError("No suitable size column found in DataFrame")
-        composite_mask = df[size_column].str.contains(
-            '&', case=False, na=False)
+        token_counts = self.count_size_tokens(df[size_column])
+        composite_mask = (token_counts['&'] > 0).to_numpy()
         composite_materials_df = df[composite_mask]
         homogeneous_materials_df = df[~composite_mask]
+        homogeneous_counts = token_counts[~composite_mask]
+        self.composite_token_counts = token_counts[composite_mask].reset_index(
+            drop=True)
         # Categorize the remaining data
         self.product_engineering_categories = {
             'composite_materials': composite_materials_df,
             'scrap': homogeneous_materials_df[
-                homogeneous_materials_df[size_column].str.contains(
-                    'scrap', case=False, na=False)
+                (homogeneous_counts['scrap'] > 0).to_numpy()
             ],
             'round_rod': homogeneous_materials_df[
-                homogeneous_materials_df[size_column].str.contains(
-                    'dia', case=False, na=False)
+                (homogeneous_counts['dia'] > 0).to_numpy()
             ],
             'plate': homogeneous_materials_df[
-                homogeneous_materials_df[size_column].str.contains(
-                    'X', case=False, na=False)
+                (homogeneous_counts['x'] > 0).to_numpy()
             ],
             'square_rod': homogeneous_materials_df[
-                homogeneous_materials_df[size_column].str.contains(
-                    'sq', case=False, na=False)
+                (homogeneous_counts['sq'] > 0).to_numpy()
             ],
         }
         for category, dataframe in self.product_engineering_categories.items():
@@ -65,94 +125,82 @@ class ReferenceDictionaryConstructor(BaseDataModeler):
             )
 
     def segregate_composite_components(
-            self, df: pd.DataFrame, column_name='Component Sizes'
+            self, df: pd.DataFrame, column_name='Component Sizes',
+            token_counts: pd.DataFrame = None
     ) -> Dict[str, pd.DataFrame]:
         """
         Segregates components within a DataFrame into predefined categories
-        based on certain conditions.
+        based on certain conditions. Every row goes to the first category
+        whose condition it meets.
 
         Args:
             df (pd.DataFrame): The DataFrame to process.
             column_name (str, optional): The name of the column to apply conditions to. 
+            token_counts (pd.DataFrame, optional): Token counts of the column,
+            computed when not provided.
 
         Returns:
             dict: A dictionary of DataFrames categorized by the specified conditions.
         """
         df_reset = df.reset_index(drop=True)
-        composite_dfs = {
-            'ring_pull_stock': None, 'round_rect_single_rods_stock': None,
-            'pipe_composite_stock': None, 'three_distinct_round_rods': None,
-            'two_distinct_round_rods': None, 'round_square_single_rods_stock': None,
-            'two_rectangular_plates': None, 'metal_sheet': None,
-        }
-        used_mask = pd.Series([False]*len(df_reset))
+        if token_counts is None:
+            token_counts = self.count_size_tokens(df_reset[column_name])
         conditions = self.get_split_conditions()
-        for key, condition in conditions.items():
-            composite_dfs[key], used_mask = self.apply_conditions_to_split_composite_df(
-                df_reset, condition, used_mask, column_name
-            )
-        return composite_dfs
+        stock_categories = np.select(
+            [condition(token_counts).to_numpy() for condition in conditions.values()],
+            list(conditions), default=''
+        )
+        grouped_components = dict(tuple(
+            df_reset.groupby(stock_categories, sort=False)
+        ))
+        # The groups are already new frames; a shallow copy detaches them
+        # from the grouping without copying their data again
+        return {
+            key: grouped_components.get(key, df_reset.iloc[0:0]).copy(deep=False)
+            for key in conditions
+        }
 
-    def get_split_conditions(self) -> Dict[str, Callable[[pd.Series], pd.Series]]:
+    def get_split_conditions(self) -> Dict[str, Callable[[pd.DataFrame], pd.Series]]:
         """
         Defines the conditions used to further segregate 
-        composite components into categories.
+        composite components into categories, in order of precedence.
 
         Returns:
             dict: A dictionary where keys are category names and values are 
-            that define the conditions for each category.
+            functions of the size token counts that define the conditions
+            for each category.
         """
         return {
-            'ring_pull_stock': lambda x: (
-                (2 == x.str.count(r'(?i)x')) & (1 == x.str.count('Dia'))
+            'ring_pull_stock': lambda counts: (
+                (2 == counts['x']) & (1 == counts['Dia'])
             ),
-            'round_rect_single_rods_stock': lambda x: (
-                (1 == x.str.count('X')) & (1 == x.str.count('Dia'))
+            'round_rect_single_rods_stock': lambda counts: (
+                (1 == counts['X']) & (1 == counts['Dia'])
             ),
-            'pipe_composite_stock': lambda x: (
-                1 == x.str.count('Pipe')
+            'pipe_composite_stock': lambda counts: (
+                1 == counts['Pipe']
             ),
-            'three_distinct_round_rods': lambda x: (
-                3 == x.str.count('Dia')
+            'three_distinct_round_rods': lambda counts: (
+                3 == counts['Dia']
             ),
-            'two_distinct_round_rods': lambda x: (
-                (2 == x.str.count('Dia')) & (~x.str.contains('Pipe'))
+            'two_distinct_round_rods': lambda counts: (
+                (2 == counts['Dia']) & (0 == counts['Pipe'])
             ),
-            'round_square_single_rods_stock': lambda x: (
-                (1 == x.str.count('Dia')) & (1 == x.str.count('Sq'))
+            'round_square_single_rods_stock': lambda counts: (
+                (1 == counts['Dia']) & (1 == counts['Sq'])
             ),
-            'two_rectangular_plates': lambda x: (
-                2 == x.str.count('Rect')
+            'two_rectangular_plates': lambda counts: (
+                2 == counts['Rect']
             ),
-            'metal_sheet': lambda x: (
-                x.str.contains('Sheet')
+            'metal_sheet': lambda counts: (
+                counts['Sheet'] > 0
             ),
         }
 
-    def apply_conditions_to_split_composite_df(
-            self, df: pd.DataFrame, condition: Callable[[pd.Series], pd.Series],
-            used_mask: pd.Series, column_name: str
-    ) -> Tuple[pd.DataFrame, pd.Series]:
-        """
-        Applies conditions to a DataFrame to filter components into categories.
-
-        Args:
-            df (pd.DataFrame): The DataFrame to process.
-            condition (function): The condition function to apply to the DataFrame.
-            used_mask (pd.Series): A Series indicating rows already categorized.
-            column_name (str): The name of the column to apply conditions to.
-
-        Returns:
-            tuple: A filtered DataFrame that meets the condition, and an updated mask.
-        """
-        current_mask = condition(df[column_name]) & ~used_mask
-        df_filtered_by_stock_type = df[current_mask].copy()
-        updated_mask = used_mask | current_mask
-        return df_filtered_by_stock_type, updated_mask
-
     def finalize_dictionary_construction(self):
         if 'composite_materials' in self.product_engineering_categories:
             composite_df = self.product_engineering_categories['composite_materials']
-            composite_data = self.segregate_composite_components(composite_df)
+            composite_data = self.segregate_composite_components(
+                composite_df, token_counts=self.composite_token_counts)
             self.product_engineering_categories.update(composite_data)
             self.product_engineering_categories.pop('composite_materials')
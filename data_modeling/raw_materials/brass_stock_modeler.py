@@ -1,10 +1,13 @@
 from typing import Dict
 
+import numpy as np
 import pandas as pd
 
 from data_modeling.base import BaseDataModeler
-from data_processing import SupplyChainDataPrep, DescriptionDimensionProcessor
-from utils import calculate_rod_top_area, calculate_volume_from_weight
+from data_processing import SupplyChainDataPrep
+from utils import (
+    calculate_rod_top_areas, calculate_volume_from_weight, instrumentation
+)
 
 
 class BrassStockModeler(BaseDataModeler):
@@ -15,12 +18,23 @@ class BrassStockModeler(BaseDataModeler):
     def __init__(self, live_sheets: Dict[str, pd.DataFrame]):
         super().__init__(live_sheets)
         self.supply_chain_data_prep = SupplyChainDataPrep(self.live_sheets)
-        self.processor = DescriptionDimensionProcessor()
+        self.processor = self.description_dimension_processor
         self.raw_stock_available = None
-        self.load_data_frame()
-        self.clean_and_prepare_data()
-        self.create_inventory_dictionary()
-    
+        self._inventory_dict = None
+
+    @property
+    def inventory_dict(self) -> Dict[str, pd.DataFrame]:
+        """Rod and Patti/Sheet inventory, built the first time it is needed"""
+        if self._inventory_dict is None:
+            self.load_data_frame()
+            self.clean_and_prepare_data()
+            self.create_inventory_dictionary()
+        return self._inventory_dict
+
+    @inventory_dict.setter
+    def inventory_dict(self, inventory_dict: Dict[str, pd.DataFrame]):
+        self._inventory_dict = inventory_dict
+
     def load_data_frame(self):
         try:
             self.raw_stock_available = self.live_sheets['RAW MATERIALS MAIN ORDERS']
@@ -36,34 +50,47 @@ class BrassStockModeler(BaseDataModeler):
         )
         self.prepare_raw_stock_dataframes()
     
+    def stock_type_mask(self, pattern: str) -> pd.Series:
+        """
+        Flags the stock whose type matches a pattern. The pattern is only
+        tested against the stock type categories, rows are then compared
+        by their category codes
+        """
+        stock_types = self.raw_stock_available['Stock Type'].astype('category')
+        categories = stock_types.cat.categories
+        matching_codes = np.flatnonzero(
+            categories.astype(str).str.contains(pattern, case=False))
+        return pd.Series(
+            np.isin(stock_types.cat.codes.to_numpy(), matching_codes),
+            index=stock_types.index
+        )
+
+    @instrumentation.instrumented(
+        'raw stock: prepare',
+        rows_in=lambda modeler: modeler.raw_stock_available,
+        rows_out=lambda result, modeler: [
+            modeler.rod_inventory, modeler.sheet_patti_inventory]
+    )
     def prepare_raw_stock_dataframes(self):
         """
         This function cleans and organizes data exported 
         from 'RAW MATERIALS FOR MAIN ORDERS' sheet
         """
-        df_for_rod_stock = self.raw_stock_available [
-            self.raw_stock_available['Stock Type'].str.contains(
-                'Rod', case=False, na=False
-            )
+        df_for_rod_stock = self.raw_stock_available[
+            self.stock_type_mask('Rod')
         ]
-        df_for_sheet_and_patti = self.raw_stock_available [
-            self.raw_stock_available['Stock Type'].str.contains(
-                'Sheet|Patti', case=False, na=False
-            )
+        df_for_sheet_and_patti = self.raw_stock_available[
+            self.stock_type_mask('Sheet|Patti')
         ]
         # Rod Stock Data
         self.rod_inventory = self.processor.add_rod_dimensions_to_dataframe(
             df_for_rod_stock, 'Dimensions'
         )
-        self.rod_inventory['Top Circular Area (mm^2)'] = self.rod_inventory.apply(
-            lambda x: calculate_rod_top_area(
-                x['Stock Type'], x['Dimensions']
-            ), axis=1
+        self.rod_inventory['Top Circular Area (mm^2)'] = calculate_rod_top_areas(
+            self.rod_inventory['Stock Type'], self.rod_inventory['Dimensions']
         )
-        self.rod_inventory['Available Volume (cm^3)'] = (
-            self.rod_inventory['Current Stock (kg)'].apply(
-                calculate_volume_from_weight
-            )
+        self.rod_inventory['Available Volume (cm^3)'] = calculate_volume_from_weight(
+            self.rod_inventory['Current Stock (kg)']
         )
         # Patti and Sheet Stock Data
         self.sheet_patti_inventory = self.processor.add_non_rod_dimensions_to_dataframe(
@@ -73,10 +100,8 @@ class BrassStockModeler(BaseDataModeler):
             self.sheet_patti_inventory['Dimension_1'] \
                 * self.sheet_patti_inventory['Dimension_2']
         )
-        self.sheet_patti_inventory['Available Volume (cm^3)'] = (
-            self.sheet_patti_inventory['Current Stock (kg)'].apply(
-                calculate_volume_from_weight
-            )
+        self.sheet_patti_inventory['Available Volume (cm^3)'] = calculate_volume_from_weight(
+            self.sheet_patti_inventory['Current Stock (kg)']
         )
     
     def create_inventory_dictionary(self):
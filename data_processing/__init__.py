@@ -1,5 +1,9 @@
 from .google_sheets_client import GoogleSheetsClient
 from .supply_chain_data_prep import SupplyChainDataPrep
 from .description_dimension_processor import DescriptionDimensionProcessor
+from .description_parse_cache import DescriptionParseCache, description_parse_cache
 from .product_aggregation import ProductAggregator
-
+from .sheet_snapshot_cache import SheetSnapshotCache
+from .workbook_sidecar_cache import WorkbookSidecarCache
+from .profile_requirements_cache import ProfileRequirementsCache
+from .column_schema import apply_compact_schema
@@ -0,0 +1,46 @@
+from typing import List
+
+import pandas as pd
+
+from utils import with_columns
+
+# Text columns of the order lines whose values repeat from line to line
+CATEGORICAL_COLUMNS: List[str] = [
+    'ITEM', 'FINISH', 'UNIT', 'P.O DATE', 'Generic_Product_Code'
+]
+# Lookup columns naming the stock a component is cut from
+CATEGORICAL_SUFFIXES = ('FirstCol', 'SecondCol')
+
+
+def list_categorical_columns(df: pd.DataFrame) -> List[str]:
+    """
+    Returns:
+    - List[str]: The columns of the frame the schema stores as Categoricals
+    """
+    return [
+        column for column in df.columns
+        if column in CATEGORICAL_COLUMNS or str(column).endswith(CATEGORICAL_SUFFIXES)
+    ]
+
+
+def apply_compact_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Stores the repeated text columns of order lines as Categoricals, which
+    hold one small integer code per line instead of a pointer to a string.
+    Numeric columns keep their dtype: areas are matched against stock areas
+    and volumes are summed into the totals, so neither can lose precision
+
+    Parameters:
+    - df (pd.DataFrame): Order lines, with or without their lookup columns
+
+    Returns:
+    - pd.DataFrame: The frame with its text columns as Categoricals
+    """
+    converted_columns = {
+        column: df[column].astype('category')
+        for column in list_categorical_columns(df)
+        if not isinstance(df[column].dtype, pd.CategoricalDtype)
+    }
+    if not converted_columns:
+        return df
+    return with_columns(df, converted_columns)
@@ -0,0 +1,159 @@
+import datetime
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Object columns are stored as text plus a code for the original value type.
+# Codes are only ever appended, so that files written earlier still decode
+NULL, STRING, INTEGER, FLOAT, BOOLEAN, DATETIME, TIMESTAMP, DATE, TIME = range(9)
+
+
+def _encode_objects(series: pd.Series) -> Tuple[List[Any], np.ndarray]:
+    text, type_codes = [], np.empty(len(series), dtype=np.int8)
+    for i, value in enumerate(series.tolist()):
+        if isinstance(value, str):
+            code, encoded = STRING, value
+        elif isinstance(value, (bool, np.bool_)):
+            code, encoded = BOOLEAN, str(bool(value))
+        elif isinstance(value, (int, np.integer)):
+            code, encoded = INTEGER, str(int(value))
+        elif isinstance(value, (float, np.floating)) and not np.isnan(value):
+            code, encoded = FLOAT, repr(float(value))
+        elif value is pd.NaT:
+            # NaT passes for a datetime, but has no ISO form
+            code, encoded = NULL, None
+        elif isinstance(value, pd.Timestamp):
+            code, encoded = TIMESTAMP, value.isoformat()
+        elif isinstance(value, datetime.datetime):
+            code, encoded = DATETIME, value.isoformat()
+        elif isinstance(value, datetime.date):
+            code, encoded = DATE, value.isoformat()
+        elif isinstance(value, datetime.time):
+            code, encoded = TIME, value.isoformat()
+        elif pd.isna(value):
+            code, encoded = NULL, None
+        else:
+            # Any other value type is kept as its text
+            code, encoded = STRING, str(value)
+        text.append(encoded)
+        type_codes[i] = code
+    return text, type_codes
+
+
+def _decode_objects(text: np.ndarray, type_codes: np.ndarray) -> pd.Series:
+    values = text.astype(object)
+    values[type_codes == NULL] = np.nan
+    decoders = {
+        INTEGER: int,
+        FLOAT: float,
+        BOOLEAN: lambda value: 'True' == value,
+        DATETIME: datetime.datetime.fromisoformat,
+        TIMESTAMP: pd.Timestamp,
+        DATE: datetime.date.fromisoformat,
+        TIME: datetime.time.fromisoformat,
+    }
+    for code, decode in decoders.items():
+        positions = np.flatnonzero(type_codes == code)
+        for position in positions:
+            values[position] = decode(values[position])
+    return pd.Series(values, dtype=object)
+
+
+def _append_column(
+    series: pd.Series, name: str, arrays: List[pa.Array], names: List[str]
+) -> str:
+    if object == series.dtype:
+        text, type_codes = _encode_objects(series)
+        arrays.extend([pa.array(text, type=pa.string()),
+                       pa.array(type_codes, type=pa.int8())])
+        names.extend([name, f'{name}_type'])
+        return 'object'
+    arrays.append(pa.Array.from_pandas(series))
+    names.append(name)
+    return str(series.dtype)
+
+
+def _read_column(table: pa.Table, name: str, column_type: str) -> pd.Series:
+    values = table.column(name)
+    if 'object' == column_type:
+        type_codes = table.column(f'{name}_type').to_numpy()
+        return _decode_objects(values.to_numpy(zero_copy_only=False), type_codes)
+    return values.to_pandas().astype(column_type)
+
+
+def frame_to_table(
+    df: pd.DataFrame, metadata_key: str, metadata: Optional[Dict] = None,
+    keep_index: bool = False
+) -> pa.Table:
+    """
+    Converts a DataFrame into an Arrow table that table_to_frame turns back
+    into the same frame. Typed columns keep their dtype. Object columns may
+    mix text, numbers, booleans, datetimes, Timestamps, dates and times:
+    each cell comes back with its value and type, except that time zones
+    come back as fixed UTC offsets, every missing value (None, NaN, NaT)
+    comes back as NaN, and any other type comes back as its text
+
+    Parameters:
+    - df (pd.DataFrame): The frame to convert
+    - metadata_key (str): Schema metadata key the frame layout is stored under
+    - metadata (Dict): Extra JSON metadata stored with the layout
+    - keep_index (bool): Also store the row index
+
+    Returns:
+    - pa.Table: Columns named by position, with the layout in the metadata
+    """
+    arrays, names, column_types = [], [], []
+    for position in range(df.shape[1]):
+        column_types.append(
+            _append_column(df.iloc[:, position], str(position), arrays, names))
+    layout = dict(metadata or {})
+    layout['columns'] = list(df.columns)
+    layout['column_types'] = column_types
+    if keep_index:
+        layout['index_type'] = _append_column(
+            df.index.to_series(), 'index', arrays, names)
+    return pa.Table.from_arrays(
+        arrays, names=names,
+        metadata={metadata_key: json.dumps(layout, default=str)}
+    )
+
+
+def read_layout(table: pa.Table, metadata_key: str) -> Dict:
+    """Returns the layout and metadata stored with a table by frame_to_table"""
+    return json.loads(table.schema.metadata[metadata_key.encode()])
+
+
+def table_to_frame(table: pa.Table, metadata_key: str) -> pd.DataFrame:
+    """
+    Rebuilds the DataFrame that frame_to_table converted
+    """
+    layout = read_layout(table, metadata_key)
+    data = {
+        position: _read_column(table, str(position), column_type)
+        for position, column_type in enumerate(layout['column_types'])
+    }
+    df = pd.DataFrame(data)
+    df.columns = layout['columns']
+    if 'index_type' in layout:
+        df.index = _read_column(table, 'index', layout['index_type'])
+        df.index.name = None
+    return df
+
+
+def write_table(table: pa.Table, file_path: str) -> None:
+    """Writes an Arrow IPC file, replacing any previous file atomically"""
+    temporary_path = file_path + '.tmp'
+    with pa.OSFile(temporary_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temporary_path, file_path)
+
+
+def read_table(file_path: str) -> pa.Table:
+    """Reads an Arrow IPC file through a memory map"""
+    with pa.memory_map(file_path, 'r') as source:
+        return pa.ipc.open_file(source).read_all()
@@ -10,3 +10,8 @@ STOCK_TO_UNITS_MAP = {
     'Brass Hex Rod': 'mm side',
     'Square Rod': 'mm side'
 }
+
+# Worksheets read by the pipeline; every other tab can be skipped when fetching
+PIPELINE_SHEET_TITLES = [
+    'SOL NEW CONSOLIDATED', 'SEA ORDERS', 'RAW MATERIALS MAIN ORDERS'
+]
@@ -1,17 +1,50 @@
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 import re
 
+import numpy as np
 import pandas as pd
 
 from data_processing.constants import STOCK_TO_UNITS_MAP
-from utils import convert_inches_to_mm
+from data_processing.description_parse_cache import (
+    DescriptionParseCache, description_parse_cache
+)
+from utils import convert_inches_to_mm, with_columns
 
 
 class DescriptionDimensionProcessor:
-    def __init__(self, units_dict: Dict[str, str] = None) -> None:
+    """
+    Parses the dimensions written in stock descriptions. Patterns are
+    compiled once, and parsed descriptions are kept in a parse cache
+    shared with the product area parsers
+    """
+    NUMBER_PATTERN = re.compile(r'\d+\.?\d*')
+    # finds three groups - numeric, '"' and mm/MM
+    DIMENSION_PATTERN = re.compile(r'(\d+\.?\d*)\s*(")?\s*(mm|MM)?')
+
+    def __init__(
+        self, units_dict: Dict[str, str] = None,
+        parse_cache: DescriptionParseCache = None
+    ) -> None:
         if units_dict is None:
             units_dict = STOCK_TO_UNITS_MAP
+        if parse_cache is None:
+            parse_cache = description_parse_cache
         self.units_dicts = units_dict
+        self.parse_cache = parse_cache
+        self.indicator_patterns = self.compile_indicators(units_dict)
+        # The units map is part of the key, as it changes what a rod parses to
+        self.rod_parser_name = 'rod dimensions'
+        if units_dict != STOCK_TO_UNITS_MAP:
+            self.rod_parser_name = ('rod dimensions', tuple(units_dict.items()))
+
+    @staticmethod
+    def compile_indicators(
+        units_map_dict: Dict[str, str]
+    ) -> List[Tuple[str, re.Pattern, str]]:
+        return [
+            (indicator.lower(), re.compile(re.escape(indicator), re.IGNORECASE), units)
+            for indicator, units in units_map_dict.items()
+        ]
 
     def parse_dimensions_from_rod_description(
         self, rod_description: str, units_map_dict: Dict[str, str]
@@ -24,19 +57,22 @@ class DescriptionDimensionProcessor:
             units_map_dict (dict): A dictionary mapping rod type to dimension
 
         Returns:
-            str: A string that contains brief rod description and dimension 
+            str: A string that contains brief rod description and dimension
         """
+        if units_map_dict is self.units_dicts:
+            indicator_patterns = self.indicator_patterns
+        else:
+            indicator_patterns = self.compile_indicators(units_map_dict)
         dimension_string = rod_description
+        lowered_description = rod_description.lower()
         units_of_measurement = None
-        for indicator, units in units_map_dict.items():
-            if indicator.lower() in dimension_string.lower():
-                dimension_string = re.sub(
-                    re.escape(indicator), '', dimension_string, flags=re.IGNORECASE
-                ).strip()
+        for lowered_indicator, indicator_pattern, units in indicator_patterns:
+            if lowered_indicator in lowered_description:
+                dimension_string = indicator_pattern.sub('', dimension_string).strip()
                 units_of_measurement = units
                 break
         if units_of_measurement:
-            dimension_values = re.findall(r'\d+\.?\d*', dimension_string)
+            dimension_values = self.NUMBER_PATTERN.findall(dimension_string)
             if dimension_values:
                 highest_value = max(map(float, dimension_values))
                 return f'{highest_value}{units_of_measurement}'
@@ -55,12 +91,17 @@ class DescriptionDimensionProcessor:
         Returns
         - The dataframe with an added column that has the diameter
         """
-        df_copy = df.copy()
-        df_copy.loc[:, dimension_column] = df[dimension_column].apply(
-            lambda x: self.parse_dimensions_from_rod_description(
-                x, self.units_dicts)
+        parsed_dimensions = self.parse_cache.parse_many(
+            self.rod_parser_name, df[dimension_column],
+            lambda descriptions: [
+                self.parse_dimensions_from_rod_description(description, self.units_dicts)
+                for description in descriptions
+            ],
+            missing=np.nan
         )
-        return df_copy
+        return with_columns(df, {
+            dimension_column: pd.Series(parsed_dimensions, index=df.index, dtype=object)
+        })
 
     def extract_and_standardize_dimensions(
             self, dimension_string: str
@@ -80,9 +121,7 @@ class DescriptionDimensionProcessor:
         # Initialize a list to store the dimensions
         stored_dimensions = []
         standardized_string = dimension_string.replace('\'\'', '"').strip()
-        # finds three groups - numeric, '"' and mm/MM
-        matches = re.findall(
-            r'(\d+\.?\d*)\s*(")?\s*(mm|MM)?', standardized_string)
+        matches = self.DIMENSION_PATTERN.findall(standardized_string)
         for value, inch_indicator, _ in matches:
             value = float(value)
             if '"' == inch_indicator:
@@ -92,6 +131,42 @@ class DescriptionDimensionProcessor:
         largest_dimensions = sorted(stored_dimensions, reverse=True)[:2]
         return [round(dimension, 2) for dimension in largest_dimensions]
 
+    def extract_dimensions_from_descriptions(self, descriptions: List) -> List[Tuple]:
+        """
+        Vectorized extract_and_standardize_dimensions for many descriptions,
+        matching them all with one Series.str.extractall
+
+        Parameters
+        - descriptions (List): Descriptions that are not missing
+
+        Returns
+        - A (Dimension_1, Dimension_2) pair per description, 0.0 where
+        fewer than two dimensions are found
+        """
+        standardized = (
+            pd.Series(descriptions, dtype=object).astype(str).str.strip()
+            .str.replace('\'\'', '"', regex=False).str.strip()
+        )
+        matches = standardized.str.extractall(self.DIMENSION_PATTERN)
+        largest_dimensions = np.zeros((len(descriptions), 2))
+        if matches.empty:
+            return list(map(tuple, largest_dimensions))
+        values = matches[0].astype(float).to_numpy(copy=True)
+        is_inches = (matches[1] == '"').to_numpy()
+        values[is_inches] = convert_inches_to_mm(values[is_inches])
+        rows = matches.index.get_level_values(0).to_numpy()
+        # Largest values first within each description
+        order = np.lexsort((-values, rows))
+        rows, values = rows[order], values[order]
+        rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+        in_top_two = rank < 2
+        # Rounded like the built-in round, once per distinct value
+        distinct_values, value_codes = np.unique(values[in_top_two], return_inverse=True)
+        rounded_values = np.array([round(value, 2) for value in distinct_values.tolist()])
+        largest_dimensions[rows[in_top_two], rank[in_top_two]] = \
+            rounded_values[value_codes.ravel()]
+        return list(map(tuple, largest_dimensions))
+
     def add_non_rod_dimensions_to_dataframe(
             self, df: pd.DataFrame, dimensions_column: str
     ) -> pd.DataFrame:
@@ -101,20 +176,18 @@ class DescriptionDimensionProcessor:
 
         Parameters
         - df (pd.DataFrame): The dataframe that we must add dimensions to
-        - dimension_column (str): The column that contains the dimensions 
+        - dimension_column (str): The column that contains the dimensions
         to be parsed
 
         Returns
         A dataframe with 2 new columns containing new dimensions
         """
-        df_copy = df.copy()
-        dimensions = df_copy[dimensions_column].apply(
-            self.extract_and_standardize_dimensions
-        )
-        df_copy['Dimension_1'] = dimensions.apply(
-            lambda x: round(x[0], 2) if len(x) > 0 else 0.0
-        )
-        df_copy['Dimension_2'] = dimensions.apply(
-            lambda x: round(x[1], 2) if len(x) > 1 else 0.0
+        dimensions = self.parse_cache.parse_many(
+            'non-rod dimensions', df[dimensions_column],
+            self.extract_dimensions_from_descriptions, missing=(0.0, 0.0)
         )
-        return df_copy
\ No newline at end of file
+        dimensions = np.array(dimensions.tolist(), dtype=float).reshape(-1, 2)
+        return with_columns(df, {
+            'Dimension_1': dimensions[:, 0],
+            'Dimension_2': dimensions[:, 1],
+        })
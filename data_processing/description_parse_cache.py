@@ -0,0 +1,119 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class DescriptionParseCache:
+    """
+    Parsed dimensions keyed by the raw description they were parsed from.
+
+    The stock sheet and the product size columns repeat the same few
+    descriptions on many rows, so each parser only sees a description the
+    first time any frame holds it. Results are kept per parser, as the same
+    description parses differently for rods, sheets or plates. Each parser
+    keeps at most 'max_entries' results, the least recently used going first,
+    so a long-lived process does not grow the cache without bound
+    """
+    DEFAULT_MAX_ENTRIES = 10000
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        if max_entries < 1:
+            raise ValueError(f'max_entries must be at least 1, not {max_entries}')
+        self.max_entries = max_entries
+        self._results: Dict[Hashable, 'OrderedDict[Any, Any]'] = {}
+        self._statistics: Dict[Hashable, Dict[str, int]] = {}
+        # The stock and the product branches of the pipeline may parse at once
+        self._lock = threading.Lock()
+
+    def parse(
+        self, parser_name: Hashable, description: Any, parse: Callable[[Any], Any]
+    ) -> Any:
+        """
+        Parameters:
+        - parser_name (Hashable): The parser the result belongs to
+        - description (Any): The raw description
+        - parse (Callable): Parses a description that is not cached yet
+
+        Returns:
+        - Any: The parsed description
+        """
+        return self.parse_many(
+            parser_name, [description], lambda values: [parse(value) for value in values]
+        )[0]
+
+    def parse_many(
+        self, parser_name: Hashable, descriptions: Sequence,
+        parse_many: Callable[[List[Any]], Sequence], missing: Any = None
+    ) -> np.ndarray:
+        """
+        Parses a column of descriptions, handing the distinct descriptions
+        that are not cached yet to 'parse_many' in one call
+
+        Parameters:
+        - parser_name (Hashable): The parser the results belong to
+        - descriptions (Sequence): The raw descriptions, e.g. a Series
+        - parse_many (Callable): Parses a list of descriptions, returning
+        a result per description in the same order
+        - missing (Any): The result for missing descriptions
+
+        Returns:
+        - np.ndarray: An object array of results aligned with the descriptions
+        """
+        codes, uniques = pd.factorize(pd.Series(descriptions, dtype=object))
+        # The results of this call are gathered apart from the cache, which
+        # may evict them before they are read
+        found = {}
+        with self._lock:
+            results = self._results.setdefault(parser_name, OrderedDict())
+            statistics = self._statistics.setdefault(
+                parser_name, {'hits': 0, 'misses': 0})
+            for value in uniques:
+                if value in results:
+                    results.move_to_end(value)
+                    found[value] = results[value]
+        new_descriptions = [value for value in uniques if value not in found]
+        if new_descriptions:
+            parsed = dict(zip(new_descriptions, parse_many(new_descriptions)))
+            found.update(parsed)
+            with self._lock:
+                results.update(parsed)
+                while len(results) > self.max_entries:
+                    results.popitem(last=False)
+        unique_results = np.empty(len(uniques) + 1, dtype=object)
+        unique_results[:-1] = [found[value] for value in uniques]
+        unique_results[-1] = missing
+        parsed_count = int((codes >= 0).sum())
+        with self._lock:
+            statistics['misses'] += len(new_descriptions)
+            statistics['hits'] += parsed_count - len(new_descriptions)
+        # Missing descriptions have the code -1, the last slot
+        return unique_results[codes]
+
+    def stats(self) -> Dict[Hashable, Dict[str, Any]]:
+        """
+        Returns:
+        - dict: Per parser, the descriptions answered from the cache, the
+        descriptions parsed, the hit rate and the cached descriptions
+        """
+        with self._lock:
+            return {
+                parser_name: {
+                    'hits': statistics['hits'], 'misses': statistics['misses'],
+                    'hit_rate': statistics['hits'] / lookups if lookups else 0.0,
+                    'size': len(self._results.get(parser_name, ())),
+                }
+                for parser_name, statistics in self._statistics.items()
+                for lookups in [statistics['hits'] + statistics['misses']]
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self._statistics.clear()
+
+
+# Shared by the raw stock and the product area parsers
+description_parse_cache = DescriptionParseCache()
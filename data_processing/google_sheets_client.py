@@ -1,22 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
 import gspread
 import pandas as pd
 from google.oauth2.service_account import Credentials
 
+from data_processing.sheet_snapshot_cache import SheetSnapshotCache
+from utils import instrumentation
+
 
 class GoogleSheetsClient:
-    def __init__(self, config):
+    def __init__(
+        self, config, sheet_titles: Optional[List[str]] = None,
+        fetch_mode: str = 'batch', max_workers: int = 4, spreadsheet=None,
+        snapshot_cache: Optional[SheetSnapshotCache] = None, refresh: bool = False
+    ):
         """
         Initializes the Google Sheets Client using credentials and sheet URL key.
 
-        :param json_key_file_path: Path to the JSON key file for Google Sheets API authentication.
-        :param url_key: Unique identifier for the Google Sheets to be accessed.
+        :param config: Configuration dictionary with the JSON key file path
+        and the unique identifier of the Google Sheets to be accessed.
+        :param sheet_titles: Only these worksheets are loaded when given,
+        otherwise every worksheet in the spreadsheet is loaded.
+        :param fetch_mode: 'batch' fetches the declared sheets in a single values
+        request, 'threads' fetches them concurrently on a bounded thread pool.
+        :param max_workers: Upper bound on concurrent worksheet requests.
+        :param spreadsheet: An already opened spreadsheet (or a fake one),
+        which skips authorization.
+        :param snapshot_cache: Local snapshot used instead of fetching the values
+        while the spreadsheet is unchanged.
+        :param refresh: Fetch from Google Sheets even if the snapshot is fresh.
         """
+        if fetch_mode not in ('batch', 'threads'):
+            raise ValueError(f'Unknown fetch mode \'{fetch_mode}\'')
         self.json_key_file_path = config.get(
             'GOOGLE_SHEETS_JSON_KEY_FILE_PATH')
         self.url_key = config.get('GOOGLE_SHEETS_URL_KEY')
-        self.spreadsheet = None
+        self.sheet_titles = sheet_titles
+        self.fetch_mode = fetch_mode
+        self.max_workers = max_workers
+        self.spreadsheet = spreadsheet
+        self.snapshot_cache = snapshot_cache
+        self.refresh = refresh
         self.live_sheets = {}
-        self._authorize_google_sheets()
+        if self.spreadsheet is None:
+            self._authorize_google_sheets()
         self._load_data_frames()
 
     def _authorize_google_sheets(self):
@@ -34,16 +62,96 @@ class GoogleSheetsClient:
         gc = gspread.authorize(creds)
         self.spreadsheet = gc.open_by_key(self.url_key)
 
+    def _get_revision(self) -> Optional[str]:
+        """
+        Returns the last modified time of the spreadsheet, or None
+        when it cannot be read (for example without Drive access)
+        """
+        for attribute in ('get_lastUpdateTime', 'lastUpdateTime'):
+            try:
+                value = getattr(self.spreadsheet, attribute)
+                return value() if callable(value) else value
+            except Exception:
+                continue
+        return None
+
+    @instrumentation.instrumented(
+        'google sheets: load', rows_out=lambda result, client: client.live_sheets)
     def _load_data_frames(self):
         """
-        Loads all the sheets as dataframes onto this program.
+        Loads the sheets as dataframes onto this program.
         Stores them in 'live_sheets' dictionary with sheet titles as keys
         """
-        sheets = self.spreadsheet.worksheets()
-        for sheet in sheets:
-            data = sheet.get_all_values()
-            df = pd.DataFrame(data)
-            df.columns = df.iloc[0]
-            df = df.iloc[1:]
-            df.reset_index(drop=True, inplace=True)
-            self.live_sheets[sheet.title] = df
+        if self.snapshot_cache is None:
+            self._fetch_data_frames()
+            return
+        revision = self._get_revision()
+        if not self.refresh:
+            cached_sheets = self.snapshot_cache.load(
+                self.url_key, self.sheet_titles, revision)
+            if cached_sheets is not None:
+                self.live_sheets = cached_sheets
+                return
+        self._fetch_data_frames()
+        self.snapshot_cache.store(
+            self.url_key, self.live_sheets, revision,
+            all_sheets=self.sheet_titles is None
+        )
+
+    def _fetch_data_frames(self):
+        """
+        Fetches the sheet values from Google Sheets
+        """
+        if self.sheet_titles is None:
+            sheets = self.spreadsheet.worksheets()
+            for sheet in sheets:
+                data = sheet.get_all_values()
+                self.live_sheets[sheet.title] = self._values_to_data_frame(data)
+            return
+        batch_get = getattr(self.spreadsheet, 'values_batch_get', None)
+        if 'batch' == self.fetch_mode and batch_get is not None:
+            sheet_values = self._batch_get_values(self.sheet_titles)
+        else:
+            sheet_values = self._concurrent_get_values(self.sheet_titles)
+        for title in self.sheet_titles:
+            self.live_sheets[title] = self._values_to_data_frame(
+                sheet_values[title])
+
+    def _batch_get_values(self, titles: List[str]) -> Dict[str, List[List[str]]]:
+        """
+        Fetches the values of several worksheets in one request
+        """
+        # Quoted sheet titles address the whole worksheet in A1 notation
+        ranges = ["'{}'".format(title.replace("'", "''")) for title in titles]
+        response = self.spreadsheet.values_batch_get(ranges)
+        value_ranges = response.get('valueRanges', [])
+        return {
+            title: value_range.get('values', [])
+            for title, value_range in zip(titles, value_ranges)
+        }
+
+    def _concurrent_get_values(self, titles: List[str]) -> Dict[str, List[List[str]]]:
+        """
+        Fetches the values of several worksheets on a bounded thread pool
+        """
+        def fetch(title):
+            return self.spreadsheet.worksheet(title).get_all_values()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return dict(zip(titles, executor.map(fetch, titles)))
+
+    @staticmethod
+    def _values_to_data_frame(data: List[List[str]]) -> pd.DataFrame:
+        """
+        Builds a dataframe whose header is the first row of the sheet values
+        """
+        if not data:
+            return pd.DataFrame()
+        # Batched values omit trailing empty cells, pad rows like get_all_values
+        width = max(len(row) for row in data)
+        data = [list(row) + [''] * (width - len(row)) for row in data]
+        df = pd.DataFrame(data)
+        df.columns = df.iloc[0]
+        df = df.iloc[1:]
+        df.reset_index(drop=True, inplace=True)
+        return df
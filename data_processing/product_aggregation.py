@@ -37,7 +37,9 @@ class ProductAggregator:
             items_on_order_df_renamed = items_on_order_df.rename(columns=rename_dictionary)
             columns_to_keep = [item_column_reg, 'WORK METHOD', 'MATERIALS SIZES(MM)']
             orders_df_relevant_columns = items_on_order_df_renamed[columns_to_keep]
-            # Concatenate the DataFrames
-            concatenated_df = pd.concat([regular_items_df, orders_df_relevant_columns])
+            # Concatenate the DataFrames; both number their rows from 0, so the
+            # rows are renumbered to keep one row per index label downstream
+            concatenated_df = pd.concat(
+                [regular_items_df, orders_df_relevant_columns], ignore_index=True)
             return concatenated_df
     
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""
+Inspects or purges the product profile requirements cache.
+
+Usage: python -m data_processing.profile_cache_cli [--cache-dir DIR]
+       {info | purge [key] | evict max_bytes}
+"""
+import argparse
+import time
+
+from data_processing.profile_requirements_cache import ProfileRequirementsCache
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Inspect or purge the product profile requirements cache')
+    parser.add_argument(
+        '--cache-dir', default='.cache/profiles',
+        help='Directory of the cache (default: %(default)s)'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('info', help='List the cached entries')
+    purge_parser = subparsers.add_parser('purge', help='Remove cached entries')
+    purge_parser.add_argument(
+        'key', nargs='?', help='Entry to remove (default: every entry)')
+    evict_parser = subparsers.add_parser(
+        'evict', help='Remove least recently used entries down to a size')
+    evict_parser.add_argument('max_bytes', type=int)
+    arguments = parser.parse_args()
+
+    cache = ProfileRequirementsCache(arguments.cache_dir, max_bytes=None)
+    if 'info' == arguments.command:
+        entries = cache.entries()
+        for entry in entries:
+            last_used = time.strftime(
+                '%Y-%m-%d %H:%M:%S', time.localtime(entry['last_used']))
+            print(f"{entry['key']}  {entry['bytes']:>12,d} bytes  "
+                  f"{entry['categories']:>3d} categories  last used {last_used}")
+        total_bytes = sum(entry['bytes'] for entry in entries)
+        print(f'{len(entries)} entries, {total_bytes:,d} bytes')
+    elif 'purge' == arguments.command:
+        try:
+            print(f'Removed {cache.purge(arguments.key)} entries')
+        except ValueError as error:
+            parser.error(str(error))
+    else:
+        print(f'Removed {len(cache.evict(arguments.max_bytes))} entries')
+
+
+if __name__ == '__main__':
+    main()
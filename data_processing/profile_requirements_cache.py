@@ -0,0 +1,198 @@
+import json
+import os
+import re
+import shutil
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from data_processing.columnar_frames import (
+    frame_to_table, read_table, table_to_frame, write_table
+)
+
+
+class ProfileRequirementsCache:
+    """
+    Content-addressed store for the frames produced by the product profile
+    workflow, such as its component table, keyed by name.
+
+    An entry is keyed by a hash of everything the workflow reads, so a key
+    never goes stale: changed inputs simply give a new key. Each entry is a
+    directory holding one Arrow IPC file per frame and a manifest.
+    Entries not used recently are evicted once the cache outgrows 'max_bytes'.
+    Keys are lowercase hex digests of KEY_LENGTH characters; any other key
+    is refused, so that no key can name a directory outside the cache
+    """
+    MANIFEST_FILE = 'manifest.json'
+    METADATA_KEY = 'requirements'
+    KEY_LENGTH = 32
+    KEY_PATTERN = re.compile(f'[0-9a-f]{{{KEY_LENGTH}}}')
+
+    def __init__(self, cache_dir: str, max_bytes: Optional[int] = 256 * 2 ** 20):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def is_key(cls, key) -> bool:
+        return isinstance(key, str) and cls.KEY_PATTERN.fullmatch(key) is not None
+
+    def _entry_dir(self, key: str) -> str:
+        """
+        The directory of an entry, resolved and checked to lie directly
+        under the cache directory
+
+        Raises:
+        - ValueError: If the key is not a well-formed content hash, or its
+        directory resolves outside the cache (e.g. through a symlink)
+        """
+        if not self.is_key(key):
+            raise ValueError(f'Not a profile cache key: {key!r}')
+        cache_dir = os.path.realpath(self.cache_dir)
+        entry_dir = os.path.realpath(os.path.join(cache_dir, key))
+        if os.path.dirname(entry_dir) != cache_dir:
+            raise ValueError(f'Profile cache entry {key} lies outside {self.cache_dir}')
+        return entry_dir
+
+    def _read_manifest(self, key: str) -> Optional[Dict]:
+        manifest_path = os.path.join(self._entry_dir(key), self.MANIFEST_FILE)
+        try:
+            with open(manifest_path, 'r') as json_file:
+                return json.load(json_file)
+        except (OSError, ValueError):
+            return None
+
+    def _write_manifest(self, key: str, manifest: Dict) -> None:
+        manifest_path = os.path.join(self._entry_dir(key), self.MANIFEST_FILE)
+        with open(manifest_path + '.tmp', 'w') as json_file:
+            json.dump(manifest, json_file)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+    def load(self, key: str) -> Optional[Dict[str, pd.DataFrame]]:
+        """
+        Parameters:
+        - key (str): Hash of the workflow inputs
+
+        Returns:
+        - Dict[str, pd.DataFrame]: The stored frames by name, or None if
+        the cache holds no entry for the key
+        """
+        manifest = self._read_manifest(key)
+        if manifest is None:
+            self.misses += 1
+            return None
+        entry_dir = self._entry_dir(key)
+        brass_requirements = {}
+        try:
+            for category, file_name in manifest['categories'].items():
+                table = read_table(os.path.join(entry_dir, file_name))
+                brass_requirements[category] = table_to_frame(
+                    table, self.METADATA_KEY)
+        except (OSError, KeyError, pa.ArrowInvalid):
+            self.misses += 1
+            return None
+        manifest['last_used'] = time.time()
+        self._write_manifest(key, manifest)
+        self.hits += 1
+        return brass_requirements
+
+    def store(self, key: str, brass_requirements: Dict[str, pd.DataFrame]) -> None:
+        """
+        Writes the requirement frames under the key, then evicts old
+        entries if the cache has grown past its size limit
+        """
+        entry_dir = self._entry_dir(key)
+        os.makedirs(entry_dir, exist_ok=True)
+        manifest = {'created': time.time(), 'last_used': time.time(), 'categories': {}}
+        for position, (category, df) in enumerate(brass_requirements.items()):
+            file_name = f'{position}.arrow'
+            write_table(
+                frame_to_table(df, self.METADATA_KEY, keep_index=True),
+                os.path.join(entry_dir, file_name)
+            )
+            manifest['categories'][category] = file_name
+        # The manifest is written last, so an interrupted store is never loaded
+        self._write_manifest(key, manifest)
+        if self.max_bytes is not None:
+            self.evict(self.max_bytes, keep=[key])
+
+    def entries(self) -> List[Dict]:
+        """
+        Returns:
+        - List[Dict]: Key, size, category count and timestamps of every
+        entry, most recently used first
+        """
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            if not self.is_key(key):
+                continue
+            try:
+                entry_dir = self._entry_dir(key)
+            except ValueError:
+                continue
+            manifest = self._read_manifest(key)
+            if manifest is None:
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(entry_dir, file_name))
+                for file_name in os.listdir(entry_dir)
+            )
+            entries.append({
+                'key': key,
+                'bytes': size,
+                'categories': len(manifest['categories']),
+                'created': manifest['created'],
+                'last_used': manifest['last_used'],
+            })
+        return sorted(entries, key=lambda entry: entry['last_used'], reverse=True)
+
+    def evict(self, max_bytes: int, keep: Optional[List[str]] = None) -> List[str]:
+        """
+        Removes the least recently used entries until the cache fits in
+        'max_bytes', never removing the keys in 'keep'
+
+        Returns:
+        - List[str]: The keys that were removed
+        """
+        keep = keep or []
+        entries = self.entries()
+        total_bytes = sum(entry['bytes'] for entry in entries)
+        evicted = []
+        for entry in reversed(entries):
+            if total_bytes <= max_bytes:
+                break
+            if entry['key'] in keep:
+                continue
+            shutil.rmtree(self._entry_dir(entry['key']), ignore_errors=True)
+            total_bytes -= entry['bytes']
+            evicted.append(entry['key'])
+        return evicted
+
+    def purge(self, key: Optional[str] = None) -> int:
+        """
+        Removes one entry, or every entry when no key is given. Only
+        directories holding a manifest are removed
+
+        Returns:
+        - int: The number of entries removed
+
+        Raises:
+        - ValueError: If the key is not a well-formed content hash
+        """
+        keys = [key] if key is not None else [
+            entry['key'] for entry in self.entries()]
+        removed = 0
+        for entry_key in keys:
+            if self._read_manifest(entry_key) is None:
+                continue
+            shutil.rmtree(self._entry_dir(entry_key), ignore_errors=True)
+            removed += 1
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+
+class SheetSnapshotCache:
+    """
+    Local snapshot of 'live_sheets' stored as Arrow IPC files,
+    one file per sheet, grouped by spreadsheet key.
+
+    A snapshot is fresh when the spreadsheet revision (its modified time)
+    is unchanged, or, when no revision is available, while it is younger
+    than 'ttl_seconds'
+    """
+    MANIFEST_FILE = 'manifest.json'
+
+    def __init__(self, cache_dir: str, ttl_seconds: float = 600):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    def _spreadsheet_dir(self, spreadsheet_key: str) -> str:
+        key_hash = hashlib.sha1(str(spreadsheet_key).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, key_hash)
+
+    @staticmethod
+    def _sheet_file_name(sheet_title: str) -> str:
+        return hashlib.sha1(sheet_title.encode()).hexdigest()[:16] + '.arrow'
+
+    def _read_manifest(self, spreadsheet_key: str) -> Optional[Dict]:
+        manifest_path = os.path.join(
+            self._spreadsheet_dir(spreadsheet_key), self.MANIFEST_FILE)
+        try:
+            with open(manifest_path, 'r') as json_file:
+                return json.load(json_file)
+        except (OSError, ValueError):
+            return None
+
+    def _is_fresh(self, manifest: Dict, revision: Optional[str]) -> bool:
+        if revision is not None and manifest.get('revision') is not None:
+            return revision == manifest['revision']
+        return time.time() - manifest.get('fetched_at', 0) < self.ttl_seconds
+
+    def load(
+        self, spreadsheet_key: str, sheet_titles: Optional[List[str]] = None,
+        revision: Optional[str] = None
+    ) -> Optional[Dict[str, pd.DataFrame]]:
+        """
+        Loads the cached sheets when the snapshot is still fresh
+
+        Parameters:
+        - spreadsheet_key (str): Key of the spreadsheet the sheets belong to
+        - sheet_titles (List[str]): Titles to load, None for every cached sheet
+        of a snapshot that was taken of the whole spreadsheet
+        - revision (str): Current revision of the spreadsheet, if known
+
+        Returns:
+        - Dict[str, pd.DataFrame]: The sheets keyed by title, or None on a miss
+        """
+        manifest = self._read_manifest(spreadsheet_key)
+        if sheet_titles is None:
+            complete = manifest is not None and manifest.get('all_sheets', False)
+            titles = list(manifest['sheets']) if complete else []
+        else:
+            complete = manifest is not None and all(
+                title in manifest['sheets'] for title in sheet_titles)
+            titles = sheet_titles
+        if not complete or not self._is_fresh(manifest, revision):
+            self.misses += max(len(titles), 1)
+            return None
+        spreadsheet_dir = self._spreadsheet_dir(spreadsheet_key)
+        live_sheets = {}
+        for title in titles:
+            sheet_entry = manifest['sheets'][title]
+            sheet_path = os.path.join(spreadsheet_dir, sheet_entry['file'])
+            try:
+                live_sheets[title] = self._read_sheet(sheet_path, sheet_entry)
+            except (OSError, pa.ArrowInvalid):
+                self.misses += len(titles)
+                return None
+        self.hits += len(titles)
+        return live_sheets
+
+    @staticmethod
+    def _read_sheet(sheet_path: str, sheet_entry: Dict) -> pd.DataFrame:
+        with pa.memory_map(sheet_path, 'r') as source:
+            table = pa.ipc.open_file(source).read_all()
+        df = table.to_pandas()
+        # Sheet headers may be blank or repeated, so they are kept in the manifest
+        df.columns = pd.Index(
+            sheet_entry['columns'], name=sheet_entry.get('columns_name'))
+        return df
+
+    def store(
+        self, spreadsheet_key: str, live_sheets: Dict[str, pd.DataFrame],
+        revision: Optional[str] = None, all_sheets: bool = False
+    ):
+        """
+        Writes a snapshot of the sheets and records the revision it was taken at
+        """
+        spreadsheet_dir = self._spreadsheet_dir(spreadsheet_key)
+        os.makedirs(spreadsheet_dir, exist_ok=True)
+        manifest = {
+            'revision': revision,
+            'fetched_at': time.time(),
+            'all_sheets': all_sheets,
+            'sheets': {},
+        }
+        for title, df in live_sheets.items():
+            file_name = self._sheet_file_name(title)
+            positional_df = df.set_axis(
+                [str(i) for i in range(df.shape[1])], axis=1)
+            table = pa.Table.from_pandas(positional_df, preserve_index=False)
+            temporary_path = os.path.join(spreadsheet_dir, file_name + '.tmp')
+            with pa.OSFile(temporary_path, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(temporary_path, os.path.join(spreadsheet_dir, file_name))
+            columns_name = df.columns.name
+            manifest['sheets'][title] = {
+                'file': file_name,
+                'columns': [str(column) for column in df.columns],
+                'columns_name': columns_name if isinstance(
+                    columns_name, (str, int)) else None,
+            }
+        manifest_path = os.path.join(spreadsheet_dir, self.MANIFEST_FILE)
+        with open(manifest_path + '.tmp', 'w') as json_file:
+            json.dump(manifest, json_file)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
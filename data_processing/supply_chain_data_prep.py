@@ -1,9 +1,20 @@
 from typing import List, Dict
+import re
 
+import numpy as np
 import pandas as pd
 
 from data_processing.constants import RAW_BRASS_STOCK
 
+# One lookahead per stock type, tried in list order from the start of the
+# description, so the earliest stock in RAW_BRASS_STOCK found anywhere wins
+MATERIAL_TYPE_PATTERN = re.compile(
+    '^(?:' + '|'.join(
+        f'(?=.*?({re.escape(stock_name.lower())}))' for stock_name in RAW_BRASS_STOCK
+    ) + ')',
+    re.DOTALL
+)
+
 
 class SupplyChainDataPrep:
     def __init__(self, live_sheets: Dict[str, pd.DataFrame]):
@@ -34,13 +45,14 @@ class SupplyChainDataPrep:
         if sheet_name not in self.live_sheets:
             raise ValueError(
                 f'Sheet name \'{sheet_name}\' not in provided data.')
-        df = self.live_sheets[sheet_name].copy()
+        df = self.live_sheets[sheet_name]
         condition = pd.Series([True] * len(df), index=df.index)
 
         for col in condition_columns:
             if col in df.columns:
                 condition &= (df[col].isna() | ('' == df[col]))
-        orders = df[condition].copy()
+        # Selecting the rows already copies them, away from the live sheet
+        orders = df[condition].copy(deep=False)
         # Convert values in numeric columns to int64
         for column in ['P.O', 'QTY']:
             orders.loc[:, column] = pd.to_numeric(
@@ -66,9 +78,10 @@ class SupplyChainDataPrep:
         if sheet_name not in self.live_sheets:
             raise ValueError(
                 f'Sheet name \'{sheet_name}\' not in provided data.')
-        df = self.live_sheets[sheet_name].copy()
+        df = self.live_sheets[sheet_name]
         new_header = df.iloc[0, 1:]
-        df = df.iloc[1:, 1:].copy()
+        # Only whole columns are replaced below, so the live sheet is untouched
+        df = df.iloc[1:, 1:].copy(deep=False)
         df.columns = new_header
         df.reset_index(drop=True, inplace=True)
         # Replace '-' with 0 in 'Minimum Stock in kgs' column
@@ -80,18 +93,7 @@ class SupplyChainDataPrep:
             df[col] = pd.to_numeric(df[col], errors='coerce')
         df = df.dropna(subset=columns_to_convert)
         # Add column for material type
-        df['Material Type'] = None
-        for index, row in df.iterrows():
-            first_col = str(row[df.columns[0]]).lower()
-            matched_stock = next(
-                (
-                    stock_name for stock_name in RAW_BRASS_STOCK
-                    if stock_name.lower() in first_col
-                ),
-                None
-            )
-            if matched_stock:
-                df.at[index, 'Material Type'] = matched_stock
+        df['Material Type'] = self.tag_material_types(df[df.columns[0]])
         # Correctly name columns
         rename_dict = {
             'ROUND ROD': 'Dimensions',
@@ -106,3 +108,23 @@ class SupplyChainDataPrep:
         ]
         df_reordered = df_renamed[column_order]
         return df_reordered
+
+    @staticmethod
+    def tag_material_types(descriptions: pd.Series) -> pd.Series:
+        """
+        Tags each stock description with the first stock type
+        from RAW_BRASS_STOCK that it mentions
+
+        Parameters:
+        - descriptions (pd.Series): Descriptions of the raw stock
+
+        Returns:
+        - pd.Series: Categorical stock types, missing where none is mentioned
+        """
+        matches = descriptions.astype(str).str.lower().str.extract(
+            MATERIAL_TYPE_PATTERN).notna().to_numpy()
+        codes = np.where(matches.any(axis=1), matches.argmax(axis=1), -1)
+        return pd.Series(
+            pd.Categorical.from_codes(codes, categories=RAW_BRASS_STOCK),
+            index=descriptions.index
+        )
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from data_processing.columnar_frames import (
+    frame_to_table, read_layout, read_table, table_to_frame, write_table
+)
+
+
+class WorkbookSidecarCache:
+    """
+    Keeps a columnar (Arrow IPC / Feather) copy of Excel workbooks so that
+    openpyxl only parses a workbook again after it changes on disk.
+
+    A sidecar is keyed by the workbook path and the columns it holds,
+    and records the modified time and size of the workbook it was built
+    from. A sidecar whose workbook has a different modified time or size
+    is stale and gets rebuilt
+    """
+    METADATA_KEY = 'workbook'
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    def read_workbook(
+        self, file_path: str, all_sheets: bool = False,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Reads a workbook through its sidecar, rebuilding the sidecar when stale
+
+        Parameters:
+        - file_path (str): Path to the Excel workbook
+        - all_sheets (bool): Concatenate every sheet instead of reading the first
+        - columns (List[str]): Only keep these columns
+
+        Returns:
+        - pd.DataFrame: The same frame pd.read_excel would have produced
+        """
+        source_stat = os.stat(file_path)
+        sidecar_path = self._sidecar_path(file_path, all_sheets, columns)
+        df = self._read_sidecar(sidecar_path, source_stat)
+        if df is not None:
+            self.hits += 1
+            return df
+        self.misses += 1
+        if all_sheets:
+            sheets = pd.read_excel(file_path, sheet_name=None)
+            df = pd.concat(sheets.values(), ignore_index=True)
+        else:
+            df = pd.read_excel(file_path)
+        if columns is not None:
+            df = df[columns]
+        self._write_sidecar(sidecar_path, source_stat, df)
+        return df
+
+    def _sidecar_path(
+        self, file_path: str, all_sheets: bool, columns: Optional[List[str]]
+    ) -> str:
+        key = json.dumps([os.path.abspath(file_path), all_sheets, columns])
+        file_name = hashlib.sha1(key.encode()).hexdigest()[:16] + '.feather'
+        return os.path.join(self.cache_dir, file_name)
+
+    def _read_sidecar(
+        self, sidecar_path: str, source_stat: os.stat_result
+    ) -> Optional[pd.DataFrame]:
+        try:
+            table = read_table(sidecar_path)
+        except (OSError, pa.ArrowInvalid):
+            return None
+        metadata = read_layout(table, self.METADATA_KEY)
+        if (metadata['mtime_ns'], metadata['size']) != (
+                source_stat.st_mtime_ns, source_stat.st_size):
+            return None
+        return table_to_frame(table, self.METADATA_KEY)
+
+    def _write_sidecar(
+        self, sidecar_path: str, source_stat: os.stat_result, df: pd.DataFrame
+    ):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        metadata = {
+            'mtime_ns': source_stat.st_mtime_ns,
+            'size': source_stat.st_size,
+        }
+        write_table(
+            frame_to_table(df, self.METADATA_KEY, metadata), sidecar_path)
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
@@ -1,4 +1,9 @@
+from .pipeline_context import PipelineContext
+from .stage_executor import StageExecutor
 from .calculation_manager import CalculationManager
 from .data_preparer import DataPreparer
 from .exception_manager import ExceptionManager
 from .brass_requirements_summary import BrassStockRequirementsSummary
+from .incremental_requirements_summary import (
+    IncrementalRequirementsSummary, RequirementsStateStore
+)
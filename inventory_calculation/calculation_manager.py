@@ -1,20 +1,25 @@
-from product_profile_calculator import ProfileCalculator
+from inventory_calculation.pipeline_context import PipelineContext
 
 
 class CalculationManager:
-    def __init__(self, config, live_sheets) -> None:
-        """Initialize the CalculationManager with a ProfileCalculator instance."""
+    def __init__(self, config, live_sheets, pipeline_context=None) -> None:
+        """
+        Initialize the CalculationManager with a shared PipelineContext.
+        A new context is created when none is provided.
+        """
         self.live_sheets = live_sheets
-        self.profile_calculator = ProfileCalculator(config, live_sheets)
-        self.brass_requirements = {}
+        if pipeline_context is None:
+            pipeline_context = PipelineContext(config, live_sheets)
+        self.pipeline_context = pipeline_context
+        self.profile_calculator = self.pipeline_context.profile_calculator
+        self.component_table = None
         
     def calculate_requirements(self):
         """
-        Executes the profile calculation workflow to calculate brass requirements
-        for each product.
+        Executes the profile calculation workflow to calculate the brass
+        requirements of each product component.
         """
-        self.brass_requirements = self.profile_calculator.execute_workflow()
+        self.component_table = self.pipeline_context.get_component_table()
         
-    def get_brass_requirements(self):
-        return self.brass_requirements
-        
\ No newline at end of file
+    def get_component_table(self):
+        return self.component_table
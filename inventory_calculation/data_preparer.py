@@ -1,50 +1,47 @@
 from data_modeling.products.open_orders import OrdersDataModeler
-from utils import get_column_by_keyword, remove_textures
+from data_processing.column_schema import apply_compact_schema
+from utils import get_column_by_keyword, remove_textures_series, with_columns
 
 
 class DataPreparer(OrdersDataModeler):
     def __init__(self, live_sheets) -> None:
         super().__init__(live_sheets)
-        self.shape_patterns = {
-            'Circular': ('Circular_Area_{i}_Matched_FirstCol', 'Circular_Area_{i}_Matched_SecondCol', 'Cylinder_{i}_Volume'),
-            'Rectangular': ('Rectangular_Area_{i}_Matched_FirstCol', 'Rectangular_Area_{i}_Matched_SecondCol', 'Cuboid_{i}_Volume'),
-            'Square': ('Square_Area_1_Matched_FirstCol', 'Square_Area_1_Matched_SecondCol', 'Squared_1_Volume'),
-            'Fixed': ('Matched_FirstCol', 'Matched_SecondCol', 'Sheet_Volume', 'IsForged')
-        }
-        self.ranges_for_shapes = {
-            'Circular': range(1, 4),
-            'Rectangular': range(1, 3),
-            'Square': range(1, 2),
-            'Fixed': range(1)
-        }
-
-        self.lookup_columns = []
-        self.products_dataframe = self.orders_dataframe.copy()
-        self.prepare_dataframe()
+        self._products_dataframe = None
+
+    @property
+    def products_dataframe(self):
+        """The open orders with their generic product codes, prepared on first use"""
+        if self._products_dataframe is None:
+            self._products_dataframe = self.orders_dataframe
+            self.prepare_dataframe()
+        return self._products_dataframe
+
+    @products_dataframe.setter
+    def products_dataframe(self, products_dataframe):
+        self._products_dataframe = products_dataframe
 
     def clean_and_prepare_data(self):
         pass
 
+    def generic_product_codes(self, df):
+        """
+        Returns:
+        - pd.Series: The generic product code of every order line, or None
+        when the lines have no item column or already have their codes
+        """
+        item_column = get_column_by_keyword(df, 'item')
+        if item_column in df.columns and 'Generic_Product_Code' not in df.columns:
+            return remove_textures_series(df[item_column])
+        return None
+
     def add_generic_product_name(self, df):
-        df_copy = df.copy()
-        item_column = get_column_by_keyword(df_copy, 'item')
-        if item_column in df_copy.columns and 'Generic_Product_Code' not in df.columns:
-            df_copy['Generic_Product_Code'] = df_copy[item_column].apply(
-                remove_textures)
-        return df_copy
-
-    def initialize_lookup_columns(self):
-        for shape, patterns in self.shape_patterns.items():
-            range_for_i = self.ranges_for_shapes[shape]
-            for i in range_for_i:
-                columns = [p.format(i=i) for p in patterns] if shape != 'Fixed' else list(
-                    patterns)
-                self.lookup_columns.extend(columns)
-        for column in self.lookup_columns:
-            self.products_dataframe[column] = 0
+        generic_product_codes = self.generic_product_codes(df)
+        if generic_product_codes is None:
+            return df
+        return with_columns(df, {'Generic_Product_Code': generic_product_codes})
 
     def prepare_dataframe(self):
         self.products_dataframe = self.add_generic_product_name(
             self.products_dataframe
         )
-        self.initialize_lookup_columns()
+        self.products_dataframe = apply_compact_schema(self.products_dataframe)
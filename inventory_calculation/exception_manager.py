@@ -1,33 +1,62 @@
+from functools import cached_property
+
+import pandas as pd
+
 from inventory_calculation import CalculationManager, DataPreparer
+from inventory_calculation.pipeline_context import PipelineContext
 
-from utils import get_column_by_keyword
+from utils import get_column_by_keyword, with_columns
 
 
 class ExceptionManager:
     def __init__(
-        self, config, live_sheets
+        self, config, live_sheets, pipeline_context: PipelineContext = None
     ) -> None:
         self.live_sheets = live_sheets
-        self.calculation_manager = CalculationManager(config, live_sheets)
-        self.data_preparer = DataPreparer(live_sheets)
-        self.items_df = self.data_preparer.products_dataframe
+        if pipeline_context is None:
+            pipeline_context = PipelineContext(config, live_sheets)
+        self.pipeline_context = pipeline_context
+        self.calculation_manager = CalculationManager(
+            config, live_sheets, self.pipeline_context)
+
+    @cached_property
+    def data_preparer(self) -> DataPreparer:
+        return self.pipeline_context.get_data_preparer()
+
+    @cached_property
+    def items_df(self) -> pd.DataFrame:
+        # The prepared orders are shared, so forged products are flagged on
+        # a new frame rather than on them
+        return self.data_preparer.products_dataframe
 
     def mark_forged_products(self):
-        self.calculation_manager.calculate_requirements()
-        self.brass_requirements = self.calculation_manager.get_brass_requirements()
-        scrap_dataframe = self.brass_requirements.get('Scrap')
-        item_column = get_column_by_keyword(scrap_dataframe, 'item')
+        # Forged products are those of the Scrap engineering category
+        scrap_dataframe = self.pipeline_context.get_engineering_categories().get('Scrap')
         if scrap_dataframe is not None:
+            item_column = get_column_by_keyword(scrap_dataframe, 'item')
             forged_products = scrap_dataframe[item_column].tolist()
-            self.items_df['IsForged'] = self.items_df['Generic_Product_Code'].apply(
-                lambda product: product in forged_products
-            )
+            self.items_df = with_columns(self.items_df, {
+                'IsForged': self.items_df['Generic_Product_Code'].apply(
+                    lambda product: product in forged_products
+                )
+            })
 
     def handle_unmatched_rows(self):
+        """
+        Returns:
+        - pd.DataFrame: The order lines whose product has no component
+        matched to stock or with a volume, forged products (those of the
+        Scrap category) aside
+        """
         df = self.items_df
-        unmatched_criteria = df[self.data_preparer.lookup_columns].eq(
-            0).all(axis=1)
-        unmatched_rows = df[unmatched_criteria].copy()
+        self.calculation_manager.calculate_requirements()
+        component_table = self.calculation_manager.get_component_table()
+        unmatched_criteria = ~df['Generic_Product_Code'].isin(
+            component_table['Generic_Product_Code'])
+        if 'IsForged' in df.columns:
+            unmatched_criteria &= ~df['IsForged']
+        # Selecting the rows already copies them
+        unmatched_rows = df[unmatched_criteria].copy(deep=False)
         return unmatched_rows
 
     def execute(self):
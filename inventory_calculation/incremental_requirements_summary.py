@@ -0,0 +1,197 @@
+import os
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from inventory_calculation.brass_requirements_summary import BrassStockRequirementsSummary
+from inventory_calculation.pipeline_context import PipelineContext
+from utils import instrumentation, with_columns
+
+
+class RequirementsStateStore:
+    """
+    Keeps the state of the last requirements run on disk: the component
+    table, the keyed order lines and the per-stock totals
+    """
+    STATE_FILE = 'requirements_state.pkl'
+    STATE_VERSION = 2
+
+    def __init__(self, state_dir: str) -> None:
+        self.state_dir = state_dir
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(self.state_dir, self.STATE_FILE)
+
+    def load(self) -> Optional[Dict]:
+        """
+        Returns:
+        - dict: The state saved by the last run, or None if there is none
+        """
+        if not os.path.exists(self.state_path):
+            return None
+        try:
+            state = pd.read_pickle(self.state_path)
+        except Exception as e:
+            print(f'Error loading requirements state: {e}')
+            return None
+        if not isinstance(state, dict) or state.get('version') != self.STATE_VERSION:
+            return None
+        return state
+
+    def store(self, state: Dict) -> None:
+        os.makedirs(self.state_dir, exist_ok=True)
+        temporary_path = self.state_path + '.tmp'
+        pd.to_pickle(dict(state, version=self.STATE_VERSION), temporary_path)
+        os.replace(temporary_path, self.state_path)
+
+
+class IncrementalRequirementsSummary(BrassStockRequirementsSummary):
+    """
+    Brass requirements that are updated from the previous run instead of
+    being recomputed from scratch.
+
+    Order lines are keyed by P.O and ITEM (and their position among lines
+    sharing that key). Only lines added, removed or changed since the last
+    run are joined to their components, and their volumes are added to or
+    taken off the saved per-stock totals. The product profiles (areas,
+    stock matching, volumes) and so the component table are only
+    recomputed when the reference workbooks, the hardcoded dimensions or
+    the stock sheet change
+    """
+    ORDER_KEY_COLUMNS: List[str] = ['P.O', 'ITEM']
+
+    def __init__(
+        self, config, live_sheets, state_store: RequirementsStateStore,
+        pipeline_context: PipelineContext = None
+    ) -> None:
+        if pipeline_context is None:
+            pipeline_context = PipelineContext(config, live_sheets)
+        self.config = config
+        self.live_sheets = live_sheets
+        self.pipeline_context = pipeline_context
+        self.state_store = state_store
+        self.order_changes: Dict[str, int] = {'added': 0, 'removed': 0, 'changed': 0}
+        self.profiles_recomputed = False
+
+    @cached_property
+    def updated_requirements(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Brings the previous run up to date with the current orders,
+        saving the result for the next run
+
+        Returns:
+        - tuple: The keyed order lines and the per-stock totals
+        """
+        order_lines = self.key_order_lines(self.data_preparer.products_dataframe)
+        profile_fingerprint = self.pipeline_context.profile_inputs_key()
+        state = self.state_store.load()
+        if state is None or state['profile_fingerprint'] != profile_fingerprint:
+            self.component_table = self.pipeline_context.get_component_table()
+            self.profiles_recomputed = True
+            items_df = order_lines
+            volume_totals = self.sum_volume_families(items_df)
+            self.order_changes['added'] = len(order_lines)
+        else:
+            self.component_table = state['component_table']
+            items_df, volume_totals = self.apply_order_changes(
+                state['items_df'], state['volume_totals'], order_lines)
+        self.state_store.store({
+            'profile_fingerprint': profile_fingerprint,
+            'component_table': self.component_table,
+            'items_df': items_df,
+            'volume_totals': volume_totals,
+        })
+        return items_df, volume_totals
+
+    @cached_property
+    def items_df(self) -> pd.DataFrame:
+        return self.updated_requirements[0]
+
+    @cached_property
+    def volume_totals(self) -> pd.DataFrame:
+        return self.updated_requirements[1]
+
+    @cached_property
+    def aggregated_results(self) -> pd.DataFrame:
+        return self.volume_totals.drop(columns='Lines')
+
+    def key_order_lines(self, products_dataframe: pd.DataFrame) -> pd.DataFrame:
+        """
+        Numbers the lines sharing a P.O and ITEM and hashes every line, so
+        that a line is matched to its previous run by its hash alone
+        """
+        order_lines = with_columns(products_dataframe, {
+            'Line Occurrence': products_dataframe.groupby(
+                self.ORDER_KEY_COLUMNS, dropna=False, observed=True).cumcount()
+        })
+        order_columns = list(self.data_preparer.orders_dataframe.columns) + [
+            'Line Occurrence']
+        order_lines['Line Hash'] = pd.util.hash_pandas_object(
+            order_lines[order_columns], index=False).to_numpy()
+        return order_lines
+
+    def sum_volume_families(self, items_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Sums the volume and counts the order lines of every stock within
+        each volume family
+        """
+        long_volumes = self.join_line_components(items_df)
+        return long_volumes.groupby(
+            ['Volume Family', 'FirstCol', 'SecondCol'], observed=True
+        )['Volume'].agg(Volume='sum', Lines='size').reset_index()
+
+    @instrumentation.instrumented(
+        'summary: apply order changes',
+        rows_in=lambda summary, previous_items_df, previous_totals, order_lines: order_lines
+    )
+    def apply_order_changes(
+        self, previous_items_df: pd.DataFrame, previous_totals: pd.DataFrame,
+        order_lines: pd.DataFrame
+    ) -> tuple:
+        """
+        Adds the volumes of the lines that are new or changed since the
+        previous run to the totals, and moves the volumes of changed and
+        removed lines out of them
+
+        Returns:
+        - tuple: The current order lines and the updated per-stock totals
+        """
+        previous_hashes = previous_items_df['Line Hash'].to_numpy()
+        current_hashes = order_lines['Line Hash'].to_numpy()
+        kept_lines = np.isin(previous_hashes, current_hashes)
+        new_lines = ~np.isin(current_hashes, previous_hashes)
+        stale_lines = previous_items_df[~kept_lines]
+        fresh_lines = order_lines[new_lines]
+
+        changed_keys = pd.merge(
+            stale_lines[self.ORDER_KEY_COLUMNS + ['Line Occurrence']],
+            fresh_lines[self.ORDER_KEY_COLUMNS + ['Line Occurrence']]
+        )
+        self.order_changes = {
+            'added': len(fresh_lines) - len(changed_keys),
+            'removed': len(stale_lines) - len(changed_keys),
+            'changed': len(changed_keys),
+        }
+        if stale_lines.empty and fresh_lines.empty:
+            return order_lines, previous_totals
+
+        removed_totals = self.sum_volume_families(stale_lines)
+        removed_totals[['Volume', 'Lines']] *= -1
+        volume_totals = pd.concat(
+            [previous_totals, self.sum_volume_families(fresh_lines), removed_totals],
+            ignore_index=True
+        )
+        volume_totals['Volume Family'] = pd.Categorical(
+            volume_totals['Volume Family'].astype(object),
+            categories=list(self.generate_volume_mapping().values()))
+        for column in ['FirstCol', 'SecondCol']:
+            volume_totals[column] = volume_totals[column].astype(object).astype('category')
+        volume_totals = volume_totals.groupby(
+            ['Volume Family', 'FirstCol', 'SecondCol'], observed=True
+        )[['Volume', 'Lines']].sum().reset_index()
+        # A stock no order line uses any more would not show up in a full run
+        volume_totals = volume_totals[volume_totals['Lines'] > 0].reset_index(drop=True)
+        return order_lines, volume_totals
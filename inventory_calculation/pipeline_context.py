@@ -0,0 +1,259 @@
+import hashlib
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from data_processing import ProfileRequirementsCache
+from inventory_calculation.data_preparer import DataPreparer
+from inventory_calculation.stage_executor import StageExecutor
+from product_profile_calculator import ProductComponents, ProfileCalculator
+
+
+class PipelineContext:
+    """
+    Shared, build-once store for the outputs of every pipeline stage.
+    Each stage is computed the first time it is requested and reused
+    by every consumer that is handed the same context
+    """
+    # Stages that must be computed before each stage can be computed
+    STAGE_DEPENDENCIES: Dict[str, List[str]] = {
+        'orders': [],
+        'stock_inventory': [],
+        'engineering_categories': [],
+        'component_areas': ['engineering_categories'],
+        'component_table': ['stock_inventory', 'component_areas'],
+    }
+    # What a full run of the pipeline needs, and so what execute() computes
+    DEFAULT_TARGETS: List[str] = [
+        'orders', 'stock_inventory', 'engineering_categories', 'component_table'
+    ]
+    # Everything the product profile workflow reads
+    PROFILE_INPUT_PATHS: List[str] = [
+        'ORDERED_ITEMS_MATERIAL_REQUIREMENTS_PATH',
+        'REGULAR_ITEMS_MATERIAL_REQUIREMENTS_PATH',
+        'HARDCODED_DATA_FILEPATH',
+    ]
+    STOCK_SHEET_TITLE = 'RAW MATERIALS MAIN ORDERS'
+    # Bump whenever the profile workflow changes what it computes
+    PROFILE_WORKFLOW_VERSION = 3
+    PROFILE_CACHE_FRAME = 'component_table'
+
+    def __init__(
+        self, config, live_sheets,
+        profile_cache: ProfileRequirementsCache = None
+    ) -> None:
+        self.config = config
+        self.live_sheets = live_sheets
+        self.profile_cache = profile_cache
+        self.profile_calculator = ProfileCalculator(config, live_sheets)
+        self.stage_dependencies = dict(self.STAGE_DEPENDENCIES)
+        if self.profile_calculator.category_workers is not None:
+            # Each category runs its own area -> match -> volume chain
+            self.stage_dependencies['component_table'] = [
+                'stock_inventory', 'engineering_categories']
+        self._profile_inputs_key = None
+        self._stage_results: Dict[str, Any] = {}
+        self.stage_computations: Dict[str, int] = {}
+        self.saved_computations: Dict[str, int] = {}
+        self.last_execution: Optional[Dict[str, Any]] = None
+
+    def _stage_functions(self) -> Dict[str, Callable[..., Any]]:
+        """
+        The function computing each stage, taking the outputs of the
+        stage's dependencies as keyword arguments
+        """
+        return {
+            'orders': self._compute_orders,
+            'stock_inventory':
+                lambda: self.profile_calculator.brass_stock_modeler.inventory_dict,
+            'engineering_categories':
+                lambda: self.profile_calculator.dimension_updater.product_engineering_categories,
+            'component_areas':
+                lambda engineering_categories:
+                    self.profile_calculator.calculate_component_areas(engineering_categories),
+            'component_table': self._compute_component_table
+            if self.profile_calculator.category_workers is None
+            else self._compute_component_table_per_category,
+        }
+
+    def _get_stage(self, stage_name: str) -> Any:
+        """
+        Returns the memoized output of a stage, computing it and the
+        stages it depends on on first use
+        """
+        if stage_name in self._stage_results:
+            # A fresh run would have recomputed this stage and its upstream
+            for saved_stage in self._upstream_stages(stage_name):
+                self.saved_computations[saved_stage] = \
+                    self.saved_computations.get(saved_stage, 0) + 1
+            return self._stage_results[stage_name]
+        if 'component_table' == stage_name:
+            # A cached component table makes the whole profile branch unnecessary
+            cached_component_table = self._load_cached_component_table()
+            if cached_component_table is not None:
+                self._stage_results[stage_name] = cached_component_table
+                return cached_component_table
+        dependencies = {
+            dependency: self._get_stage(dependency)
+            for dependency in self.stage_dependencies[stage_name]
+        }
+        result = self._stage_functions()[stage_name](**dependencies)
+        self._stage_results[stage_name] = result
+        self._count_computation(stage_name)
+        return result
+
+    def _count_computation(self, stage_name: str) -> None:
+        self.stage_computations[stage_name] = \
+            self.stage_computations.get(stage_name, 0) + 1
+
+    def execute(
+        self, targets: Optional[List[str]] = None, max_workers: int = 4,
+        mode: str = 'threads'
+    ) -> Dict[str, Any]:
+        """
+        Computes the target stages, and every stage they need, running
+        independent branches concurrently. Stages computed earlier are reused
+
+        Parameters:
+        - targets (List[str]): The stages to compute, DEFAULT_TARGETS by default
+        - max_workers (int): Stages allowed to run at the same time
+        - mode (str): 'threads' or 'serial'; the stages are bound to this
+        context, so they cannot be sent to worker processes
+
+        Returns:
+        - dict: The executor's report, with the critical path of the run
+        """
+        targets = list(self.DEFAULT_TARGETS) if targets is None else targets
+        if 'component_table' in targets and 'component_table' not in self._stage_results:
+            cached_component_table = self._load_cached_component_table()
+            if cached_component_table is not None:
+                self._stage_results['component_table'] = cached_component_table
+        needed_stages: List[str] = []
+        for target in targets:
+            for stage in self._needed_stages(target):
+                if stage not in needed_stages:
+                    needed_stages.append(stage)
+        stage_functions = self._stage_functions()
+        stages = {
+            stage: (self.stage_dependencies[stage], stage_functions[stage])
+            for stage in needed_stages
+        }
+        computed_before = set(self._stage_results)
+        report = StageExecutor(max_workers, mode).run(stages, self._stage_results)
+        for stage in set(self._stage_results) - computed_before:
+            self._count_computation(stage)
+        self.last_execution = report
+        return report
+
+    def _needed_stages(self, stage_name: str) -> List[str]:
+        """The stage and the upstream stages whose outputs it still needs"""
+        if stage_name in self._stage_results:
+            return [stage_name]
+        stages = [stage_name]
+        for dependency in self.stage_dependencies[stage_name]:
+            for stage in self._needed_stages(dependency):
+                if stage not in stages:
+                    stages.append(stage)
+        return stages
+
+    def _upstream_stages(self, stage_name: str) -> List[str]:
+        stages = [stage_name]
+        for dependency in self.stage_dependencies[stage_name]:
+            for stage in self._upstream_stages(dependency):
+                if stage not in stages:
+                    stages.append(stage)
+        return stages
+
+    def get_data_preparer(self) -> DataPreparer:
+        """Open orders prepared with their generic product codes"""
+        return self._get_stage('orders')
+
+    def _compute_orders(self) -> DataPreparer:
+        data_preparer = DataPreparer(self.live_sheets)
+        # Built here, so that the orders branch runs alongside the others
+        data_preparer.products_dataframe
+        return data_preparer
+
+    def get_stock_inventory(self) -> Dict[str, pd.DataFrame]:
+        """Rod and Patti/Sheet inventory built from the raw stock sheet"""
+        return self._get_stage('stock_inventory')
+
+    def get_engineering_categories(self) -> Dict[str, pd.DataFrame]:
+        """Products grouped by stock requirement, with hardcoded dimensions"""
+        return self._get_stage('engineering_categories')
+
+    def get_component_areas(self) -> ProductComponents:
+        """Every product, and the components parsed from its sizes with their areas"""
+        return self._get_stage('component_areas')
+
+    def get_component_table(self) -> pd.DataFrame:
+        """A row per product and component, with its matched stock and volume"""
+        return self._get_stage('component_table')
+
+    def _load_cached_component_table(self) -> Optional[pd.DataFrame]:
+        if self.profile_cache is None:
+            return None
+        cached_frames = self.profile_cache.load(self.profile_inputs_key())
+        if cached_frames is None:
+            return None
+        return cached_frames.get(self.PROFILE_CACHE_FRAME)
+
+    def _compute_component_table(
+        self, stock_inventory: Dict[str, pd.DataFrame],
+        component_areas: ProductComponents
+    ) -> pd.DataFrame:
+        return self._store_component_table(
+            self.profile_calculator.calculate_component_table(
+                component_areas, stock_inventory))
+
+    def _compute_component_table_per_category(
+        self, stock_inventory: Dict[str, pd.DataFrame],
+        engineering_categories: Dict[str, pd.DataFrame]
+    ) -> pd.DataFrame:
+        return self._store_component_table(
+            self.profile_calculator.calculate_component_table_per_category(
+                engineering_categories, stock_inventory))
+
+    def _store_component_table(self, component_table: pd.DataFrame) -> pd.DataFrame:
+        if self.profile_cache is not None:
+            self.profile_cache.store(
+                self.profile_inputs_key(), {self.PROFILE_CACHE_FRAME: component_table})
+        return component_table
+
+    def profile_inputs_key(self) -> str:
+        """
+        Hashes the contents of the reference workbooks, the hardcoded
+        dimensions and the stock sheet, which fully determine the
+        product profiles and so their brass requirements
+        """
+        if self._profile_inputs_key is not None:
+            return self._profile_inputs_key
+        digest = hashlib.sha256(f'v{self.PROFILE_WORKFLOW_VERSION};'.encode())
+        for config_key in self.PROFILE_INPUT_PATHS:
+            file_path = self.config.get(config_key)
+            digest.update(f'{config_key};'.encode())
+            try:
+                with open(file_path, 'rb') as input_file:
+                    for chunk in iter(lambda: input_file.read(2 ** 20), b''):
+                        digest.update(chunk)
+            except (OSError, TypeError):
+                digest.update(b'missing')
+        stock_sheet = self.live_sheets.get(self.STOCK_SHEET_TITLE)
+        if stock_sheet is not None:
+            digest.update(str(list(stock_sheet.columns)).encode())
+            digest.update(pd.util.hash_pandas_object(
+                stock_sheet.astype(str), index=False).to_numpy().tobytes())
+        self._profile_inputs_key = digest.hexdigest()[:ProfileRequirementsCache.KEY_LENGTH]
+        return self._profile_inputs_key
+
+    def report_savings(self) -> Dict[str, int]:
+        """
+        Summarizes how much work the shared context avoided
+
+        Returns:
+        - dict: Stage computations performed and stage computations saved
+        """
+        return {
+            'computed': sum(self.stage_computations.values()),
+            'saved': sum(self.saved_computations.values()),
+        }
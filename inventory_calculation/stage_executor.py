@@ -0,0 +1,187 @@
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+)
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# A stage is the names of the stages it depends on and a function that
+# receives their outputs as keyword arguments
+Stage = Tuple[Sequence[str], Callable[..., Any]]
+
+
+def _run_timed(function: Callable[..., Any], arguments: Dict[str, Any]) -> tuple:
+    # Module level, so that process pools can pickle it
+    start = time.perf_counter()
+    result = function(**arguments)
+    return result, start, time.perf_counter()
+
+
+class StageExecutor:
+    """
+    Runs a DAG of named stages, starting each stage as soon as the
+    stages it depends on have finished, so that independent branches
+    run concurrently.
+
+    'mode' is 'threads', 'processes' or 'serial'. With processes, stage
+    functions, their inputs and their outputs must be picklable
+    """
+    MODES = ('threads', 'processes', 'serial')
+
+    def __init__(self, max_workers: int = 4, mode: str = 'threads') -> None:
+        if mode not in self.MODES:
+            raise ValueError(f'Unknown execution mode \'{mode}\', expected one of {self.MODES}')
+        self.max_workers = max_workers
+        self.mode = mode
+
+    def run(
+        self, stages: Dict[str, Stage], results: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Computes every stage whose output is not in 'results' yet
+
+        Parameters:
+        - stages (Dict[str, Stage]): The stages by name
+        - results (Dict[str, Any]): Outputs computed earlier; new outputs are
+        added to it
+
+        Returns:
+        - dict: Timings of every computed stage, the critical path and its
+        length, the wall time and the time the stages would take one by one
+        """
+        results = {} if results is None else results
+        pending = {
+            name: {dependency for dependency in dependencies if dependency not in results}
+            for name, (dependencies, _) in stages.items() if name not in results
+        }
+        for name, dependencies in pending.items():
+            unknown = [dependency for dependency in dependencies if dependency not in stages]
+            if unknown:
+                raise ValueError(f'Stage \'{name}\' depends on unknown stages {unknown}')
+        timings: Dict[str, Dict[str, float]] = {}
+        start = time.perf_counter()
+        if 'serial' == self.mode:
+            self._run_serially(stages, pending, results, timings)
+        else:
+            executor_class = ThreadPoolExecutor if 'threads' == self.mode \
+                else ProcessPoolExecutor
+            with executor_class(max_workers=self.max_workers) as executor:
+                self._run_concurrently(executor, stages, pending, results, timings)
+        wall_seconds = time.perf_counter() - start
+        for timing in timings.values():
+            timing['start'] = round(timing['start'] - start, 6)
+            timing['end'] = round(timing['end'] - start, 6)
+        critical_path, critical_seconds = self.critical_path(stages, timings)
+        return {
+            'mode': self.mode,
+            'stages': timings,
+            'critical_path': critical_path,
+            'critical_path_seconds': round(critical_seconds, 6),
+            'wall_seconds': round(wall_seconds, 6),
+            'serial_seconds': round(
+                sum(timing['seconds'] for timing in timings.values()), 6),
+        }
+
+    @staticmethod
+    def _ready_stages(pending: Dict[str, set]) -> List[str]:
+        return [name for name, dependencies in pending.items() if not dependencies]
+
+    @staticmethod
+    def _record(
+        name: str, output: tuple, pending: Dict[str, set],
+        results: Dict[str, Any], timings: Dict[str, Dict[str, float]]
+    ) -> None:
+        result, stage_start, stage_end = output
+        results[name] = result
+        timings[name] = {
+            'start': stage_start, 'end': stage_end,
+            'seconds': round(stage_end - stage_start, 6),
+        }
+        for dependencies in pending.values():
+            dependencies.discard(name)
+
+    def _run_serially(self, stages, pending, results, timings) -> None:
+        while pending:
+            ready = self._ready_stages(pending)
+            if not ready:
+                raise ValueError(f'Stages {sorted(pending)} depend on each other')
+            for name in ready:
+                del pending[name]
+                dependencies, function = stages[name]
+                arguments = {dependency: results[dependency] for dependency in dependencies}
+                self._record(
+                    name, _run_timed(function, arguments), pending, results, timings)
+
+    def _run_concurrently(
+        self, executor: Executor, stages, pending, results, timings
+    ) -> None:
+        running = {}
+
+        def submit_ready_stages():
+            for name in self._ready_stages(pending):
+                del pending[name]
+                dependencies, function = stages[name]
+                arguments = {dependency: results[dependency] for dependency in dependencies}
+                running[executor.submit(_run_timed, function, arguments)] = name
+
+        submit_ready_stages()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    output = future.result()
+                except Exception:
+                    for other_future in running:
+                        other_future.cancel()
+                    raise
+                self._record(name, output, pending, results, timings)
+            submit_ready_stages()
+        if pending:
+            raise ValueError(f'Stages {sorted(pending)} depend on each other')
+
+    @staticmethod
+    def critical_path(
+        stages: Dict[str, Stage], timings: Dict[str, Dict[str, float]]
+    ) -> Tuple[List[str], float]:
+        """
+        Finds the chain of dependent stages with the longest total duration,
+        which bounds the latency of the run however many workers there are.
+        Stages computed before the run count as taking no time
+        """
+        longest: Dict[str, Tuple[float, Optional[str]]] = {}
+
+        def path_length(name: str) -> float:
+            if name not in longest:
+                previous, previous_length = None, 0.0
+                for dependency in stages[name][0]:
+                    dependency_length = path_length(dependency)
+                    if previous is None or dependency_length > previous_length:
+                        previous, previous_length = dependency, dependency_length
+                own_seconds = timings.get(name, {}).get('seconds', 0.0)
+                longest[name] = (previous_length + own_seconds, previous)
+            return longest[name][0]
+
+        if not timings:
+            return [], 0.0
+        last_stage = max(timings, key=path_length)
+        path = []
+        stage_name = last_stage
+        while stage_name is not None:
+            if stage_name in timings:
+                path.append(stage_name)
+            stage_name = longest[stage_name][1]
+        return path[::-1], longest[last_stage][0]
+
+    @staticmethod
+    def format_report(report: Dict[str, Any]) -> str:
+        lines = [f"{'Stage':<28}{'Start':>10}{'End':>10}{'Seconds':>10}"]
+        for name, timing in sorted(report['stages'].items(), key=lambda item: item[1]['start']):
+            marker = '*' if name in report['critical_path'] else ' '
+            lines.append(
+                f"{marker}{name:<27}{timing['start']:>10.3f}{timing['end']:>10.3f}"
+                f"{timing['seconds']:>10.3f}")
+        lines.append(
+            f"Critical path (*): {' -> '.join(report['critical_path'])} "
+            f"({report['critical_path_seconds']:.3f}s); wall {report['wall_seconds']:.3f}s, "
+            f"stages one by one {report['serial_seconds']:.3f}s ({report['mode']})")
+        return '\n'.join(lines)
@@ -1,18 +1,103 @@
+import argparse
+
+import pandas as pd
+
 from config import load_config
-from data_processing import GoogleSheetsClient
-from inventory_calculation import BrassStockRequirementsSummary
+from data_processing import (
+    GoogleSheetsClient, ProfileRequirementsCache, SheetSnapshotCache,
+    description_parse_cache
+)
+from data_processing.constants import PIPELINE_SHEET_TITLES
+from inventory_calculation import (
+    BrassStockRequirementsSummary, IncrementalRequirementsSummary,
+    PipelineContext, RequirementsStateStore, StageExecutor
+)
+from utils import instrumentation
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description='Forecast the brass required for open orders')
+    parser.add_argument(
+        '--refresh', action='store_true',
+        help='Ignore the local sheet snapshot and fetch from Google Sheets'
+    )
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help='Update the requirements of the last run from the order changes'
+    )
+    parser.add_argument(
+        '--parallel', action='store_true',
+        help='Run the independent pipeline stages concurrently'
+    )
+    parser.add_argument(
+        '--category-workers', type=int, metavar='N',
+        help='Profile each product category separately on N worker processes, '
+             'or one by one in this process when N is 0 or 1'
+    )
+    parser.add_argument(
+        '--no-copy-on-write', action='store_true',
+        help='Run without pandas copy-on-write, copying frames eagerly'
+    )
+    parser.add_argument(
+        '--profile', action='store_true',
+        help='Time every pipeline stage and print a summary table'
+    )
+    parser.add_argument(
+        '--profile-output', metavar='PATH',
+        help='Append the stage measurements to this JSON lines file'
+    )
+    return parser.parse_args()
 
 
 def main():
+    arguments = parse_arguments()
     config = load_config()
+    # Frames are shared between stages and copied only once they are written
+    pd.set_option('mode.copy_on_write', not arguments.no_copy_on_write)
+    if arguments.category_workers is not None:
+        config['PROFILE_CATEGORY_WORKERS'] = arguments.category_workers
+    if arguments.profile or arguments.profile_output:
+        instrumentation.enable()
     try:
-        google_sheets_client = GoogleSheetsClient(config)
+        snapshot_cache = SheetSnapshotCache(
+            config.get('SHEETS_SNAPSHOT_DIR', '.cache/live_sheets'),
+            ttl_seconds=config.get('SHEETS_SNAPSHOT_TTL_SECONDS', 600)
+        )
+        google_sheets_client = GoogleSheetsClient(
+            config, sheet_titles=PIPELINE_SHEET_TITLES,
+            snapshot_cache=snapshot_cache, refresh=arguments.refresh
+        )
         live_sheets = google_sheets_client.live_sheets
+        print(f'Sheet snapshot cache: {snapshot_cache.stats()}')
 
-        brass_inventory_required = BrassStockRequirementsSummary(
-            config, live_sheets)
-        total_requirements = brass_inventory_required.find_total_requirements()
+        profile_cache = ProfileRequirementsCache(
+            config.get('PROFILE_CACHE_DIR', '.cache/profiles'),
+            max_bytes=config.get('PROFILE_CACHE_MAX_BYTES', 256 * 2 ** 20)
+        )
+        pipeline_context = PipelineContext(config, live_sheets, profile_cache)
+        if arguments.parallel:
+            execution_report = pipeline_context.execute(
+                max_workers=config.get('PIPELINE_MAX_WORKERS', 4))
+            print(StageExecutor.format_report(execution_report))
+        if arguments.incremental:
+            state_store = RequirementsStateStore(
+                config.get('REQUIREMENTS_STATE_DIR', '.cache/requirements'))
+            brass_inventory_required = IncrementalRequirementsSummary(
+                config, live_sheets, state_store, pipeline_context)
+        else:
+            brass_inventory_required = BrassStockRequirementsSummary(
+                config, live_sheets, pipeline_context)
+        total_requirements = brass_inventory_required.total_requirements
         print(total_requirements)
+        if arguments.incremental:
+            print(f'Order changes: {brass_inventory_required.order_changes}')
+        print(f'Profile cache: {profile_cache.stats()}')
+        if instrumentation.enabled:
+            print(instrumentation.summary_table())
+            print(f'Description parse cache: {description_parse_cache.stats()}')
+            if arguments.profile_output:
+                instrumentation.write_jsonl(arguments.profile_output)
     except Exception as e:
         print(f'An error occurred: {e}')
 
@@ -1,4 +1,10 @@
 from .product_area_calculator import ProductAreaCalculator
-from .product_stock_linker import ProductSourceLinker
+from .product_stock_linker import ProductSourceLinker, StockAreaIndex
+from .volume_rules import VOLUME_RULES, VolumeRule, validate_volume_rules
 from .product_volume_calculator import ProductVolumeCalculator
+from .component_table import (
+    VOLUME_FAMILIES, ProductComponents, VolumeFamily, finalize_component_table,
+    join_order_lines, tabulate_products
+)
+from .category_profile_runner import CategoryProfileRunner, CategoryProfiler
 from .profile_calculator import ProfileCalculator
\ No newline at end of file
@@ -0,0 +1,120 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import pandas as pd
+
+from product_profile_calculator.component_table import (
+    ProductComponents, concat_product_components, finalize_component_table, tabulate_products
+)
+from product_profile_calculator.product_area_calculator import ProductAreaCalculator
+from product_profile_calculator.product_stock_linker import ProductSourceLinker
+from product_profile_calculator.product_volume_calculator import ProductVolumeCalculator
+
+
+class CategoryProfiler:
+    """
+    Runs the area -> stock match -> volume chain over the components of one
+    engineering category at a time. The stock indexes are built once and
+    reused for every category
+    """
+    def __init__(self, raw_stock_dict: Dict[str, pd.DataFrame]) -> None:
+        self.raw_stock_dict = raw_stock_dict
+        self.area_calculator = ProductAreaCalculator()
+        self.source_linker = ProductSourceLinker()
+        self.volume_calculator = ProductVolumeCalculator(self.area_calculator)
+        self.stock_indexes = self.source_linker.build_stock_indexes(raw_stock_dict)
+
+    def profile_categories(self, items_dict: Dict[str, pd.DataFrame]) -> ProductComponents:
+        """
+        Parameters:
+        - items_dict (Dict[str, pd.DataFrame]): Products by engineering
+        category, with their dimensions
+
+        Returns:
+        - ProductComponents: The products, and their components matched to
+        stock with their volumes
+        """
+        products = tabulate_products(items_dict)
+        components = self.area_calculator.calculate_component_areas(products)
+        components = self.source_linker.match_components(
+            components, self.raw_stock_dict, self.stock_indexes)
+        components = self.volume_calculator.calculate_volumes(components, products)
+        return ProductComponents(products, components)
+
+    def profile_category(self, category: str, items_df: pd.DataFrame) -> ProductComponents:
+        return self.profile_categories({category: items_df})
+
+
+# The profiler of a worker process, built once from the stock tables
+# the pool hands to every worker when it starts
+_worker_profiler: Optional[CategoryProfiler] = None
+
+
+def _initialize_worker(raw_stock_dict: Dict[str, pd.DataFrame]) -> None:
+    global _worker_profiler
+    _worker_profiler = CategoryProfiler(raw_stock_dict)
+
+
+def _profile_category_in_worker(
+    category: str, items_df: pd.DataFrame
+) -> ProductComponents:
+    return _worker_profiler.profile_category(category, items_df)
+
+
+class CategoryProfileRunner:
+    """
+    Profiles the components of every engineering category, sending each
+    category to a worker process, and gathers them into the component
+    table. The stock tables are pickled once per worker rather than once
+    per category.
+
+    With 'max_workers' of 0 or 1 the categories run one by one in this
+    process, which keeps tracebacks and debuggers usable.
+
+    Workers are spawned rather than forked. The pool may be started from a
+    pipeline stage thread while other stages hold locks (pandas, pyarrow,
+    logging, the description parse cache), and a forked child would
+    inherit those locks held, with no thread left to release them
+    """
+    START_METHOD = 'spawn'
+
+    def __init__(
+        self, max_workers: Optional[int] = None, start_method: str = START_METHOD
+    ) -> None:
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self.start_method = start_method
+
+    def run(
+        self, items_dict: Dict[str, pd.DataFrame],
+        raw_stock_dict: Dict[str, pd.DataFrame]
+    ) -> pd.DataFrame:
+        """
+        Parameters:
+        - items_dict (Dict[str, pd.DataFrame]): Products by engineering category
+        - raw_stock_dict (Dict[str, pd.DataFrame]): The rod and patti/sheet inventory
+
+        Returns:
+        - pd.DataFrame: The component table of all the categories
+        """
+        if not items_dict:
+            return finalize_component_table(
+                CategoryProfiler(raw_stock_dict).profile_categories({}))
+        if self.max_workers <= 1 or len(items_dict) <= 1:
+            profiler = CategoryProfiler(raw_stock_dict)
+            return finalize_component_table(concat_product_components([
+                profiler.profile_category(category, items_df)
+                for category, items_df in items_dict.items()
+            ]))
+        with ProcessPoolExecutor(
+            max_workers=min(self.max_workers, len(items_dict)),
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_initialize_worker, initargs=(raw_stock_dict,)
+        ) as executor:
+            futures = {
+                category: executor.submit(_profile_category_in_worker, category, items_df)
+                for category, items_df in items_dict.items()
+            }
+            return finalize_component_table(concat_product_components(
+                [future.result() for future in futures.values()]))
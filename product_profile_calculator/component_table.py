@@ -0,0 +1,245 @@
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from data_processing.column_schema import apply_compact_schema
+from product_profile_calculator.volume_rules import LENGTH_DIM, MAX_CYLINDERS, TOP_DIM
+from utils import get_column_by_keyword, remove_textures_series, with_columns
+
+
+class VolumeFamily(NamedTuple):
+    """
+    One component of a product: the volume it adds up to, and the columns
+    the wide per-category frames hold its matched stock and volume in
+    """
+    shape: str
+    component: int
+    first_column: str
+    second_column: str
+    volume_column: str
+
+
+VOLUME_FAMILIES: List[VolumeFamily] = [
+    *(
+        VolumeFamily(
+            'Circular', i, f'Circular_Area_{i}_Matched_FirstCol',
+            f'Circular_Area_{i}_Matched_SecondCol', f'Cylinder_{i}_Volume')
+        for i in range(1, MAX_CYLINDERS + 1)
+    ),
+    *(
+        VolumeFamily(
+            'Rectangular', i, f'Rectangular_Area_{i}_Matched_FirstCol',
+            f'Rectangular_Area_{i}_Matched_SecondCol', f'Cuboid_{i}_Volume')
+        for i in range(1, 3)
+    ),
+    VolumeFamily(
+        'Square', 1, 'Square_Area_1_Matched_FirstCol',
+        'Square_Area_1_Matched_SecondCol', 'Squared_1_Volume'),
+    VolumeFamily('Sheet', 1, 'Matched_FirstCol', 'Matched_SecondCol', 'Sheet_Volume'),
+]
+VOLUME_FAMILY_NAMES: List[str] = [family.volume_column for family in VOLUME_FAMILIES]
+PRODUCT_COLUMNS = [
+    'Category', 'Generic_Product_Code', 'Item', 'Component Sizes', TOP_DIM, LENGTH_DIM
+]
+COMPONENT_COLUMNS = [
+    'Generic_Product_Code', 'Category', 'Shape', 'Component', 'Volume Family',
+    'Area', 'Height', 'FirstCol', 'SecondCol', 'Volume'
+]
+
+
+class ProductComponents(NamedTuple):
+    """
+    The products of every engineering category, and the components parsed
+    from their sizes. Each component refers to its product by the
+    product's position in 'products'
+    """
+    products: pd.DataFrame
+    components: pd.DataFrame
+
+
+def volume_family_name(shape: str, component: int) -> str:
+    return next(
+        family.volume_column for family in VOLUME_FAMILIES
+        if family.shape == shape and family.component == component
+    )
+
+
+def _column_or_default(dataframe: pd.DataFrame, column: str, default) -> np.ndarray:
+    if column in dataframe.columns:
+        return dataframe[column].to_numpy(copy=True)
+    return np.full(len(dataframe), default)
+
+
+def tabulate_products(items_dict: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Lists the products of every engineering category in one table, a row
+    per product row, category after category. Categories without an item
+    column have no products
+
+    Parameters:
+    - items_dict (Dict[str, pd.DataFrame]): Products by engineering category,
+    with their component sizes and hardcoded dimensions
+
+    Returns:
+    - pd.DataFrame: The products, with PRODUCT_COLUMNS; 'Category' is
+    categorical, its categories in the order of 'items_dict'
+    """
+    product_frames = []
+    for category, dataframe in items_dict.items():
+        item_column = get_column_by_keyword(dataframe, 'item')
+        if 'Generic_Product_Code' in dataframe.columns:
+            product_codes = dataframe['Generic_Product_Code']
+        elif item_column is not None:
+            product_codes = remove_textures_series(dataframe[item_column])
+        else:
+            continue
+        size_column = get_column_by_keyword(dataframe, 'size')
+        product_frames.append(pd.DataFrame({
+            'Category': category,
+            'Generic_Product_Code': product_codes.to_numpy(dtype=object),
+            'Item': (product_codes if item_column is None
+                     else dataframe[item_column]).to_numpy(dtype=object),
+            'Component Sizes': _column_or_default(dataframe, size_column, np.nan)
+            .astype(object),
+            TOP_DIM: _column_or_default(dataframe, TOP_DIM, np.nan),
+            LENGTH_DIM: _column_or_default(dataframe, LENGTH_DIM, np.nan),
+        }))
+    if product_frames:
+        products = pd.concat(product_frames, ignore_index=True)
+    else:
+        products = pd.DataFrame({column: [] for column in PRODUCT_COLUMNS}, dtype=object)
+    products['Category'] = pd.Categorical(
+        products['Category'].astype(object), categories=list(items_dict))
+    return products
+
+
+def concat_product_components(
+    product_components: List[ProductComponents]
+) -> ProductComponents:
+    """
+    Joins the products and components of several sets of categories,
+    renumbering the components' products to their new positions
+    """
+    products = []
+    components = []
+    offset = 0
+    for part in product_components:
+        products.append(part.products)
+        components.append(with_columns(
+            part.components, {'Product': part.components['Product'] + offset}))
+        offset += len(part.products)
+    categories = [
+        category for part in product_components
+        for category in part.products['Category'].cat.categories
+    ]
+    products = pd.concat(products, ignore_index=True)
+    products['Category'] = pd.Categorical(
+        products['Category'].astype(object), categories=categories)
+    return ProductComponents(products, pd.concat(components, ignore_index=True))
+
+
+def last_listed_components(product_components: ProductComponents) -> np.ndarray:
+    """
+    A product listed more than once, in one category or in several, keeps
+    each volume family from the last product row whose category has that
+    family at all: a later row without the component clears it
+
+    Returns:
+    - np.ndarray: Whether each component comes from such a last row
+    """
+    products, components = product_components
+    product_positions = components['Product'].to_numpy()
+    code_ids, _ = pd.factorize(products['Generic_Product_Code'], use_na_sentinel=False)
+    product_categories = products['Category'].cat.codes.to_numpy()
+    component_categories = product_categories[product_positions]
+    is_last = np.zeros(len(components), dtype=bool)
+    family_positions = components.groupby('Volume Family', observed=True).indices
+    for positions in family_positions.values():
+        family_categories = np.unique(component_categories[positions])
+        family_products = np.flatnonzero(np.isin(product_categories, family_categories))
+        last_product = np.full(code_ids.max(initial=-1) + 1, -1)
+        np.maximum.at(last_product, code_ids[family_products], family_products)
+        is_last[positions] = \
+            last_product[code_ids[product_positions[positions]]] == product_positions[positions]
+    return is_last
+
+
+def finalize_component_table(product_components: ProductComponents) -> pd.DataFrame:
+    """
+    Turns profiled components into the component table: a row per product
+    and component, with its shape, the area and height its volume comes
+    from, its matched stock (FirstCol, SecondCol) and the volume one unit
+    of the product needs. Components with no matched stock and no volume
+    are left out
+
+    Parameters:
+    - product_components (ProductComponents): The products, and their
+    components matched to stock with their volumes
+
+    Returns:
+    - pd.DataFrame: The component table, with COMPONENT_COLUMNS, ordered by
+    category, volume family and product
+    """
+    products, components = product_components
+    components = components[last_listed_components(product_components)]
+    has_requirement = ~(
+        components['FirstCol'].eq(0) & components['SecondCol'].eq(0)
+        & components['Volume'].fillna(0).eq(0)
+    )
+    components = components[has_requirement.to_numpy()]
+    product_positions = components['Product'].to_numpy()
+    category_order = products['Category'].cat.codes.to_numpy()[product_positions]
+    family_order = pd.Categorical(
+        components['Volume Family'], categories=VOLUME_FAMILY_NAMES).codes
+    order = np.lexsort((product_positions, family_order, category_order))
+    components = components.iloc[order]
+    product_positions = product_positions[order]
+    component_table = pd.DataFrame({
+        'Generic_Product_Code':
+            products['Generic_Product_Code'].to_numpy()[product_positions],
+        'Category': products['Category'].astype(object).to_numpy()[product_positions],
+        'Shape': components['Shape'].to_numpy(),
+        'Component': components['Component'].to_numpy(dtype=np.int8),
+        'Volume Family': pd.Categorical(
+            components['Volume Family'], categories=VOLUME_FAMILY_NAMES),
+        'Area': components['Area'].to_numpy(dtype=float),
+        'Height': components['Height'].to_numpy(dtype=float),
+        'FirstCol': components['FirstCol'].to_numpy(dtype=object),
+        'SecondCol': components['SecondCol'].to_numpy(dtype=object),
+        'Volume': components['Volume'].to_numpy(dtype=float),
+    })
+    component_table = component_table.astype({'Category': 'category', 'Shape': 'category'})
+    return apply_compact_schema(component_table)
+
+
+def join_order_lines(
+    component_table: pd.DataFrame, order_lines: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Joins the order lines onto the components of their product
+
+    Parameters:
+    - component_table (pd.DataFrame): The component table
+    - order_lines (pd.DataFrame): Order lines with a 'Generic_Product_Code'
+
+    Returns:
+    - pd.DataFrame: A row per order line and component of its product, in
+    the order of the lines, holding the matched stock (FirstCol, SecondCol)
+    and the volume needed for the ordered quantity
+    """
+    qty_column = get_column_by_keyword(order_lines, 'qty')
+    # Joined on integer product positions rather than on the code strings
+    component_codes = component_table['Generic_Product_Code'].astype(object)
+    products = pd.Index(component_codes.unique())
+    lines = pd.DataFrame({
+        'Product': products.get_indexer(order_lines['Generic_Product_Code']),
+        'Quantity': order_lines[qty_column].to_numpy()
+        if qty_column in order_lines.columns else 1,
+    })
+    components = with_columns(
+        component_table[['Volume Family', 'FirstCol', 'SecondCol', 'Volume']],
+        {'Product': products.get_indexer(component_codes)})
+    line_volumes = lines.merge(components, on='Product', how='inner')
+    line_volumes['Volume'] = line_volumes['Volume'] * line_volumes.pop('Quantity')
+    return line_volumes.drop(columns='Product')
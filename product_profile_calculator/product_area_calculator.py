@@ -1,21 +1,44 @@
-from typing import Dict, Tuple, Any
+from typing import Dict, Tuple, Any, Union
 
 import numpy as np
 import pandas as pd
 import re
 
-from utils import get_column_by_keyword
+from data_processing.description_parse_cache import (
+    DescriptionParseCache, description_parse_cache
+)
+from product_profile_calculator.component_table import volume_family_name
+from product_profile_calculator.volume_rules import MAX_CYLINDERS
+from utils import get_column_by_keyword, with_columns
 
 
 class ProductAreaCalculator:
-    def __init__(self) -> None:
-        pass
+    DIAMETER_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*Dia')
+    FLUSH_PULL_PATTERN = re.compile(r'(\d+)\s*X\s*(\d+)', re.IGNORECASE)
+    PLATE_PATTERN = re.compile(r'(\d+(\.\d+)?)\s*[xX]\s*(\d+(\.\d+)?)')
+    SQUARE_PATTERN = re.compile(r'(\d+(\.\d+)?)\s*Sq', re.IGNORECASE)
+    # The categories whose products have plates, squares or a sheet
+    RECTANGULAR_CATEGORIES = (
+        'plate', 'round_rect_single_rods_stock', 'two_rectangular_plates', 'ring_pull_stock'
+    )
+    SQUARE_CATEGORIES = ('square_rod', 'round_square_single_rods_stock')
+    SHEET_CATEGORY = 'metal_sheet'
+    THIN_SHEET_THICKNESS = 1.6
+    SHEET_THICKNESS = 3
+    COMPONENT_AREA_COLUMNS = [
+        'Product', 'Shape', 'Component', 'Volume Family', 'Area', 'Diameter', 'Height'
+    ]
+
+    def __init__(self, parse_cache: DescriptionParseCache = None) -> None:
+        # Component sizes repeat across products, so each is parsed once
+        if parse_cache is None:
+            parse_cache = description_parse_cache
+        self.parse_cache = parse_cache
 
     def parse_areas_for_flush_pulls(
         self, component_size_str: str, length_dim: float
     ) -> Tuple[float, float]:
-        pattern = re.compile(r'(\d+)\s*X\s*(\d+)', re.IGNORECASE)
-        match = pattern.search(component_size_str)
+        match = self.FLUSH_PULL_PATTERN.search(component_size_str)
         if match:
             width, height = int(match.group(1)), int(match.group(2))
             top_area = width * height * 2  # adjusted for top and bottom areas
@@ -24,43 +47,73 @@ class ProductAreaCalculator:
         else:
             return 0, 0
 
-    def calculate_front_plate_area(self, row: pd.Series) -> float:
-        return (row['Top Dim (mm)'] + 3) * (row['Length Dim (mm)'] + 3)
+    def calculate_flush_pull_areas(
+        self, component_sizes: pd.Series, length_dims: pd.Series
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        parse_areas_for_flush_pulls for a whole column: the top and side
+        areas of every flush pull, 0 where the size has no 'W X H' part
+        """
+        dimensions = component_sizes.str.extract(self.FLUSH_PULL_PATTERN)
+        matched = dimensions[0].notna().to_numpy()
+        width = pd.to_numeric(dimensions[0]).fillna(0).astype(np.int64).to_numpy()
+        height = pd.to_numeric(dimensions[1]).fillna(0).astype(np.int64).to_numpy()
+        top_areas = width * height * 2  # adjusted for top and bottom areas
+        if not matched.any():
+            # Mirrors the integer zeros of the per-string parser
+            return top_areas, np.zeros(len(matched), dtype=np.int64)
+        side_areas = np.where(
+            matched, width * length_dims.to_numpy() * 2, 0)  # two sides
+        return top_areas, side_areas
+
+    def calculate_front_plate_area(
+        self, rows: Union[pd.Series, pd.DataFrame]
+    ) -> Union[float, pd.Series]:
+        """Front plate area of one row, or of every row of a frame"""
+        return (rows['Top Dim (mm)'] + 3) * (rows['Length Dim (mm)'] + 3)
 
-    def calculate_back_plate_area(self, row: pd.Series) -> float:
-        return row['Top Dim (mm)'] * row['Length Dim (mm)']
+    def calculate_back_plate_area(
+        self, rows: Union[pd.Series, pd.DataFrame]
+    ) -> Union[float, pd.Series]:
+        """Back plate area of one row, or of every row of a frame"""
+        return rows['Top Dim (mm)'] * rows['Length Dim (mm)']
 
     def parse_circular_areas_into_dict(
         self, dataframes_dict: Dict[str, pd.DataFrame]
     ) -> Dict[str, pd.DataFrame]:
         """
-        Extracts diameters from a column and adds the corresponding area
+        Extracts diameters from a column and adds the corresponding area.
+        The size columns of all categories are parsed in a single pass
+        and the results are split back out per category
         """
+        if not dataframes_dict:
+            return {}
+        all_sizes = pd.concat(
+            [
+                df[get_column_by_keyword(df, 'size')].reset_index(drop=True)
+                for df in dataframes_dict.values()
+            ],
+            keys=list(dataframes_dict)
+        ).astype(object)
+        # One row per (category, position), one column per diameter found
+        all_diameters = all_sizes.str.extractall(
+            self.DIAMETER_PATTERN)[0].astype(float).unstack()
+
         dict_with_circular_areas = {}
         for key, df in dataframes_dict.items():
-            df_copy = df.copy()
-            size_column = get_column_by_keyword(df_copy, 'size')
-            pattern = re.compile(r'(\d+(?:\.\d+)?)\s*Dia')
-            diameters_and_areas_df = pd.DataFrame(index=df_copy.index)
-
-            for index, row in df_copy.iterrows():
-                diameters = pattern.findall(row[size_column])
-                for i, diameter_str in enumerate(diameters):
-                    diameter = float(diameter_str)
-                    radius = diameter / 2
-                    area = np.pi * (radius ** 2)
-                    diameter_column = f'Diameter_{i+1}'
-                    area_column = f'Circular_Area_{i+1}'
-                    diameters_and_areas_df.loc[index,
-                                               diameter_column] = diameter
-                    diameters_and_areas_df.loc[index, area_column] = area
-            result_df = pd.concat(
-                [df_copy, diameters_and_areas_df], axis=1, sort=False)
-            dict_with_circular_areas[key] = result_df
+            diameters = all_diameters.reindex(
+                pd.MultiIndex.from_product([[key], range(len(df))])
+            ).dropna(axis=1, how='all').to_numpy()
+            areas = np.pi * (diameters / 2) ** 2
+            circular_columns = {}
+            for i in range(diameters.shape[1]):
+                circular_columns[f'Diameter_{i+1}'] = diameters[:, i]
+                circular_columns[f'Circular_Area_{i+1}'] = areas[:, i]
+            dict_with_circular_areas[key] = with_columns(df, circular_columns)
         return dict_with_circular_areas
 
     def parse_plate_areas(self, string: str) -> Any:
-        matches = re.findall(r'(\d+(\.\d+)?)\s*[xX]\s*(\d+(\.\d+)?)', string)
+        matches = self.PLATE_PATTERN.findall(string)
         areas = []
         for match in matches:
             length, width = float(match[0]), float(match[2])
@@ -68,30 +121,163 @@ class ProductAreaCalculator:
         return areas
 
     def calculate_square_area(self, string: str) -> Any:
-        match = re.search(r'(\d+(\.\d+)?)\s*Sq', string, re.IGNORECASE)
+        match = self.SQUARE_PATTERN.search(string)
         return float(match.group(1))**2 if match else None
 
     def calculate_areas_for_rectangular_shapes(
         self, dataframes_dict: Dict[str, pd.DataFrame]
     ) -> Dict[str, pd.DataFrame]:
-        updated_dataframes_dict = {key: dataframe.copy()
-                                   for key, dataframe in dataframes_dict.items()}
-
-        exclusively_rectangular_shapes = [
-            'plate', 'round_rect_single_rods_stock', 'two_rectangular_plates', 'ring_pull_stock'
-        ]
-        for key, df in updated_dataframes_dict.items():
-            if key in exclusively_rectangular_shapes:
-                size_column = get_column_by_keyword(df, 'size')
+        updated_dataframes_dict = {}
+        for key, df in dataframes_dict.items():
+            size_column = get_column_by_keyword(df, 'size')
+            area_columns = {}
+            if key in self.RECTANGULAR_CATEGORIES:
                 # Calculate these areas and add them to the df
-                area_results = df[size_column].apply(self.parse_plate_areas)
-                df['Rectangular_Area_1'] = area_results.apply(
+                area_results = pd.Series(
+                    self.parse_cache.parse_many(
+                        'plate areas', df[size_column],
+                        lambda sizes: [self.parse_plate_areas(size) for size in sizes],
+                        missing=()
+                    ),
+                    index=df.index, dtype=object
+                )
+                area_columns['Rectangular_Area_1'] = area_results.apply(
                     lambda x: x[0] if x else None)
                 # if area_results had more than 1 value add this to the next column
-                for idx, areas in area_results.items():
-                    if len(areas) > 1:
-                        df.loc[idx, 'Rectangular_Area_2'] = areas[1]
-            elif key in ['square_rod', 'round_square_single_rods_stock']:
-                df['Square_Area_1'] = df[size_column].apply(
-                    self.calculate_square_area)
+                if (area_results.apply(len) > 1).any():
+                    area_columns['Rectangular_Area_2'] = area_results.apply(
+                        lambda x: x[1] if len(x) > 1 else np.nan)
+            elif key in self.SQUARE_CATEGORIES:
+                square_areas = self.parse_cache.parse_many(
+                    'square areas', df[size_column],
+                    lambda sizes: [self.calculate_square_area(size) for size in sizes]
+                )
+                area_columns['Square_Area_1'] = pd.Series(
+                    square_areas, index=df.index, dtype=object).infer_objects()
+            updated_dataframes_dict[key] = with_columns(df, area_columns)
         return updated_dataframes_dict
+
+    def calculate_component_areas(self, products: pd.DataFrame) -> pd.DataFrame:
+        """
+        Parses the components of every product out of its size in one pass
+        per shape over all categories: a row per diameter, plate, square or
+        sheet, with its area. Plates, squares and sheets get a row for every
+        product of their categories, with no area where the size holds none
+
+        Parameters:
+        - products (pd.DataFrame): The products of every category, as
+        tabulated by tabulate_products
+
+        Returns:
+        - pd.DataFrame: The components, with COMPONENT_AREA_COLUMNS. 'Product'
+        is the position of the component's product, and a sheet's 'Height'
+        its thickness
+        """
+        categories = products['Category'].astype(object).to_numpy()
+        sizes = products['Component Sizes']
+        component_frames = [
+            self.parse_circular_components(sizes[categories != self.SHEET_CATEGORY]),
+            self.parse_rectangular_components(
+                sizes[np.isin(categories, self.RECTANGULAR_CATEGORIES)]),
+            self.parse_square_components(sizes[np.isin(categories, self.SQUARE_CATEGORIES)]),
+            self.parse_sheet_components(products[categories == self.SHEET_CATEGORY]),
+        ]
+        component_frames = [frame for frame in component_frames if not frame.empty]
+        if not component_frames:
+            return pd.DataFrame({
+                column: pd.Series(dtype=object if column in ['Shape', 'Volume Family']
+                                  else float)
+                for column in self.COMPONENT_AREA_COLUMNS
+            }).astype({'Product': np.int64, 'Component': np.int64})
+        return pd.concat(component_frames, ignore_index=True)
+
+    @staticmethod
+    def component_frame(
+        products: np.ndarray, shape: str, component: int, areas: np.ndarray, **columns
+    ) -> pd.DataFrame:
+        return pd.DataFrame({
+            'Product': products,
+            'Shape': shape,
+            'Component': component,
+            'Volume Family': volume_family_name(shape, component),
+            'Area': np.asarray(areas, dtype=float),
+            'Diameter': columns.get('diameters', np.nan),
+            'Height': columns.get('heights', np.nan),
+        })
+
+    def parse_circular_components(self, sizes: pd.Series) -> pd.DataFrame:
+        """
+        A component per diameter found in each size, up to MAX_CYLINDERS,
+        with its circular area. 'sizes' is indexed by product position
+        """
+        diameters = sizes.astype(object).str.extractall(self.DIAMETER_PATTERN)
+        if diameters.empty:
+            return pd.DataFrame()
+        diameters = diameters[0].astype(float)
+        products = diameters.index.get_level_values(0).to_numpy()
+        components = diameters.index.get_level_values('match').to_numpy() + 1
+        diameters = diameters.to_numpy()
+        return pd.concat([
+            self.component_frame(
+                products[components == i], 'Circular', i,
+                np.pi * (diameters[components == i] / 2) ** 2,
+                diameters=diameters[components == i])
+            for i in range(1, min(components.max(), MAX_CYLINDERS) + 1)
+        ], ignore_index=True)
+
+    def parse_rectangular_components(self, sizes: pd.Series) -> pd.DataFrame:
+        """
+        A first plate for every product, and a second one for the products
+        whose size holds two. 'sizes' is indexed by product position
+        """
+        if sizes.empty:
+            return pd.DataFrame()
+        plate_areas = self.parse_cache.parse_many(
+            'plate areas', sizes,
+            lambda sizes: [self.parse_plate_areas(size) for size in sizes],
+            missing=()
+        )
+        plate_counts = np.fromiter(map(len, plate_areas), dtype=np.int64, count=len(sizes))
+        products = sizes.index.to_numpy()
+        component_frames = [self.component_frame(
+            products, 'Rectangular', 1,
+            [areas[0] if areas else np.nan for areas in plate_areas])]
+        has_second_plate = plate_counts > 1
+        if has_second_plate.any():
+            component_frames.append(self.component_frame(
+                products[has_second_plate], 'Rectangular', 2,
+                [areas[1] for areas in plate_areas[has_second_plate]]))
+        return pd.concat(component_frames, ignore_index=True)
+
+    def parse_square_components(self, sizes: pd.Series) -> pd.DataFrame:
+        """A square for every product. 'sizes' is indexed by product position"""
+        if sizes.empty:
+            return pd.DataFrame()
+        square_areas = self.parse_cache.parse_many(
+            'square areas', sizes,
+            lambda sizes: [self.calculate_square_area(size) for size in sizes]
+        )
+        return self.component_frame(
+            sizes.index.to_numpy(), 'Square', 1,
+            pd.to_numeric(pd.Series(square_areas, dtype=object), errors='coerce'))
+
+    def parse_sheet_components(self, sheets: pd.DataFrame) -> pd.DataFrame:
+        """
+        A sheet for every product: its flush pull, front and back plate
+        areas together, and its thickness. 'sheets' is indexed by product
+        position
+        """
+        if sheets.empty:
+            return pd.DataFrame()
+        component_sizes = sheets['Component Sizes']
+        top_areas, side_areas = self.calculate_flush_pull_areas(
+            component_sizes, sheets['Length Dim (mm)'])
+        sheet_areas = (
+            top_areas + side_areas
+            + self.calculate_front_plate_area(sheets).to_numpy()
+            + self.calculate_back_plate_area(sheets).to_numpy()
+        )
+        is_thin_sheet = component_sizes.str.contains('1.6', regex=False, na=False).to_numpy()
+        return self.component_frame(
+            sheets.index.to_numpy(), 'Sheet', 1, sheet_areas.astype(float),
+            heights=np.where(is_thin_sheet, self.THIN_SHEET_THICKNESS, self.SHEET_THICKNESS))
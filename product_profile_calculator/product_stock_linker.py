@@ -1,90 +1,143 @@
-from typing import Dict, Any
+from typing import Dict, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
-from utils import get_column_by_keyword
+from utils import get_column_by_keyword, with_columns
+
+# Sheets are cut from the brass sheet of their thickness
+SHEET_STOCK_TYPE = 'Brass Sheet'
+SHEET_STOCK_BY_THICKNESS = {1.6: 'BRASS SHEET 1.6MM (48"X14"X1.6MM)', 3: 'BRASS SHEET 3MM'}
+
+
+class StockAreaIndex:
+    """
+    Sorted index over the area column of a stock dataframe.
+    Answers "smallest stock area at or above" for many areas at once
+    """
+    def __init__(self, stock_dataframe: pd.DataFrame):
+        area_column = get_column_by_keyword(stock_dataframe, 'area')
+        stock_areas = pd.to_numeric(
+            stock_dataframe[area_column], errors='coerce'
+        ).to_numpy(dtype=float)
+        valid_positions = np.flatnonzero(~np.isnan(stock_areas))
+        # A stable sort keeps earlier stock rows ahead of equal areas
+        order = np.argsort(stock_areas[valid_positions], kind='stable')
+        self.sorted_areas = stock_areas[valid_positions][order]
+        self.positions = valid_positions[order]
+        self.first_column_values = stock_dataframe.iloc[:, 0].to_numpy(
+            dtype=object)
+        self.second_column_values = stock_dataframe.iloc[:, 1].to_numpy(
+            dtype=object)
+
+    def lookup(self, areas: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the stock row with the smallest area at or above each area
+
+        Parameters:
+        - areas (pd.Series): Numeric product areas to be matched
+
+        Returns:
+        - np.ndarray: The matched stock areas, NaN where nothing matched
+        - np.ndarray: Positions into the stock dataframe, -1 where nothing matched
+        """
+        areas = areas.to_numpy(dtype=float, na_value=np.nan)
+        slots = np.searchsorted(self.sorted_areas, areas, side='left')
+        found = ~np.isnan(areas) & (slots < len(self.sorted_areas))
+        matched_areas = np.full(len(areas), np.nan)
+        matched_positions = np.full(len(areas), -1, dtype=np.int64)
+        matched_areas[found] = self.sorted_areas[slots[found]]
+        matched_positions[found] = self.positions[slots[found]]
+        return matched_areas, matched_positions
 
 
 class ProductSourceLinker:
+    # The stock each shape of component is cut from
+    SHAPE_STOCK = {'Circular': 'Rods', 'Square': 'Rods', 'Rectangular': 'Patti_Sheets'}
+
     def __init__(self):
         pass
 
+    @staticmethod
+    def build_stock_indexes(
+        stock_dictionary: Dict[str, pd.DataFrame]
+    ) -> Dict[str, StockAreaIndex]:
+        """Builds a sorted area index once for every stock dataframe"""
+        return {
+            key: StockAreaIndex(stock_dataframe)
+            for key, stock_dataframe in stock_dictionary.items()
+        }
+
     def link_shape_to_source(
         self, dataframe_to_update: pd.DataFrame,
-        stock_dictionary: Dict[str, pd.DataFrame], area_type: str
+        stock_dictionary: Dict[str, pd.DataFrame], area_type: str,
+        stock_indexes: Optional[Dict[str, StockAreaIndex]] = None
     ) -> pd.DataFrame:
         """ 
-        Links products to available stock based on shape and area
+        Links products to available stock based on shape and area. Every
+        row is matched on its own area, whatever its index label
         """
-        if area_type in ['Circular', 'Square']:
-            stock_dataframe = stock_dictionary['Rods'].copy()
+        stock_key = 'Rods' if area_type in ['Circular', 'Square'] else 'Patti_Sheets'
+        if stock_indexes is None:
+            stock_index = StockAreaIndex(stock_dictionary[stock_key])
         else:
-            stock_dataframe = stock_dictionary['Patti_Sheets'].copy()
+            stock_index = stock_indexes[stock_key]
 
-        df_copy = dataframe_to_update.copy()
-        area_column_from_stock_data = get_column_by_keyword(
-            stock_dataframe, 'area')
-
-        area_columns = [col for col in df_copy.columns if 'area' in col.lower()
+        area_columns = [col for col in dataframe_to_update.columns if 'area' in col.lower()
                         and area_type.lower() in col.lower() and not col.endswith('Match')]
 
+        new_columns = {}
         for area_column in area_columns:
-            df_copy[area_column] = pd.to_numeric(
-                df_copy[area_column], errors='coerce')
+            areas = pd.to_numeric(dataframe_to_update[area_column], errors='coerce')
+            new_columns[area_column] = areas
             # To prevent a repreating number of columns created
             match_col_name = f'{area_column}_Matched' if not area_column.endswith('Matched')\
                 else area_column
             # Creating reference columns
             first_lookup_column = f'{match_col_name}_FirstCol'
             second_lookup_column = f'{match_col_name}_SecondCol'
-            df_copy[match_col_name] = np.nan
-            df_copy[first_lookup_column] = None
-            df_copy[second_lookup_column] = None
-
-            for index, row in df_copy.iterrows():
-                area_value = row[area_column]
-                closest_area, closest_index = None, None
-                # Iterate though stock_dataframe to find matches
-                for idx, stock_row in stock_dataframe.iterrows():
-                    stock_area = stock_row[area_column_from_stock_data]
-                    if pd.notnull(stock_area) and pd.notnull(area_value) and \
-                            stock_area >= area_value:
-                        if closest_area is None or (stock_area < closest_area):
-                            closest_area, closest_index = stock_area, idx
-                if closest_index is not None:
-                    df_copy.at[index, match_col_name] = closest_area
-                    df_copy.at[index, first_lookup_column] = stock_dataframe.at[
-                        closest_index, stock_dataframe.columns[0]
-                    ]
-                    df_copy.at[index, second_lookup_column] = stock_dataframe.at[
-                        closest_index, stock_dataframe.columns[1]
-                    ]
-
-        return df_copy
+
+            matched_areas, matched_positions = stock_index.lookup(areas)
+            found = matched_positions >= 0
+            first_values = np.full(len(dataframe_to_update), None, dtype=object)
+            second_values = np.full(len(dataframe_to_update), None, dtype=object)
+            first_values[found] = stock_index.first_column_values[
+                matched_positions[found]]
+            second_values[found] = stock_index.second_column_values[
+                matched_positions[found]]
+            new_columns[match_col_name] = matched_areas
+            new_columns[first_lookup_column] = first_values
+            new_columns[second_lookup_column] = second_values
+
+        return with_columns(dataframe_to_update, new_columns)
 
     def lookup_raw_stock(
-        self, product_dict: Dict[str, pd.DataFrame], stock_dict: Dict[str, pd.DataFrame]
+        self, product_dict: Dict[str, pd.DataFrame], stock_dict: Dict[str, pd.DataFrame],
+        stock_indexes: Optional[Dict[str, StockAreaIndex]] = None
     ) -> Dict[str, pd.DataFrame]:
         """Links products to the source of raw stock they come from
 
         Args:
             product_dict: Dictionary of product DataFrames to update.
             stock_dict: Dictionary of stock DataFrames for linking.
+            stock_indexes: Indexes already built over stock_dict, if any.
 
         Returns:
             Updated product dictionary with stock information.
         """
         area_types = ['Circular', 'Rectangular', 'Square']
+        if stock_indexes is None:
+            stock_indexes = self.build_stock_indexes(stock_dict)
         updated_products_dictionary = {}
         for key, df in product_dict.items():
             if key == 'metal_sheet':
                 updated_products_dictionary[key] = df
                 continue
-            df_updated = df.copy()
+            # Every link returns a new frame, so the product frame is not copied
+            df_updated = df
             for area_type in area_types:
                 df_updated = self.link_shape_to_source(
-                    df_updated, stock_dict, area_type)
+                    df_updated, stock_dict, area_type, stock_indexes)
             df_updated_nona = df_updated.fillna(0)
             # Convert columns ending with FirstCol and SecondCol to object after fillna
             lookup_columns = [
@@ -96,3 +149,58 @@ class ProductSourceLinker:
                 df_updated_nona[col] = df_updated_nona[col].astype('object')
             updated_products_dictionary[key] = df_updated_nona
         return updated_products_dictionary
+
+    def match_components(
+        self, components: pd.DataFrame, stock_dictionary: Dict[str, pd.DataFrame],
+        stock_indexes: Optional[Dict[str, StockAreaIndex]] = None
+    ) -> pd.DataFrame:
+        """
+        Matches every component to the stock it is cut from, with a single
+        lookup per stock table over the components of all its shapes.
+        Every component is matched on its own area
+
+        Parameters:
+        - components (pd.DataFrame): Components with their areas, as parsed
+        by ProductAreaCalculator.calculate_component_areas
+        - stock_dictionary (Dict[str, pd.DataFrame]): The rod and
+        patti/sheet inventory
+        - stock_indexes (Dict[str, StockAreaIndex]): Indexes already built
+        over stock_dictionary, if any
+
+        Returns:
+        - pd.DataFrame: The components with the area of their matched stock
+        ('Matched Area') and its first two columns ('FirstCol', 'SecondCol'),
+        0 where no stock is large enough
+        """
+        if stock_indexes is None:
+            stock_indexes = self.build_stock_indexes(stock_dictionary)
+        shapes = components['Shape'].to_numpy()
+        matched_areas = np.full(len(components), np.nan)
+        first_values = np.full(len(components), 0, dtype=object)
+        second_values = np.full(len(components), 0, dtype=object)
+        for stock_key in dict.fromkeys(self.SHAPE_STOCK.values()):
+            stock_shapes = [
+                shape for shape, key in self.SHAPE_STOCK.items() if key == stock_key]
+            positions = np.flatnonzero(np.isin(shapes, stock_shapes))
+            if not len(positions):
+                continue
+            stock_index = stock_indexes[stock_key]
+            areas, stock_positions = stock_index.lookup(components['Area'].iloc[positions])
+            found = stock_positions >= 0
+            matched_areas[positions] = areas
+            first_values[positions[found]] = stock_index.first_column_values[
+                stock_positions[found]]
+            second_values[positions[found]] = stock_index.second_column_values[
+                stock_positions[found]]
+        is_sheet = shapes == 'Sheet'
+        first_values[is_sheet] = SHEET_STOCK_TYPE
+        second_values[is_sheet] = components['Height'][is_sheet].map(
+            SHEET_STOCK_BY_THICKNESS).to_numpy(dtype=object)
+        # Stock without a description reads as unmatched, as missing cells do
+        first_values[pd.isna(first_values)] = 0
+        second_values[pd.isna(second_values)] = 0
+        return with_columns(components, {
+            'Matched Area': matched_areas,
+            'FirstCol': first_values,
+            'SecondCol': second_values,
+        })
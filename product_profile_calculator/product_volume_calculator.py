@@ -1,183 +1,238 @@
-from typing import Dict, TYPE_CHECKING
+from typing import Dict, List, Sequence, TYPE_CHECKING
 
 import numpy as np
 import pandas as pd
 
-from utils import get_column_by_keyword, compute_volume
+from product_profile_calculator.product_stock_linker import (
+    SHEET_STOCK_BY_THICKNESS, SHEET_STOCK_TYPE
+)
+from product_profile_calculator.volume_rules import (
+    LENGTH_DIM, TOP_DIM, VOLUME_RULES, VolumeRule, group_rules_by_category,
+    validate_volume_rules
+)
+from utils import get_column_by_keyword, with_columns
 if TYPE_CHECKING:
     from .product_area_calculator import ProductAreaCalculator
 
 
 class ProductVolumeCalculator:
-    def __init__(self, area_calculator: 'ProductAreaCalculator'):
+    def __init__(
+        self, area_calculator: 'ProductAreaCalculator',
+        volume_rules: Sequence[VolumeRule] = VOLUME_RULES
+    ):
         # Instance of area_calculator class
         self.area_calculator = area_calculator
+        if volume_rules is not VOLUME_RULES:
+            validate_volume_rules(volume_rules)
+        self.volume_rules = group_rules_by_category(volume_rules)
 
     @staticmethod
-    def adjust_volume_for_posts(
-        dataframe: pd.DataFrame, volume_column: str
-    ) -> pd.DataFrame:
-        df = dataframe.copy()
-        item_column = get_column_by_keyword(df, 'item')
-        df[volume_column] = np.where(
-            df[item_column].str.contains('DP|AP|BP'),
-            df[volume_column] * 2, df[volume_column]
-        )
-        return df
+    def doubling_multiplier(
+        items: pd.Series, pattern: str, regex: bool = False
+    ) -> np.ndarray:
+        """
+        Returns:
+        - np.ndarray: 2 for every item whose name contains 'pattern', else 1
+        """
+        return np.where(items.str.contains(pattern, regex=regex, na=False), 2, 1)
 
-    @staticmethod
-    def adjust_volume_for_btb_products(dataframe: pd.DataFrame, item_column: str):
+    def apply_volume_multipliers(
+        self, dataframe: pd.DataFrame, item_column: str,
+        post_volume_columns: Sequence[str] = ()
+    ) -> pd.DataFrame:
         """
-        Doubles the volume for any back-to-back product
+        Doubles every volume of back-to-back (BTB) products, and the volumes
+        in 'post_volume_columns' of DP/AP/BP products. Both multipliers are
+        built once per frame and applied to the volume columns together;
+        products with both get x4, which is exact in floating point
+
+        Parameters:
+        - dataframe (pd.DataFrame): Products with their volume columns
+        - item_column (str): The column with the item names
+        - post_volume_columns (Sequence[str]): The volumes of the posts
+
+        Returns:
+        - pd.DataFrame: The frame with its volumes adjusted in place
         """
-        for col in dataframe.columns:
-            if col.endswith('Volume'):
-                dataframe[col] = dataframe.apply(
-                    lambda x: x[col] * 2 if 'BTB' in x[item_column] else x[col], axis=1
-                )
+        items = dataframe[item_column]
+        btb_multiplier = self.doubling_multiplier(items, 'BTB')
+        volume_columns = [col for col in dataframe.columns if col.endswith('Volume')]
+        post_columns = [col for col in volume_columns if col in post_volume_columns]
+        other_columns = [col for col in volume_columns if col not in post_columns]
+        if other_columns:
+            dataframe[other_columns] = dataframe[other_columns].mul(btb_multiplier, axis=0)
+        if post_columns:
+            post_multiplier = btb_multiplier * self.doubling_multiplier(
+                items, 'DP|AP|BP', regex=True)
+            dataframe[post_columns] = dataframe[post_columns].mul(post_multiplier, axis=0)
         return dataframe
-    
-    def initialize_volume_columns(
-        self, df: pd.DataFrame, volume_columns: list
-    ) -> pd.DataFrame:
-        for col in volume_columns:
-            if col not in df.columns:
-                df[col] = np.nan
-        return df
-        
 
-    def calculate_cylinder_volume(
+    def calculate_component_volumes(
         self, dataframes_dictionary: Dict[str, pd.DataFrame]
     ) -> Dict[str, pd.DataFrame]:
+        """
+        Evaluates the volume rules of every category: each category's
+        cylinders, cuboids and squares are computed together in one
+        vectorized pass, then doubled for posts and back-to-back products
 
-        result_dict = {
-            key: df.copy() for key, df in dataframes_dictionary.items()
+        Parameters:
+        - dataframes_dictionary (Dict[str, pd.DataFrame]): Products by category,
+        with their component areas matched to stock
+
+        Returns:
+        - Dict[str, pd.DataFrame]: The products with their volume columns
+        """
+        return {
+            key: self.apply_volume_rules(dataframe, self.volume_rules.get(key, []))
+            for key, dataframe in dataframes_dictionary.items()
         }
-        relevant_keys = [
-            'round_rod', 'round_rect_single_rods_stock', 'pipe_composite_stock',
-            'three_distinct_round_rods', 'two_distinct_round_rods',
-            'round_square_single_rods_stock', 'ring_pull_stock'
-        ]
-        for key, dataframe in result_dict.items():
-            if key not in relevant_keys:
-                continue
 
-            cylinder_counts = sum(
-                1 for col in dataframe.columns if col.startswith('Diameter')
-            )
-            volume_columns = [f'Cylinder_{i}_Volume' for i in range(1, cylinder_counts + 1)]
-            dataframe = self.initialize_volume_columns(dataframe, volume_columns)
-            
-            item_column = get_column_by_keyword(dataframe, 'item')
-            # the height for products is not consistent in hardcoded data
-            for i in range(1, cylinder_counts + 1):
-                area_column = f'Circular_Area_{i}_Matched'
-                volume_column = f'Cylinder_{i}_Volume'
-                # Inline get_height_column logic
-                if key == 'ring_pull_stock':
-                    height_column = 'Diameter_1'
-                elif key in ['round_rod', 'round_square_single_rods_stock', 'round_rect_single_rods_stock'] or \
-                        (key in ['pipe_composite_stock', 'three_distinct_round_rods'] and i == 3):
-                    height_column = 'Length Dim (mm)'
-                elif key == 'two_distinct_round_rods':
-                    height_column = 'Top Dim (mm)' if i == 2 else 'Length Dim (mm)'
-                else:
-                    height_column = 'Top Dim (mm)'
-
-                dataframe = compute_volume(
-                    dataframe, area_column, height_column, volume_column
-                )
-            if key in ['round_rect_single_rods_stock', 'three_distinct_round_rods'] and \
-                    'Cylinder_1_Volume' in dataframe.columns:
-                dataframe = self.adjust_volume_for_posts(
-                    dataframe, 'Cylinder_1_Volume')
-            if key == 'two_distinct_round_rods' and 'Cylinder_2_Volume' in dataframe.columns:
-                dataframe = self.adjust_volume_for_posts(
-                    dataframe, 'Cylinder_2_Volume')
-
-            # Apply 'BTB' check in a single step for all volume columns
-            dataframe = self.adjust_volume_for_btb_products(
-                dataframe, item_column)
-            result_dict[key] = dataframe
-
-        return result_dict
-
-    def calculate_cuboid_volume(
-        self, dataframes_dictionary: Dict[str, pd.DataFrame]
+    def apply_volume_rules(
+        self, dataframe: pd.DataFrame, rules: List[VolumeRule]
     ) -> pd.DataFrame:
-        # Keys for calculating the volume of the first cuboid
-        top_dim_keys = {
-            'ring_pull_stock', 'round_rect_single_rods_stock',
-            'round_square_single_rods_stock', 'two_rectangular_plates'
-        }
-        length_dim_keys = {'plate', 'square_rod'}
-        # Height of the second cuboid per product in the following keys
-        second_cuboid_heights = {
-            'two_rectangualar_plates': 'Length Dim (mm)',
-            'ring_pull_stock': 'Length Dim (mm)'
+        """
+        Parameters:
+        - dataframe (pd.DataFrame): The products of one category
+        - rules (List[VolumeRule]): The category's volume rules; rules whose
+        area column the products lack are skipped
+
+        Returns:
+        - pd.DataFrame: The products with one volume column per applied rule
+        """
+        rules = [rule for rule in rules if rule.area_column in dataframe.columns]
+        if not rules:
+            return with_columns(dataframe, {})
+        item_column = get_column_by_keyword(dataframe, 'item')
+        item_names = dataframe[item_column].astype(str).values
+        volumes = {
+            # Non-numeric areas or heights give no volume
+            rule.volume_column: pd.to_numeric(
+                dataframe[rule.area_column], errors='coerce').astype(float)
+            * pd.to_numeric(dataframe[rule.height_column], errors='coerce')
+            for rule in rules
         }
-        applicable_keys = top_dim_keys.union(length_dim_keys)
-        resulting_dict = {key: df.copy() for key, df in dataframes_dictionary.items()}
-        for key, df_copy in resulting_dict.items():
-            if key not in applicable_keys:
-                continue
-            volume_columns = [
-                    'Cuboid_1_Volume', 'Cuboid_2_Volume', 'Squared_1_Volume'
-            ]
-            df_copy = self.initialize_volume_columns(df_copy, volume_columns)
-            item_column = get_column_by_keyword(df_copy, 'item')
-            # First Cuboid
-            height_column_1 = 'Top Dim (mm)' if key in top_dim_keys else 'Length Dim (mm)'
-            area_col_1 = (
-                'Square_Area_1' if key in ['square_rod', 'round_square_single_rods_stock']
-                else 'Rectangular_Area_1'
-            )
-            volume_col_1 = 'Squared_1_Volume' if 'Square' in area_col_1 else 'Cuboid_1_Volume'
-            df_copy = compute_volume(
-                df_copy, area_col_1, height_column_1, volume_col_1)
-
-            # Second cuboid for the same product
-            if key in second_cuboid_heights:
-                compute_volume(df_copy, 'Rectangular_Area_2',
-                               second_cuboid_heights[key], 'Cuboid_2_Volume')
-                if key == 'two_rectangular_plates' and 'DP173' not in df_copy[item_column].astype(str).values:
-                    df_copy = self.adjust_volume_for_posts(
-                        df_copy, 'Cuboid_2_Volume')
-            df_copy = self.adjust_volume_for_btb_products(df_copy, item_column)
-            resulting_dict[key] = df_copy
-            resulting_dict[key] = df_copy.dropna(axis=1, how='all')
-        return resulting_dict
+        post_volume_columns = [
+            rule.volume_column for rule in rules
+            if rule.doubles_posts and (
+                rule.posts_unless_item is None or rule.posts_unless_item not in item_names)
+        ]
+        return self.apply_volume_multipliers(
+            with_columns(dataframe, volumes), item_column, post_volume_columns)
 
     def calculate_sheet_volume(self, dataframe):
-        df = dataframe.copy()
-        item_column = get_column_by_keyword(df, 'item')
-        areas = df.apply(
-            lambda row: self.area_calculator.parse_areas_for_flush_pulls(
-                row['Component Sizes'], row['Length Dim (mm)']
-            ), axis=1
-        )
-        df['Top_Area'], df['Side_Area'] = zip(*areas)
-        df['Front_Plate_Area'] = df.apply(
-            self.area_calculator.calculate_front_plate_area, axis=1
-        )
-        df['Back_Plate_Area'] = df.apply(
-            self.area_calculator.calculate_back_plate_area, axis=1)
-        thickness_multiplier = df['Component Sizes'].apply(
-            lambda x: 1.6 if '1.6' in x else 3)
-        df['Sheet_Volume'] = (
-            (df['Top_Area'] + df['Side_Area']
-                + df['Front_Plate_Area'] + df['Back_Plate_Area']
-             ) * thickness_multiplier
+        item_column = get_column_by_keyword(dataframe, 'item')
+        top_areas, side_areas = self.area_calculator.calculate_flush_pull_areas(
+            dataframe['Component Sizes'], dataframe['Length Dim (mm)'])
+        front_plate_areas = self.area_calculator.calculate_front_plate_area(dataframe)
+        back_plate_areas = self.area_calculator.calculate_back_plate_area(dataframe)
+        is_thin_sheet = dataframe['Component Sizes'].str.contains(
+            '1.6', regex=False, na=False).to_numpy()
+        # Whole millimetres keep integer volumes integer, as they always were
+        thickness_multiplier = np.where(is_thin_sheet, 1.6, 3) if is_thin_sheet.any() \
+            else np.full(len(dataframe), 3)
+        sheet_volumes = (
+            (top_areas + side_areas + front_plate_areas + back_plate_areas)
+            * thickness_multiplier
         )
         if item_column:
-            df['Sheet_Volume'] = df.apply(
-                lambda x: x['Sheet_Volume'] * 2 if 'TE' in x[item_column]
-                else x['Sheet_Volume'], axis=1
-            )
-
-        df['Matched_FirstCol'] = 'Brass Sheet'
-        df['Matched_SecondCol'] = df.apply(
-            lambda row: 'BRASS SHEET 1.6MM (48"X14"X1.6MM)' if '1.6' in row['Component Sizes']
-            else 'BRASS SHEET 3MM', axis=1
-        )
-        return df
+            sheet_volumes = sheet_volumes * self.doubling_multiplier(
+                dataframe[item_column], 'TE')
+
+        return with_columns(dataframe, {
+            'Top_Area': top_areas,
+            'Side_Area': side_areas,
+            'Front_Plate_Area': front_plate_areas,
+            'Back_Plate_Area': back_plate_areas,
+            'Sheet_Volume': sheet_volumes,
+            'Matched_FirstCol': SHEET_STOCK_TYPE,
+            'Matched_SecondCol': np.where(
+                is_thin_sheet, SHEET_STOCK_BY_THICKNESS[1.6], SHEET_STOCK_BY_THICKNESS[3]),
+        })
+
+    @staticmethod
+    def component_heights(
+        height_column: str, components: pd.DataFrame, products: pd.DataFrame,
+        product_diameters: Dict[int, pd.Series]
+    ) -> pd.Series:
+        """
+        The heights a rule names for some components: a hardcoded dimension
+        of their product, or one of its diameters ('Diameter_<n>'), looked
+        up in 'product_diameters' by component and product position
+        """
+        product_positions = components['Product'].to_numpy()
+        if height_column in (TOP_DIM, LENGTH_DIM):
+            heights = products[height_column].to_numpy()[product_positions]
+        else:
+            component = int(height_column.rsplit('_', 1)[1])
+            heights = product_diameters.get(component, pd.Series(dtype=float)).reindex(
+                product_positions).to_numpy()
+        # Missing heights count as 0, text as no height at all
+        heights = np.array(heights, dtype=object)
+        heights[pd.isna(heights)] = 0
+        return pd.to_numeric(pd.Series(heights, index=components.index), errors='coerce')
+
+    def calculate_volumes(
+        self, components: pd.DataFrame, products: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        Evaluates the volume rules over all the components at once. A
+        component's volume is the area its rule names (the matched stock
+        area for cylinders, its own area otherwise) times its height,
+        doubled for back-to-back (BTB) products and, for posts, DP/AP/BP
+        products. A sheet is its area times its thickness, doubled for TE
+        products. Components no rule covers need no volume of their own
+
+        Parameters:
+        - components (pd.DataFrame): Components matched to stock
+        - products (pd.DataFrame): The products the components refer to
+
+        Returns:
+        - pd.DataFrame: The components with their 'Volume', and the 'Area'
+        and 'Height' it was computed from
+        """
+        product_positions = components['Product'].to_numpy()
+        categories = products['Category'].astype(object).to_numpy()[product_positions]
+        items = products['Item']
+        btb_multiplier = self.doubling_multiplier(items, 'BTB')[product_positions]
+        post_multiplier = self.doubling_multiplier(items, 'DP|AP|BP', regex=True)[
+            product_positions]
+        is_circular = components['Shape'].eq('Circular').to_numpy()
+        product_diameters = {
+            component: pd.Series(
+                components['Diameter'].to_numpy()[is_circular & is_component],
+                index=product_positions[is_circular & is_component])
+            for component in np.unique(components['Component'].to_numpy()[is_circular])
+            for is_component in [components['Component'].eq(component).to_numpy()]
+        }
+        areas = np.full(len(components), np.nan)
+        heights = np.full(len(components), np.nan)
+        volumes = np.zeros(len(components))
+        rule_positions = components.groupby(
+            [categories, components['Volume Family'].to_numpy()]).indices
+        for (category, volume_column), positions in rule_positions.items():
+            rule = next((
+                rule for rule in self.volume_rules.get(category, [])
+                if rule.volume_column == volume_column
+            ), None)
+            if rule is None:
+                continue
+            rule_components = components.iloc[positions]
+            area_column = 'Matched Area' if rule.area_column.endswith('_Matched') else 'Area'
+            rule_areas = rule_components[area_column].fillna(0).astype(float)
+            rule_heights = self.component_heights(
+                rule.height_column, rule_components, products, product_diameters)
+            multiplier = btb_multiplier[positions]
+            if rule.doubles_posts and (
+                rule.posts_unless_item is None or rule.posts_unless_item not in
+                items[products['Category'].eq(category)].astype(str).values
+            ):
+                multiplier = multiplier * post_multiplier[positions]
+            areas[positions] = rule_areas
+            heights[positions] = rule_heights
+            volumes[positions] = (rule_areas * rule_heights).to_numpy() * multiplier
+        is_sheet = components['Shape'].eq('Sheet').to_numpy()
+        areas[is_sheet] = components['Area'][is_sheet]
+        heights[is_sheet] = components['Height'][is_sheet]
+        volumes[is_sheet] = (areas[is_sheet] * heights[is_sheet]) * self.doubling_multiplier(
+            items, 'TE')[product_positions[is_sheet]]
+        return with_columns(components, {'Area': areas, 'Height': heights, 'Volume': volumes})
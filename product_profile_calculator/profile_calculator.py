@@ -1,43 +1,102 @@
+from typing import Dict
+
+import pandas as pd
+
 from product_profile_calculator import (
-    ProductAreaCalculator, ProductSourceLinker, ProductVolumeCalculator
+    CategoryProfileRunner, ProductAreaCalculator, ProductSourceLinker,
+    ProductVolumeCalculator
+)
+from product_profile_calculator.component_table import (
+    ProductComponents, finalize_component_table, tabulate_products
 )
 from data_modeling.products.product_manufacturing_data import (
     DimensionUpdater
 )
 from data_modeling.raw_materials import BrassStockModeler
+from utils import instrumentation
 
 
 class ProfileCalculator():
     def __init__(self, config, live_sheets):
+        self.config = config
         self.live_sheets = live_sheets
-        self.brass_stock_modeler = BrassStockModeler(live_sheets)
-        self.dimension_updater = DimensionUpdater(config)
         self.area_calculator = ProductAreaCalculator()
         self.source_linker = ProductSourceLinker()
         self.volume_calculator = ProductVolumeCalculator(self.area_calculator)
-        self.dimension_updater.update_dimensions_with_hardcoded_data()
+        # None profiles all categories together; 0 or 1 profiles them one
+        # by one in this process, and more sends them to worker processes
+        self.category_workers = config.get('PROFILE_CATEGORY_WORKERS')
+        self._brass_stock_modeler = None
+        self._dimension_updater = None
+
+    @property
+    def brass_stock_modeler(self) -> BrassStockModeler:
+        """The stock modeler, built the first time it is needed"""
+        if self._brass_stock_modeler is None:
+            with instrumentation.stage('profile: model raw stock') as stage:
+                self._brass_stock_modeler = BrassStockModeler(self.live_sheets)
+                stage.rows_out = self._brass_stock_modeler.inventory_dict
+        return self._brass_stock_modeler
+
+    @property
+    def dimension_updater(self) -> DimensionUpdater:
+        """The dimension updater with hardcoded dimensions already applied"""
+        if self._dimension_updater is None:
+            with instrumentation.stage('profile: categorize products') as stage:
+                self._dimension_updater = DimensionUpdater(self.config)
+                self._dimension_updater.update_dimensions_with_hardcoded_data()
+                stage.rows_out = self._dimension_updater.product_engineering_categories
+        return self._dimension_updater
+
+    @instrumentation.instrumented('profile: component areas')
+    def calculate_component_areas(
+        self, items_dict: Dict[str, pd.DataFrame]
+    ) -> ProductComponents:
+        """
+        Gathers the products of every category into one table and parses
+        the circular, rectangular, square and sheet components of them all
+        """
+        products = tabulate_products(items_dict)
+        with instrumentation.stage('component areas', products) as stage:
+            components = self.area_calculator.calculate_component_areas(products)
+            stage.rows_out = components
+        return ProductComponents(products, components)
+
+    @instrumentation.instrumented('profile: component table')
+    def calculate_component_table(
+        self, product_components: ProductComponents,
+        raw_stock_dict: Dict[str, pd.DataFrame]
+    ) -> pd.DataFrame:
+        """
+        Matches every component to the raw stock it is cut from and
+        calculates its volume, each once over all the components
+        """
+        products, components = product_components
+        with instrumentation.stage('stock lookup', components) as stage:
+            components = self.source_linker.match_components(components, raw_stock_dict)
+            stage.rows_out = components
+        with instrumentation.stage('component volumes', components) as stage:
+            components = self.volume_calculator.calculate_volumes(components, products)
+            stage.rows_out = components
+        return finalize_component_table(ProductComponents(products, components))
+
+    @instrumentation.instrumented('profile: component table per category')
+    def calculate_component_table_per_category(
+        self, items_dict: Dict[str, pd.DataFrame],
+        raw_stock_dict: Dict[str, pd.DataFrame]
+    ) -> pd.DataFrame:
+        """
+        Runs the whole area, stock match and volume chain separately for
+        every engineering category, on 'category_workers' processes
+        """
+        return CategoryProfileRunner(self.category_workers).run(
+            items_dict, raw_stock_dict)
 
-    def execute_workflow(self):
+    def execute_workflow(self) -> pd.DataFrame:
         items_dict = self.dimension_updater.product_engineering_categories
         raw_stock_dict = self.brass_stock_modeler.inventory_dict
-        processed_items_dict = self.area_calculator.parse_circular_areas_into_dict(
-            items_dict)
-        processed_items_dict = self.area_calculator.calculate_areas_for_rectangular_shapes(
-            processed_items_dict)
-
-        # Match raw material inventory
-        linked_items_dict = self.source_linker.lookup_raw_stock(
-            processed_items_dict, raw_stock_dict
-        )
-        # Calculate the material requirement from the raw stock
-        brass_requirements = self.volume_calculator.calculate_cylinder_volume(
-            linked_items_dict
-        )
-        brass_requirements = self.volume_calculator.calculate_cuboid_volume(
-            brass_requirements
-        )
-        if 'metal_sheet' in brass_requirements:
-            brass_requirements['metal_sheet'] = self.volume_calculator.calculate_sheet_volume(
-                brass_requirements['metal_sheet']
-            )
-        return brass_requirements
+        if self.category_workers is not None:
+            return self.calculate_component_table_per_category(
+                items_dict, raw_stock_dict)
+        return self.calculate_component_table(
+            self.calculate_component_areas(items_dict), raw_stock_dict)
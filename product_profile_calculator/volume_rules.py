@@ -0,0 +1,135 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from data_modeling.products.product_manufacturing_data import ReferenceDictionaryConstructor
+
+TOP_DIM = 'Top Dim (mm)'
+LENGTH_DIM = 'Length Dim (mm)'
+MAX_CYLINDERS = 3
+
+
+class VolumeRule(NamedTuple):
+    """
+    The volume of one component of a category's products: its area times
+    its height. Volumes of components marked 'doubles_posts' are doubled for
+    DP, AP and BP products, unless 'posts_unless_item' is among the items
+    """
+    category: str
+    component: int
+    area_column: str
+    height_column: str
+    volume_column: str
+    doubles_posts: bool = False
+    posts_unless_item: Optional[str] = None
+
+
+def _cylinder(
+    category: str, component: int, height_column: str, doubles_posts: bool = False
+) -> VolumeRule:
+    return VolumeRule(
+        category, component, f'Circular_Area_{component}_Matched', height_column,
+        f'Cylinder_{component}_Volume', doubles_posts)
+
+
+def _cuboid(
+    category: str, component: int, height_column: str, doubles_posts: bool = False,
+    posts_unless_item: Optional[str] = None
+) -> VolumeRule:
+    return VolumeRule(
+        category, component, f'Rectangular_Area_{component}', height_column,
+        f'Cuboid_{component}_Volume', doubles_posts, posts_unless_item)
+
+
+def _square(category: str, height_column: str) -> VolumeRule:
+    return VolumeRule(category, 1, 'Square_Area_1', height_column, 'Squared_1_Volume')
+
+
+# The height of a component is not consistent across the hardcoded data,
+# so each category and component names its own.
+# A rule only applies to frames that have its area column
+VOLUME_RULES: Tuple[VolumeRule, ...] = (
+    _cylinder('round_rod', 1, LENGTH_DIM),
+    _cylinder('round_rod', 2, LENGTH_DIM),
+    _cylinder('round_rod', 3, LENGTH_DIM),
+    _cylinder('ring_pull_stock', 1, 'Diameter_1'),
+    _cylinder('ring_pull_stock', 2, 'Diameter_1'),
+    _cylinder('ring_pull_stock', 3, 'Diameter_1'),
+    _cylinder('round_rect_single_rods_stock', 1, LENGTH_DIM, doubles_posts=True),
+    _cylinder('round_rect_single_rods_stock', 2, LENGTH_DIM),
+    _cylinder('round_rect_single_rods_stock', 3, LENGTH_DIM),
+    _cylinder('round_square_single_rods_stock', 1, LENGTH_DIM),
+    _cylinder('round_square_single_rods_stock', 2, LENGTH_DIM),
+    _cylinder('round_square_single_rods_stock', 3, LENGTH_DIM),
+    _cylinder('pipe_composite_stock', 1, TOP_DIM),
+    _cylinder('pipe_composite_stock', 2, TOP_DIM),
+    _cylinder('pipe_composite_stock', 3, LENGTH_DIM),
+    _cylinder('three_distinct_round_rods', 1, TOP_DIM, doubles_posts=True),
+    _cylinder('three_distinct_round_rods', 2, TOP_DIM),
+    _cylinder('three_distinct_round_rods', 3, LENGTH_DIM),
+    _cylinder('two_distinct_round_rods', 1, LENGTH_DIM),
+    _cylinder('two_distinct_round_rods', 2, TOP_DIM, doubles_posts=True),
+    _cylinder('two_distinct_round_rods', 3, LENGTH_DIM),
+    _cuboid('ring_pull_stock', 1, TOP_DIM),
+    _cuboid('ring_pull_stock', 2, LENGTH_DIM),
+    _cuboid('round_rect_single_rods_stock', 1, TOP_DIM),
+    _cuboid('two_rectangular_plates', 1, TOP_DIM),
+    _cuboid('two_rectangular_plates', 2, LENGTH_DIM, doubles_posts=True,
+            posts_unless_item='DP173'),
+    _cuboid('plate', 1, LENGTH_DIM),
+    _square('round_square_single_rods_stock', TOP_DIM),
+    _square('square_rod', LENGTH_DIM),
+)
+
+# The columns the area calculation, the stock lookup and the dimension
+# update can produce, and the volumes the requirements summary adds up
+KNOWN_AREA_COLUMNS = {
+    *(f'Circular_Area_{i}_Matched' for i in range(1, MAX_CYLINDERS + 1)),
+    'Rectangular_Area_1', 'Rectangular_Area_2', 'Square_Area_1',
+}
+KNOWN_HEIGHT_COLUMNS = {
+    TOP_DIM, LENGTH_DIM, *(f'Diameter_{i}' for i in range(1, MAX_CYLINDERS + 1)),
+}
+KNOWN_VOLUME_COLUMNS = {
+    *(f'Cylinder_{i}_Volume' for i in range(1, MAX_CYLINDERS + 1)),
+    'Cuboid_1_Volume', 'Cuboid_2_Volume', 'Squared_1_Volume',
+}
+
+
+def validate_volume_rules(rules: Iterable[VolumeRule]) -> None:
+    """
+    Checks that every rule names a known category and known columns,
+    and that no two rules write the same volume of a category
+
+    Raises:
+    - ValueError: Listing every invalid rule
+    """
+    problems = []
+    seen = set()
+    for rule in rules:
+        if rule.category not in ReferenceDictionaryConstructor.ENGINEERING_CATEGORIES:
+            problems.append(f'unknown category \'{rule.category}\'')
+        for column, known_columns in [
+            (rule.area_column, KNOWN_AREA_COLUMNS),
+            (rule.height_column, KNOWN_HEIGHT_COLUMNS),
+            (rule.volume_column, KNOWN_VOLUME_COLUMNS),
+        ]:
+            if column not in known_columns:
+                problems.append(f'unknown column \'{column}\' for \'{rule.category}\'')
+        if (rule.category, rule.volume_column) in seen:
+            problems.append(f'\'{rule.volume_column}\' of \'{rule.category}\' is set twice')
+        seen.add((rule.category, rule.volume_column))
+        if rule.posts_unless_item and not rule.doubles_posts:
+            problems.append(
+                f'\'{rule.volume_column}\' of \'{rule.category}\' names an exempt item '
+                'but does not double posts')
+    if problems:
+        raise ValueError('Invalid volume rules: ' + '; '.join(problems))
+
+
+def group_rules_by_category(rules: Iterable[VolumeRule]) -> Dict[str, List[VolumeRule]]:
+    rules_by_category: Dict[str, List[VolumeRule]] = {}
+    for rule in rules:
+        rules_by_category.setdefault(rule.category, []).append(rule)
+    return rules_by_category
+
+
+validate_volume_rules(VOLUME_RULES)
@@ -0,0 +1,2 @@
+from .fake_spreadsheet import FakeSpreadsheet, FakeWorksheet
+from .pipeline_context import StubPipelineContext
@@ -0,0 +1,119 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class FakeWorksheet:
+    """
+    Offline stand-in for a gspread Worksheet that serves fixed values
+    """
+    def __init__(self, spreadsheet: 'FakeSpreadsheet', title: str):
+        self.spreadsheet = spreadsheet
+        self.title = title
+
+    def get_all_values(self) -> List[List[str]]:
+        """
+        Like gspread, pads the trimmed values back into a rectangle
+        """
+        self.spreadsheet._simulate_call()
+        values = self.spreadsheet._trimmed_values(self.title)
+        width = max((len(row) for row in values), default=0)
+        return [row + [''] * (width - len(row)) for row in values]
+
+
+class FakeSpreadsheet:
+    """
+    Offline stand-in for a gspread Spreadsheet.
+    Every values request sleeps for 'call_delay' seconds to simulate a
+    network round trip, and the number of requests and the highest
+    number of requests in flight at once are recorded. With
+    'overlapping_calls', requests are held until that many are in flight
+    together, so a client that does not overlap them fails with a
+    TimeoutError instead of merely running slower
+    """
+    OVERLAP_TIMEOUT = 10.0
+
+    def __init__(
+        self, sheets: Dict[str, List[List[str]]], call_delay: float = 0.0,
+        revision: Optional[str] = None, overlapping_calls: Optional[int] = None
+    ):
+        """
+        Parameters:
+        - sheets (Dict[str, List[List[str]]]): Cell values keyed by sheet title,
+        the first row being the header
+        - call_delay (float): Simulated latency of each request in seconds
+        - revision (str): Reported modified time, None when unavailable
+        - overlapping_calls (int): Requests in flight at once before any
+        of them is answered, None to answer each request straight away
+        """
+        self.sheets = sheets
+        self.call_delay = call_delay
+        self.revision = revision
+        self.calls = 0
+        self.max_concurrent_calls = 0
+        self.overlapping_calls = overlapping_calls
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._overlapped = threading.Event()
+        if overlapping_calls is None:
+            self._overlapped.set()
+
+    def _simulate_call(self):
+        with self._lock:
+            self.calls += 1
+            self._in_flight += 1
+            self.max_concurrent_calls = max(
+                self.max_concurrent_calls, self._in_flight)
+            if self.overlapping_calls is not None \
+                    and self._in_flight >= self.overlapping_calls:
+                self._overlapped.set()
+        try:
+            if not self._overlapped.wait(self.OVERLAP_TIMEOUT):
+                raise TimeoutError(
+                    f'{self.overlapping_calls} requests were never in flight at once')
+            time.sleep(self.call_delay)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _trimmed_values(self, title: str) -> List[List[str]]:
+        """
+        Values as the Sheets API returns them, with trailing
+        empty cells and rows left out
+        """
+        if title not in self.sheets:
+            raise KeyError(f'Worksheet \'{title}\' not found')
+        values = [list(row) for row in self.sheets[title]]
+        for row in values:
+            while row and '' == row[-1]:
+                row.pop()
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def get_lastUpdateTime(self) -> str:
+        if self.revision is None:
+            raise AttributeError('Spreadsheet revision is not available')
+        self._simulate_call()
+        return self.revision
+
+    def worksheets(self) -> List[FakeWorksheet]:
+        return [FakeWorksheet(self, title) for title in self.sheets]
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        if title not in self.sheets:
+            raise KeyError(f'Worksheet \'{title}\' not found')
+        return FakeWorksheet(self, title)
+
+    def values_batch_get(self, ranges: List[str]) -> Dict:
+        """
+        Mirrors the Sheets API batchGet response for whole-sheet ranges
+        """
+        self._simulate_call()
+        value_ranges = []
+        for sheet_range in ranges:
+            title = sheet_range[1:-1].replace("''", "'")
+            value_ranges.append(
+                {'range': sheet_range, 'values': self._trimmed_values(title)}
+            )
+        return {'valueRanges': value_ranges}
@@ -0,0 +1,176 @@
+"""
+The wide, row-by-row tally of brass requirements onto order lines that
+the keyed join and then the component table replaced, kept as the
+reference their output is checked against; and the unpivot that turned
+the wide requirement frames into a component table before the table was
+built upstream of them
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from product_profile_calculator import VOLUME_FAMILIES, ProductComponents, finalize_component_table
+from product_profile_calculator.volume_rules import VOLUME_RULES
+from utils import get_column_by_keyword, remove_textures_series
+
+GROUP_COLUMNS = ['Volume Family', 'FirstCol', 'SecondCol']
+# The areas a sheet's thickness is multiplied by
+SHEET_AREA_COLUMNS = ['Top_Area', 'Side_Area', 'Front_Plate_Area', 'Back_Plate_Area']
+
+
+def _column_or_default(dataframe: pd.DataFrame, column: str, default) -> np.ndarray:
+    if column in dataframe.columns:
+        return dataframe[column].to_numpy(copy=True)
+    return np.full(len(dataframe), default)
+
+
+def _product_codes(dataframe: pd.DataFrame) -> Optional[pd.Series]:
+    if 'Generic_Product_Code' in dataframe.columns:
+        return dataframe['Generic_Product_Code']
+    item_column = get_column_by_keyword(dataframe, 'item')
+    if item_column not in dataframe.columns:
+        return None
+    return remove_textures_series(dataframe[item_column])
+
+
+def unpivot_requirement_frame(category: str, dataframe: pd.DataFrame) -> pd.DataFrame:
+    """
+    Unpivots the wide requirement frame of one category into a row per
+    product row and component the frame has columns for. 'Product' is the
+    row's position in the frame
+    """
+    rules = {rule.volume_column: rule for rule in VOLUME_RULES if rule.category == category}
+    component_frames = []
+    for family in VOLUME_FAMILIES:
+        family_columns = [family.first_column, family.second_column, family.volume_column]
+        if not any(column in dataframe.columns for column in family_columns):
+            continue
+        rule = rules.get(family.volume_column)
+        if rule is not None:
+            areas = _column_or_default(dataframe, rule.area_column, np.nan)
+            heights = _column_or_default(dataframe, rule.height_column, np.nan)
+        elif 'Sheet' == family.shape and set(SHEET_AREA_COLUMNS) <= set(dataframe.columns):
+            areas = dataframe[SHEET_AREA_COLUMNS].sum(axis=1, min_count=1).to_numpy()
+            heights = np.full(len(dataframe), np.nan)
+        else:
+            areas = heights = np.full(len(dataframe), np.nan)
+        component_frames.append(pd.DataFrame({
+            'Product': np.arange(len(dataframe)),
+            'Shape': family.shape,
+            'Component': family.component,
+            'Volume Family': family.volume_column,
+            'Area': pd.to_numeric(areas, errors='coerce'),
+            'Height': pd.to_numeric(heights, errors='coerce'),
+            # Missing lookup columns read as zeros, as on the order lines
+            'FirstCol': _column_or_default(dataframe, family.first_column, 0),
+            'SecondCol': _column_or_default(dataframe, family.second_column, 0),
+            'Volume': pd.to_numeric(
+                _column_or_default(dataframe, family.volume_column, 0), errors='coerce'),
+        }))
+    if not component_frames:
+        return pd.DataFrame()
+    return pd.concat(component_frames, ignore_index=True)
+
+
+def tabulate_requirement_frames(brass_requirements: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    The component table of wide requirement frames keyed by category: a
+    product listed several times keeps each component from its last row
+    """
+    product_frames = []
+    component_frames = []
+    offset = 0
+    for category, dataframe in brass_requirements.items():
+        product_codes = _product_codes(dataframe)
+        components = unpivot_requirement_frame(category, dataframe)
+        if product_codes is None or components.empty:
+            continue
+        product_frames.append(pd.DataFrame({
+            'Category': category,
+            'Generic_Product_Code': product_codes.to_numpy(dtype=object),
+        }))
+        component_frames.append(components.assign(Product=components['Product'] + offset))
+        offset += len(dataframe)
+    if not product_frames:
+        product_frames = [pd.DataFrame({'Category': [], 'Generic_Product_Code': []})]
+        component_frames = [pd.DataFrame({
+            'Product': pd.Series([], dtype=int), 'Shape': [], 'Component': [],
+            'Volume Family': [], 'Area': [], 'Height': [],
+            'FirstCol': [], 'SecondCol': [], 'Volume': [],
+        })]
+    products = pd.concat(product_frames, ignore_index=True)
+    products['Category'] = pd.Categorical(
+        products['Category'].astype(object),
+        categories=[category for category in brass_requirements
+                    if category in set(products['Category'])])
+    return finalize_component_table(
+        ProductComponents(products, pd.concat(component_frames, ignore_index=True)))
+
+
+def legacy_map_requirements_onto_products(
+    items_df: pd.DataFrame, requirement_frames: List[pd.DataFrame]
+) -> None:
+    """The original tally: a boolean mask and .loc writes per requirement row"""
+    for dataframe in requirement_frames:
+        for _, required_row in dataframe.iterrows():
+            item = required_row['Generic_Product_Code']
+            matches = items_df[items_df['Generic_Product_Code'] == item].index
+            for column in dataframe.columns:
+                if column in items_df.columns and column != 'Generic_Product_Code':
+                    items_df.loc[matches, column] = required_row[column]
+
+
+def legacy_volume_totals(
+    items_df: pd.DataFrame, requirement_frames: List[pd.DataFrame]
+) -> pd.DataFrame:
+    """
+    Pads the order lines with every lookup column, tallies and melts them.
+    Later frames, and later rows of a frame, overwrite earlier ones
+    """
+    items_df = items_df.copy()
+    for family in VOLUME_FAMILIES:
+        for column in [family.first_column, family.second_column]:
+            items_df[column] = pd.Series(0, index=items_df.index, dtype=object)
+        items_df[family.volume_column] = 0.0
+    legacy_map_requirements_onto_products(items_df, requirement_frames)
+    long_volumes = pd.concat([
+        pd.DataFrame({
+            'Volume Family': family.volume_column,
+            'FirstCol': items_df[family.first_column].astype(str),
+            'SecondCol': items_df[family.second_column].astype(str),
+            'Volume': items_df[family.volume_column] * items_df['QTY'],
+        })
+        for family in VOLUME_FAMILIES
+    ], ignore_index=True)
+    return long_volumes.groupby(GROUP_COLUMNS)['Volume'].sum().reset_index()
+
+
+def build_tally_inputs(order_lines: int, products: int, seed: int = 0):
+    """
+    Random order lines and three category frames whose product codes
+    overlap, so that later frames overwrite earlier ones
+    """
+    rng = np.random.default_rng(seed)
+    codes = np.array([f'dp{i}' for i in range(products)])
+    items_df = pd.DataFrame({
+        'ITEM': rng.choice(codes, order_lines),
+        'QTY': rng.integers(1, 50, order_lines),
+    })
+    items_df['Generic_Product_Code'] = items_df['ITEM']
+    requirement_frames = []
+    for shape, volume_column in [
+        ('Circular_Area_1', 'Cylinder_1_Volume'), ('Rectangular_Area_1', 'Cuboid_1_Volume'),
+        ('Circular_Area_1', 'Cylinder_1_Volume')
+    ]:
+        category_codes = rng.choice(codes, products // 2)
+        requirement_frames.append(pd.DataFrame({
+            'ITEM': np.char.upper(category_codes.astype(str)),
+            'Generic_Product_Code': category_codes,
+            f'{shape}_Matched_FirstCol': rng.choice(
+                ['Round Rod', 'Hex Rod', 0], len(category_codes)),
+            f'{shape}_Matched_SecondCol': rng.choice(
+                ['10MM', '12MM'], len(category_codes)),
+            volume_column: rng.uniform(100, 5000, len(category_codes)),
+        }))
+    return items_df, requirement_frames
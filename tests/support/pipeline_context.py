@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+from typing import Dict
+
+import pandas as pd
+
+from tests.support.legacy_tally import tabulate_requirement_frames
+
+
+class StubPipelineContext:
+    """
+    Serves fixed order lines, and the component table of fixed wide brass
+    requirements, to the summaries
+    """
+    profile_calculator = None
+
+    def __init__(self, items_df: pd.DataFrame, brass_requirements: Dict[str, pd.DataFrame]):
+        self.data_preparer = SimpleNamespace(products_dataframe=items_df)
+        self.brass_requirements = brass_requirements
+
+    def get_data_preparer(self):
+        return self.data_preparer
+
+    def get_engineering_categories(self):
+        return self.brass_requirements
+
+    def get_component_table(self):
+        return tabulate_requirement_frames(self.brass_requirements)
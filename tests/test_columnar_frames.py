@@ -0,0 +1,67 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processing.columnar_frames import (
+    frame_to_table, read_table, table_to_frame, write_table
+)
+
+METADATA_KEY = 'frame'
+UTC_PLUS_ONE = datetime.timezone(datetime.timedelta(hours=1))
+
+
+def mixed_frame():
+    cells = [
+        'DP1', '', 12, np.int64(7), 2.5, np.float32(0.25), True, np.bool_(False),
+        datetime.datetime(2024, 3, 1, 9, 30, 15, 250),
+        datetime.datetime(2024, 3, 1, tzinfo=UTC_PLUS_ONE),
+        pd.Timestamp('2024-03-01 09:30:00.000000123'), pd.Timestamp('2024-03-01', tz=UTC_PLUS_ONE),
+        datetime.date(2024, 3, 1), datetime.time(9, 30), datetime.time(23, 59, 59, 999),
+    ]
+    return pd.DataFrame({
+        'Mixed': pd.Series(cells, dtype=object),
+        'Text': pd.Series([f'ITEM {i}' for i in range(len(cells))], dtype=object),
+        'Count': np.arange(len(cells)),
+        'Area': np.linspace(0, 1, len(cells)),
+        'Open': np.arange(len(cells)) % 2 == 0,
+        'Due': pd.date_range('2024-01-01', periods=len(cells)),
+    }, index=np.arange(len(cells)) * 3)
+
+
+def round_trip(df, tmp_path, keep_index=True):
+    path = str(tmp_path / 'frame.arrow')
+    write_table(frame_to_table(df, METADATA_KEY, keep_index=keep_index), path)
+    return table_to_frame(read_table(path), METADATA_KEY)
+
+
+def test_mixed_object_columns_round_trip(tmp_path):
+    df = mixed_frame()
+    restored = round_trip(df, tmp_path)
+    pd.testing.assert_frame_equal(restored, df, check_index_type=False)
+    # Every cell keeps its type, not only its value
+    for original, value in zip(df['Mixed'], restored['Mixed']):
+        expected_type = {
+            np.int64: int, np.float32: float, np.bool_: bool
+        }.get(type(original), type(original))
+        assert expected_type is type(value), (original, value)
+
+
+@pytest.mark.parametrize('missing', [None, np.nan, pd.NaT])
+def test_missing_cells_come_back_as_nan(tmp_path, missing):
+    df = pd.DataFrame({'Mixed': pd.Series(['DP1', missing, 3], dtype=object)})
+    restored = round_trip(df, tmp_path, keep_index=False)
+    assert ['DP1', 3] == restored['Mixed'].iloc[[0, 2]].tolist()
+    assert restored['Mixed'].iloc[1] is np.nan
+
+
+def test_other_types_come_back_as_text(tmp_path):
+    df = pd.DataFrame({'Mixed': pd.Series([datetime.timedelta(days=1), ('a', 1)], dtype=object)})
+    restored = round_trip(df, tmp_path, keep_index=False)
+    assert ['1 day, 0:00:00', "('a', 1)"] == restored['Mixed'].tolist()
+
+
+def test_blank_and_repeated_column_names_round_trip(tmp_path):
+    df = pd.DataFrame([['a', 1, 2.0]], columns=['', 'X', 'X'])
+    pd.testing.assert_frame_equal(round_trip(df, tmp_path, keep_index=False), df)
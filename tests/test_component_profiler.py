@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic_data import build_synthetic_inputs
+from product_profile_calculator import (
+    CategoryProfileRunner, ProfileCalculator, finalize_component_table
+)
+from product_profile_calculator.category_profile_runner import CategoryProfiler
+from tests.support.legacy_tally import tabulate_requirement_frames
+
+STOCK = {
+    'Rods': pd.DataFrame({
+        'Stock Type': ['Round Rod'] * 3,
+        'Dimensions': ['12MM', '20MM', '32MM'],
+        'Top Area': [113.1, 314.16, 804.25],
+    }),
+    'Patti_Sheets': pd.DataFrame({
+        'Stock Type': ['Brass Patti'] * 3,
+        'Dimensions': ['5X5', '10X20', '30X40'],
+        'Top Area': [25.0, 200.0, 1200.0],
+    }),
+}
+
+
+@pytest.fixture(scope='module')
+def synthetic_profile_inputs(tmp_path_factory):
+    config, live_sheets = build_synthetic_inputs(
+        str(tmp_path_factory.mktemp('synthetic')), 600, 2000, 150, seed=0)
+    profile_calculator = ProfileCalculator(config, live_sheets)
+    return (profile_calculator.dimension_updater.product_engineering_categories,
+            profile_calculator.brass_stock_modeler.inventory_dict)
+
+
+def wide_brass_requirements(items_dict, raw_stock_dict):
+    """The per-category chain of wide frames the component table replaced"""
+    profile_calculator = ProfileCalculator({}, {})
+    area_calculator = profile_calculator.area_calculator
+    volume_calculator = profile_calculator.volume_calculator
+    items_dict = area_calculator.calculate_areas_for_rectangular_shapes(
+        area_calculator.parse_circular_areas_into_dict(items_dict))
+    items_dict = profile_calculator.source_linker.lookup_raw_stock(items_dict, raw_stock_dict)
+    brass_requirements = volume_calculator.calculate_component_volumes(items_dict)
+    brass_requirements['metal_sheet'] = volume_calculator.calculate_sheet_volume(
+        brass_requirements['metal_sheet'])
+    return brass_requirements
+
+
+def component_table(items_dict, raw_stock_dict=STOCK):
+    return finalize_component_table(
+        CategoryProfiler(raw_stock_dict).profile_categories(items_dict))
+
+
+def test_component_table_matches_wide_requirement_frames(synthetic_profile_inputs):
+    items_dict, raw_stock_dict = synthetic_profile_inputs
+    table = component_table(items_dict, raw_stock_dict)
+    expected = tabulate_requirement_frames(wide_brass_requirements(items_dict, raw_stock_dict))
+    # The wide frames kept no thickness for a sheet, and summed its areas skipping blanks
+    is_sheet = (table['Shape'] == 'Sheet').to_numpy()
+    assert is_sheet.any()
+    table.loc[is_sheet, ['Area', 'Height']] = expected.loc[is_sheet, ['Area', 'Height']]
+    pd.testing.assert_frame_equal(table, expected)
+
+
+def test_categories_profiled_one_by_one_match_profiled_together(synthetic_profile_inputs):
+    items_dict, raw_stock_dict = synthetic_profile_inputs
+    pd.testing.assert_frame_equal(
+        CategoryProfileRunner(0).run(items_dict, raw_stock_dict),
+        component_table(items_dict, raw_stock_dict))
+
+
+def test_later_listing_without_a_component_clears_it():
+    items_dict = {
+        'plate': pd.DataFrame({
+            'ITEM': ['DP2'], 'Component Sizes': ['10 X 20'], 'Length Dim (mm)': [5.0],
+        }),
+        # DP1 is listed again without a diameter; DP2 adds a cylinder to its plate
+        'round_rod': pd.DataFrame({
+            'ITEM': ['DP1', 'DP2', 'DP1'], 'Component Sizes': ['10 Dia', '12 Dia', 'Scrap'],
+            'Length Dim (mm)': [50.0, 60.0, 70.0],
+        }),
+    }
+    table = component_table(items_dict)
+    assert ['dp2', 'dp2'] == table['Generic_Product_Code'].tolist()
+    assert ['Cuboid_1_Volume', 'Cylinder_1_Volume'] == table['Volume Family'].tolist()
+    np.testing.assert_allclose(table['Volume'], [200.0 * 5.0, 113.1 * 60.0])
+
+
+def test_products_sharing_a_label_are_matched_on_their_own_sizes():
+    products = pd.DataFrame({
+        'ITEM': ['A', 'B', 'C'], 'Component Sizes': ['10 Dia', '40 Dia', '30 Dia'],
+        'Length Dim (mm)': [10.0, 10.0, 10.0],
+    }, index=[0, 0, 0])
+    table = component_table({'round_rod': products})
+    # No rod is as large as B's, so B needs no stock at all
+    assert ['a', 'c'] == table['Generic_Product_Code'].tolist()
+    assert ['12MM', '32MM'] == table['SecondCol'].tolist()
+    np.testing.assert_allclose(table['Volume'], [1131.0, 8042.5])
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processing import DescriptionDimensionProcessor, DescriptionParseCache
+from data_processing.constants import STOCK_TO_UNITS_MAP
+from product_profile_calculator import ProductAreaCalculator
+
+ROD_DESCRIPTIONS = [
+    'Round Rod 12mm', 'Brass Hex Rod 10 X 12.5', 'Round Rod 12mm', None,
+    'Square Rod 8mm', 'Brass Patti 5 X 5', 'round rod 20',
+]
+SHEET_DESCRIPTIONS = [
+    '40 X 5', '1.5" X 2"', '40 X 5', None, '10 X 20 X 3', 'Scrap', "3'' X 10mm",
+]
+PLATE_SIZES = ['10 X 20 & 5 X 5', '30 x 40', '10 X 20 & 5 X 5', 'Scrap', '2.5 X 4']
+SQUARE_SIZES = ['10 Sq', '12.5 sq', '10 Sq', 'Scrap', '8 Sq']
+
+
+def rod_dimensions(parse_cache):
+    processor = DescriptionDimensionProcessor(parse_cache=parse_cache)
+    df = pd.DataFrame({'Description': ROD_DESCRIPTIONS})
+    parsed = processor.add_rod_dimensions_to_dataframe(df, 'Description')
+    return parsed['Description'].tolist()
+
+
+def uncached_rod_dimensions():
+    processor = DescriptionDimensionProcessor(parse_cache=DescriptionParseCache())
+    return [
+        np.nan if description is None else
+        processor.parse_dimensions_from_rod_description(description, STOCK_TO_UNITS_MAP)
+        for description in ROD_DESCRIPTIONS
+    ]
+
+
+def non_rod_dimensions(parse_cache):
+    processor = DescriptionDimensionProcessor(parse_cache=parse_cache)
+    df = pd.DataFrame({'Description': SHEET_DESCRIPTIONS})
+    parsed = processor.add_non_rod_dimensions_to_dataframe(df, 'Description')
+    return list(zip(parsed['Dimension_1'], parsed['Dimension_2']))
+
+
+def uncached_non_rod_dimensions():
+    processor = DescriptionDimensionProcessor(parse_cache=DescriptionParseCache())
+    dimensions = [
+        processor.extract_and_standardize_dimensions(description)
+        for description in SHEET_DESCRIPTIONS
+    ]
+    # Descriptions with fewer than two dimensions are padded with zeros
+    return [tuple((list(pair) + [0.0, 0.0])[:2]) for pair in dimensions]
+
+
+def plate_areas(parse_cache):
+    products = pd.DataFrame({'ITEM': range(len(PLATE_SIZES)), 'Component Sizes': PLATE_SIZES})
+    areas = ProductAreaCalculator(parse_cache).calculate_areas_for_rectangular_shapes(
+        {'plate': products})['plate']
+    return areas[['Rectangular_Area_1', 'Rectangular_Area_2']].fillna(-1).values.tolist()
+
+
+def uncached_plate_areas():
+    calculator = ProductAreaCalculator(DescriptionParseCache())
+    return [
+        (calculator.parse_plate_areas(size) + [-1, -1])[:2] for size in PLATE_SIZES
+    ]
+
+
+def square_areas(parse_cache):
+    products = pd.DataFrame({'ITEM': range(len(SQUARE_SIZES)), 'Component Sizes': SQUARE_SIZES})
+    areas = ProductAreaCalculator(parse_cache).calculate_areas_for_rectangular_shapes(
+        {'square_rod': products})['square_rod']
+    return areas['Square_Area_1'].fillna(-1).tolist()
+
+
+def uncached_square_areas():
+    calculator = ProductAreaCalculator(DescriptionParseCache())
+    return [
+        -1 if area is None else area
+        for area in map(calculator.calculate_square_area, SQUARE_SIZES)
+    ]
+
+
+PARSERS = {
+    'rod dimensions': (rod_dimensions, uncached_rod_dimensions),
+    'non-rod dimensions': (non_rod_dimensions, uncached_non_rod_dimensions),
+    'plate areas': (plate_areas, uncached_plate_areas),
+    'square areas': (square_areas, uncached_square_areas),
+}
+
+
+@pytest.mark.parametrize('max_entries', [DescriptionParseCache.DEFAULT_MAX_ENTRIES, 1])
+@pytest.mark.parametrize('parser_name', list(PARSERS))
+def test_cached_parse_matches_uncached_parse(parser_name, max_entries):
+    cached_parse, uncached_parse = PARSERS[parser_name]
+    parse_cache = DescriptionParseCache(max_entries=max_entries)
+    expected = uncached_parse()
+    first = cached_parse(parse_cache)
+    second = cached_parse(parse_cache)
+    pd.testing.assert_series_equal(pd.Series(first, dtype=object),
+                                   pd.Series(expected, dtype=object))
+    pd.testing.assert_series_equal(pd.Series(second, dtype=object),
+                                   pd.Series(expected, dtype=object))
+    stats = parse_cache.stats()[parser_name]
+    assert min(max_entries, stats['misses']) == stats['size']
+    if DescriptionParseCache.DEFAULT_MAX_ENTRIES == max_entries:
+        assert stats['hits'] > stats['misses']
+
+
+def test_least_recently_used_descriptions_are_evicted():
+    parse_cache = DescriptionParseCache(max_entries=2)
+    parsed = []
+
+    def parse(descriptions):
+        parsed.extend(descriptions)
+        return [description.upper() for description in descriptions]
+
+    parse_cache.parse_many('upper', ['a', 'b', 'a'], parse)
+    parse_cache.parse_many('upper', ['a'], parse)
+    # 'b' is the least recently used, so 'c' takes its place
+    parse_cache.parse_many('upper', ['c'], parse)
+    assert ['A', 'B', 'C'] == parse_cache.parse_many('upper', ['a', 'b', 'c'], parse).tolist()
+    assert ['a', 'b', 'c', 'b'] == parsed
+    assert {'hits': 4, 'misses': 4, 'hit_rate': 0.5, 'size': 2} == \
+        parse_cache.stats()['upper']
+
+
+def test_parse_cache_size_must_be_positive():
+    with pytest.raises(ValueError):
+        DescriptionParseCache(max_entries=0)
@@ -0,0 +1,47 @@
+import pandas as pd
+
+from inventory_calculation import ExceptionManager
+from tests.support import StubPipelineContext
+
+ORDERED_PRODUCTS = ['dp1', 'fg1', 'xx1', 'fg1', 'dp1']
+
+
+def order_lines():
+    return pd.DataFrame({
+        'ITEM': [code.upper() for code in ORDERED_PRODUCTS],
+        'QTY': range(1, len(ORDERED_PRODUCTS) + 1),
+        'Generic_Product_Code': ORDERED_PRODUCTS,
+    })
+
+
+def rod_requirements():
+    return pd.DataFrame({
+        'ITEM': ['DP1'],
+        'Generic_Product_Code': ['dp1'],
+        'Circular_Area_1_Matched_FirstCol': ['Round Rod'],
+        'Circular_Area_1_Matched_SecondCol': ['12MM'],
+        'Cylinder_1_Volume': [100.0],
+    })
+
+
+def unmatched_products(brass_requirements):
+    items_df = order_lines()
+    exception_manager = ExceptionManager(
+        {}, {}, StubPipelineContext(items_df, brass_requirements))
+    unmatched_rows = exception_manager.execute()
+    # The prepared order lines are shared with the other summaries
+    assert 'IsForged' not in items_df.columns
+    return unmatched_rows['Generic_Product_Code'].tolist()
+
+
+def test_forged_products_are_not_reported():
+    brass_requirements = {
+        'round_rod': rod_requirements(),
+        'Scrap': pd.DataFrame({'ITEM': ['fg1']}),
+    }
+    assert ['xx1'] == unmatched_products(brass_requirements)
+
+
+def test_without_scrap_every_product_without_components_is_reported(capsys):
+    assert ['fg1', 'xx1', 'fg1'] == unmatched_products({'round_rod': rod_requirements()})
+    assert 'No item column found' not in capsys.readouterr().out
@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from data_processing import GoogleSheetsClient
+from tests.support import FakeSpreadsheet
+
+DECLARED_TITLES = [f'TAB {i}' for i in range(6)]
+
+
+def build_sheets():
+    """Declared tabs with trailing empty cells, plus one tab never read"""
+    sheets = {
+        title: [['ITEM', 'QTY', 'NOTE']] + [[f'{title} {i}', str(i), ''] for i in range(3)]
+        for title in DECLARED_TITLES
+    }
+    sheets['UNUSED TAB'] = [['X'], ['1']]
+    return sheets
+
+
+def expected_frame(title):
+    return pd.DataFrame({
+        'ITEM': [f'{title} {i}' for i in range(3)],
+        'QTY': [str(i) for i in range(3)],
+        'NOTE': [''] * 3,
+    })
+
+
+def fetch(spreadsheet, **client_options):
+    return GoogleSheetsClient(
+        {}, sheet_titles=DECLARED_TITLES, spreadsheet=spreadsheet, **client_options)
+
+
+def assert_declared_sheets(live_sheets):
+    assert list(live_sheets) == DECLARED_TITLES
+    for title, sheet in live_sheets.items():
+        pd.testing.assert_frame_equal(sheet, expected_frame(title), check_names=False)
+
+
+def test_batch_fetches_declared_sheets_in_one_request():
+    spreadsheet = FakeSpreadsheet(build_sheets())
+    client = fetch(spreadsheet, fetch_mode='batch')
+    assert_declared_sheets(client.live_sheets)
+    assert 1 == spreadsheet.calls
+    assert 1 == spreadsheet.max_concurrent_calls
+
+
+@pytest.mark.parametrize('max_workers', [1, 2, 4])
+def test_threads_fetch_declared_sheets_with_bounded_concurrency(max_workers):
+    # No request is answered before 'max_workers' of them are in flight,
+    # so fetching the tabs one after another would time out
+    spreadsheet = FakeSpreadsheet(build_sheets(), overlapping_calls=max_workers)
+    client = fetch(spreadsheet, fetch_mode='threads', max_workers=max_workers)
+    assert_declared_sheets(client.live_sheets)
+    assert len(DECLARED_TITLES) == spreadsheet.calls
+    assert max_workers == spreadsheet.max_concurrent_calls
+
+
+def test_requests_that_never_overlap_time_out(monkeypatch):
+    monkeypatch.setattr(FakeSpreadsheet, 'OVERLAP_TIMEOUT', 0.01)
+    spreadsheet = FakeSpreadsheet(build_sheets(), overlapping_calls=2)
+    with pytest.raises(TimeoutError):
+        fetch(spreadsheet, fetch_mode='threads', max_workers=1)
+
+
+def test_batch_falls_back_to_threads_without_batch_requests():
+    class WorksheetOnlySpreadsheet(FakeSpreadsheet):
+        values_batch_get = None
+
+    spreadsheet = WorksheetOnlySpreadsheet(build_sheets(), overlapping_calls=3)
+    client = fetch(spreadsheet, fetch_mode='batch', max_workers=3)
+    assert_declared_sheets(client.live_sheets)
+    assert len(DECLARED_TITLES) == spreadsheet.calls
+    assert 3 == spreadsheet.max_concurrent_calls
+
+
+def test_unknown_fetch_mode_is_rejected():
+    with pytest.raises(ValueError):
+        fetch(FakeSpreadsheet(build_sheets()), fetch_mode='serial')
@@ -0,0 +1,123 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic_data import build_synthetic_inputs
+from inventory_calculation import (
+    BrassStockRequirementsSummary, IncrementalRequirementsSummary, RequirementsStateStore
+)
+
+SOL_TITLE = 'SOL NEW CONSOLIDATED'
+STOCK_TITLE = 'RAW MATERIALS MAIN ORDERS'
+
+
+@pytest.fixture(scope='module')
+def synthetic_inputs(tmp_path_factory):
+    return build_synthetic_inputs(
+        str(tmp_path_factory.mktemp('inputs')), skus=300, order_lines=1000, stock_rows=100)
+
+
+@pytest.fixture
+def state_store(tmp_path):
+    return RequirementsStateStore(str(tmp_path / 'state'))
+
+
+def run_incremental(config, live_sheets, state_store):
+    """Runs the incremental summary and checks it against a full run"""
+    summary = IncrementalRequirementsSummary(config, live_sheets, state_store)
+    full_summary = BrassStockRequirementsSummary(config, live_sheets)
+    pd.testing.assert_frame_equal(
+        summary.total_requirements, full_summary.total_requirements,
+        check_exact=False, rtol=1e-9)
+    assert len(summary.items_df) == len(full_summary.items_df)
+    return summary
+
+
+def assert_full_run(summary):
+    assert summary.profiles_recomputed
+    assert {'added': len(summary.items_df), 'removed': 0, 'changed': 0} == \
+        summary.order_changes
+
+
+def edit_orders(sol_sheet, added, removed, changed):
+    """
+    Changes the quantity of 'changed' open lines, drops 'removed' others
+    and appends 'added' lines of a new P.O. Only lines whose P.O and item
+    no other line shares are edited, so no other line is renumbered
+    """
+    is_open = sol_sheet['STATUS'].eq('') & sol_sheet['TRACKING'].eq('')
+    keys = sol_sheet[['P.O', 'ITEM CODE']]
+    has_unique_key = ~keys.duplicated(keep=False)
+    editable_rows = sol_sheet.index[is_open & has_unique_key]
+    assert len(editable_rows) >= removed + changed
+    changed_rows = editable_rows[:changed]
+    removed_rows = editable_rows[changed:changed + removed]
+    edited = sol_sheet.copy()
+    edited.loc[changed_rows, 'QTY'] = (
+        edited.loc[changed_rows, 'QTY'].astype(int) + 1).astype(str)
+    edited = edited.drop(index=removed_rows)
+    new_lines = sol_sheet[is_open].head(added).assign(**{'P.O': '999999'})
+    return pd.concat([edited, new_lines], ignore_index=True)
+
+
+def test_order_changes_match_full_run(synthetic_inputs, state_store):
+    config, live_sheets = synthetic_inputs
+    assert_full_run(run_incremental(config, live_sheets, state_store))
+
+    unchanged = run_incremental(config, live_sheets, state_store)
+    assert not unchanged.profiles_recomputed
+    assert {'added': 0, 'removed': 0, 'changed': 0} == unchanged.order_changes
+
+    edited_sheets = dict(live_sheets, **{
+        SOL_TITLE: edit_orders(live_sheets[SOL_TITLE], added=15, removed=20, changed=20)
+    })
+    edited = run_incremental(config, edited_sheets, state_store)
+    assert not edited.profiles_recomputed
+    assert {'added': 15, 'removed': 20, 'changed': 20} == edited.order_changes
+
+    # Going back to the original orders undoes every change
+    restored = run_incremental(config, live_sheets, state_store)
+    assert not restored.profiles_recomputed
+    assert {'added': 20, 'removed': 15, 'changed': 20} == restored.order_changes
+
+
+def test_changed_stock_sheet_recomputes_profiles(synthetic_inputs, state_store):
+    config, live_sheets = synthetic_inputs
+    run_incremental(config, live_sheets, state_store)
+    stock_sheet = live_sheets[STOCK_TITLE].copy()
+    stock_sheet.iloc[1, 2] = str(float(stock_sheet.iloc[1, 2]) + 1)
+    changed_stock = dict(live_sheets, **{STOCK_TITLE: stock_sheet})
+    assert_full_run(run_incremental(config, changed_stock, state_store))
+
+
+def test_changed_profile_inputs_recompute_profiles(synthetic_inputs, state_store, tmp_path):
+    config, live_sheets = synthetic_inputs
+    run_incremental(config, live_sheets, state_store)
+    with open(config['HARDCODED_DATA_FILEPATH']) as json_file:
+        hardcoded_dimensions = json.load(json_file)
+    category = next(iter(hardcoded_dimensions))
+    hardcoded_dimensions[category][0][1] += 1
+    changed_path = tmp_path / 'hardcoded_dimensions.json'
+    changed_path.write_text(json.dumps(hardcoded_dimensions))
+    changed_config = dict(config, HARDCODED_DATA_FILEPATH=str(changed_path))
+    assert_full_run(run_incremental(changed_config, live_sheets, state_store))
+
+
+@pytest.mark.parametrize('damage', ['missing', 'corrupt', 'old version'])
+def test_unusable_state_falls_back_to_full_run(synthetic_inputs, state_store, damage):
+    config, live_sheets = synthetic_inputs
+    run_incremental(config, live_sheets, state_store)
+    if 'missing' == damage:
+        os.remove(state_store.state_path)
+    elif 'corrupt' == damage:
+        with open(state_store.state_path, 'wb') as state_file:
+            state_file.write(np.random.default_rng(0).bytes(256))
+    else:
+        state = state_store.load()
+        pd.to_pickle(dict(state, version=RequirementsStateStore.STATE_VERSION - 1),
+                     state_store.state_path)
+    assert state_store.load() is None
+    assert_full_run(run_incremental(config, live_sheets, state_store))
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processing import ProductAggregator
+from product_profile_calculator import ProductAreaCalculator, ProductSourceLinker
+
+STOCK = {
+    'Rods': pd.DataFrame({
+        'Stock Type': ['Round Rod'] * 3,
+        'Dimensions': ['12MM', '20MM', '32MM'],
+        'Top Area': [113.1, 314.16, 804.25],
+    }),
+    'Patti_Sheets': pd.DataFrame({
+        'Stock Type': ['Brass Patti'] * 3,
+        'Dimensions': ['5X5', '10X20', '30X40'],
+        'Top Area': [25.0, 200.0, 1200.0],
+    }),
+}
+
+
+def link(products_dict):
+    return ProductSourceLinker().lookup_raw_stock(products_dict, STOCK)
+
+
+def test_rows_sharing_a_label_keep_their_own_circular_areas_and_stock():
+    products = pd.DataFrame(
+        {'ITEM': ['A', 'B'], 'Component Sizes': ['10 Dia', '30 Dia']}, index=[0, 0])
+    areas = ProductAreaCalculator().parse_circular_areas_into_dict({'round_rod': products})
+    linked = link(areas)['round_rod']
+    np.testing.assert_allclose(
+        linked['Circular_Area_1'], np.pi * (np.array([10.0, 30.0]) / 2) ** 2)
+    assert [113.1, 804.25] == linked['Circular_Area_1_Matched'].tolist()
+    assert ['12MM', '32MM'] == linked['Circular_Area_1_Matched_SecondCol'].tolist()
+
+
+def test_rows_sharing_a_label_keep_their_own_rectangular_areas_and_stock():
+    products = pd.DataFrame(
+        {'ITEM': ['A', 'B'], 'Component Sizes': ['10 X 20 & 5 X 5', '30 X 40 & 5 X 5.5']},
+        index=[3, 3])
+    areas = ProductAreaCalculator().calculate_areas_for_rectangular_shapes({'plate': products})
+    linked = link(areas)['plate']
+    assert [200.0, 1200.0] == linked['Rectangular_Area_1'].tolist()
+    assert [25.0, 27.5] == linked['Rectangular_Area_2'].tolist()
+    assert [200.0, 1200.0] == linked['Rectangular_Area_1_Matched'].tolist()
+    assert ['10X20', '30X40'] == linked['Rectangular_Area_1_Matched_SecondCol'].tolist()
+    assert ['5X5', '10X20'] == linked['Rectangular_Area_2_Matched_SecondCol'].tolist()
+
+
+@pytest.mark.parametrize('regular_rows, ordered_rows', [(2, 3), (0, 2), (3, 0)])
+def test_combined_products_have_one_row_per_label(regular_rows, ordered_rows):
+    regular_items = pd.DataFrame({
+        'ITEM': [f'R{i}' for i in range(regular_rows)],
+        'WORK METHOD': ['CAST'] * regular_rows,
+        'MATERIALS SIZES(MM)': ['10 Dia'] * regular_rows,
+    })
+    items_on_order = pd.DataFrame({
+        'ITEM NAME': [f'O{i}' for i in range(ordered_rows)],
+        'WORK TYPE': ['FORGED'] * ordered_rows,
+        'Component Sizes': ['20 Dia'] * ordered_rows,
+    })
+    combined = ProductAggregator.combine_products_creation_information(
+        regular_items, items_on_order)
+    assert combined.index.equals(pd.RangeIndex(regular_rows + ordered_rows))
+    assert combined['ITEM'].tolist() == (
+        regular_items['ITEM'].tolist() + items_on_order['ITEM NAME'].tolist())
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from product_profile_calculator import ProductSourceLinker
+from product_profile_calculator.product_stock_linker import StockAreaIndex
+
+RODS = pd.DataFrame({
+    'Stock Type': ['Round Rod', 'Hex Rod', 'Round Rod', 'Square Rod', 'Round Rod'],
+    'Dimensions': ['20MM', '19MM', '12MM', '20MM', 'NO SIZE'],
+    'Top Area': [314.16, 314.16, 113.1, 314.16, np.nan],
+})
+
+
+def link_circular(products):
+    return ProductSourceLinker().link_shape_to_source(products, {'Rods': RODS}, 'Circular')
+
+
+def test_lookup_takes_smallest_area_at_or_above():
+    matched_areas, matched_positions = StockAreaIndex(RODS).lookup(
+        pd.Series([50.0, 113.1, 200.0, 400.0, np.nan]))
+    np.testing.assert_array_equal(matched_areas, [113.1, 113.1, 314.16, np.nan, np.nan])
+    np.testing.assert_array_equal(matched_positions, [2, 2, 0, -1, -1])
+
+
+def test_first_stock_row_wins_equal_areas():
+    linked = link_circular(pd.DataFrame({'Circular_Area_1': [200.0, 314.16]}))
+    assert ['Round Rod', 'Round Rod'] == linked['Circular_Area_1_Matched_FirstCol'].tolist()
+    assert ['20MM', '20MM'] == linked['Circular_Area_1_Matched_SecondCol'].tolist()
+    # Reordering the stock changes which of the tied rows is first
+    reordered = ProductSourceLinker().link_shape_to_source(
+        pd.DataFrame({'Circular_Area_1': [200.0]}),
+        {'Rods': RODS.iloc[[1, 0, 2, 3, 4]]}, 'Circular')
+    assert ['Hex Rod'] == reordered['Circular_Area_1_Matched_FirstCol'].tolist()
+
+
+def test_rows_sharing_a_label_are_matched_on_their_own_areas():
+    products = pd.DataFrame(
+        {'Circular_Area_1': [50.0, 400.0, 200.0, 'n/a']}, index=[7, 7, 7, 7])
+    linked = link_circular(products)
+    assert linked.index.equals(products.index)
+    np.testing.assert_array_equal(
+        linked['Circular_Area_1_Matched'], [113.1, np.nan, 314.16, np.nan])
+    assert ['12MM', None, '20MM', None] == linked['Circular_Area_1_Matched_SecondCol'].tolist()
+    # The input frame is left as it was
+    assert 'Circular_Area_1_Matched' not in products.columns
+    assert 'n/a' == products['Circular_Area_1'].iloc[3]
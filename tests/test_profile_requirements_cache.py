@@ -0,0 +1,163 @@
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from data_processing import ProfileRequirementsCache
+from inventory_calculation import PipelineContext
+
+KEY = '0123456789abcdef' * 2
+
+
+def requirements():
+    return {'round_rod': pd.DataFrame({'ITEM': ['DP1', 'DP2'], 'Cylinder_1_Volume': [1.5, 2.0]})}
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / 'profiles')
+
+
+@pytest.fixture
+def outside_dir(tmp_path):
+    outside = tmp_path / 'outside'
+    outside.mkdir()
+    (outside / ProfileRequirementsCache.MANIFEST_FILE).write_text('{"categories": {}}')
+    return outside
+
+
+@pytest.mark.parametrize('key', [
+    '..', '/', '', '../outside', 'profiles/../outside', KEY.upper(), KEY[:-1], KEY + '0', 1,
+])
+def test_malformed_keys_are_rejected(cache_dir, outside_dir, key):
+    cache = ProfileRequirementsCache(cache_dir)
+    cache.store(KEY, requirements())
+    with pytest.raises(ValueError):
+        cache.purge(key)
+    with pytest.raises(ValueError):
+        cache.store(key, requirements())
+    assert outside_dir.is_dir()
+    assert [KEY] == [entry['key'] for entry in cache.entries()]
+
+
+def test_entry_linked_outside_the_cache_is_not_removed(cache_dir, outside_dir):
+    os.makedirs(cache_dir)
+    os.symlink(outside_dir, os.path.join(cache_dir, KEY))
+    cache = ProfileRequirementsCache(cache_dir)
+    with pytest.raises(ValueError):
+        cache.purge(KEY)
+    assert 0 == cache.purge()
+    assert outside_dir.is_dir()
+
+
+def test_purge_skips_directories_without_a_manifest(cache_dir):
+    cache = ProfileRequirementsCache(cache_dir)
+    cache.store(KEY, requirements())
+    bare_key = 'f' * ProfileRequirementsCache.KEY_LENGTH
+    os.makedirs(os.path.join(cache_dir, bare_key))
+    assert 0 == cache.purge(bare_key)
+    assert os.path.isdir(os.path.join(cache_dir, bare_key))
+    assert 1 == cache.purge(KEY)
+    assert not os.path.exists(os.path.join(cache_dir, KEY))
+
+
+def test_cli_refuses_malformed_keys(cache_dir, outside_dir):
+    ProfileRequirementsCache(cache_dir).store(KEY, requirements())
+    completed = subprocess.run(
+        [sys.executable, '-m', 'data_processing.profile_cache_cli',
+         '--cache-dir', cache_dir, 'purge', '..'],
+        capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    )
+    assert 2 == completed.returncode
+    assert 'Not a profile cache key' in completed.stderr
+    assert outside_dir.is_dir()
+    assert os.path.isdir(os.path.join(cache_dir, KEY))
+
+
+def test_entries_round_trip_and_count_hits(cache_dir):
+    cache = ProfileRequirementsCache(cache_dir)
+    assert cache.load(KEY) is None
+    stored = {
+        'round_rod': pd.DataFrame(
+            {'ITEM': ['DP1', 'DP2'], 'Sizes': ['10 Dia', 12], 'Cylinder_1_Volume': [1.5, 2.0]},
+            index=[4, 9]),
+        'plate': pd.DataFrame({'ITEM': pd.Series([], dtype=object)}),
+    }
+    cache.store(KEY, stored)
+    loaded = cache.load(KEY)
+    assert list(loaded) == list(stored)
+    for category, df in stored.items():
+        pd.testing.assert_frame_equal(loaded[category], df, check_index_type=False)
+    assert {'hits': 1, 'misses': 1} == cache.stats()
+
+
+def test_other_content_key_misses(cache_dir):
+    cache = ProfileRequirementsCache(cache_dir)
+    cache.store(KEY, requirements())
+    assert cache.load('f' * ProfileRequirementsCache.KEY_LENGTH) is None
+    assert {'hits': 0, 'misses': 1} == cache.stats()
+
+
+def test_interrupted_store_misses(cache_dir):
+    cache = ProfileRequirementsCache(cache_dir)
+    cache.store(KEY, requirements())
+    os.remove(os.path.join(cache_dir, KEY, ProfileRequirementsCache.MANIFEST_FILE))
+    assert cache.load(KEY) is None
+    assert [] == cache.entries()
+
+
+def test_least_recently_used_entries_are_evicted(cache_dir, monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr(
+        'data_processing.profile_requirements_cache.time.time', lambda: clock[0])
+    keys = [str(i) * ProfileRequirementsCache.KEY_LENGTH for i in range(3)]
+    cache = ProfileRequirementsCache(cache_dir, max_bytes=None)
+    for key in keys[:2]:
+        clock[0] += 1
+        cache.store(key, requirements())
+    entry_bytes = max(entry['bytes'] for entry in cache.entries())
+    clock[0] += 1
+    assert cache.load(keys[0]) is not None
+    # Room for two entries: storing a third evicts the least recently used
+    cache.max_bytes = 2 * entry_bytes + entry_bytes // 2
+    clock[0] += 1
+    cache.store(keys[2], requirements())
+    assert [keys[2], keys[0]] == [entry['key'] for entry in cache.entries()]
+    # The entry just stored is kept even when it alone is over the limit
+    cache.max_bytes = 1
+    cache.store(keys[1], requirements())
+    assert [keys[1]] == [entry['key'] for entry in cache.entries()]
+    assert [] == cache.evict(max_bytes=entry_bytes * 2)
+    assert [keys[1]] == cache.evict(max_bytes=0)
+
+
+def test_profile_inputs_key_follows_input_contents(tmp_path):
+    paths = {}
+    for config_key in PipelineContext.PROFILE_INPUT_PATHS:
+        paths[config_key] = tmp_path / f'{config_key.lower()}.bin'
+        paths[config_key].write_bytes(config_key.encode())
+    config = {config_key: str(path) for config_key, path in paths.items()}
+    stock_sheet = pd.DataFrame([['', 'ROUND ROD'], ['', 'Round Rod 12mm']])
+    live_sheets = {PipelineContext.STOCK_SHEET_TITLE: stock_sheet}
+
+    def profile_key(config, live_sheets):
+        return PipelineContext(config, live_sheets).profile_inputs_key()
+
+    key = profile_key(config, live_sheets)
+    assert ProfileRequirementsCache.is_key(key)
+    assert key == profile_key(dict(config), dict(live_sheets))
+    changed_keys = set()
+    for config_key, path in paths.items():
+        original = path.read_bytes()
+        path.write_bytes(original + b'!')
+        changed_keys.add(profile_key(config, live_sheets))
+        path.write_bytes(original)
+    changed_stock = stock_sheet.copy()
+    changed_stock.iloc[1, 1] = 'Round Rod 14mm'
+    changed_keys.add(profile_key(config, {PipelineContext.STOCK_SHEET_TITLE: changed_stock}))
+    changed_keys.add(profile_key(
+        dict(config, HARDCODED_DATA_FILEPATH=str(tmp_path / 'missing.json')), live_sheets))
+    assert len(PipelineContext.PROFILE_INPUT_PATHS) + 2 == len(changed_keys - {key})
+    assert key == profile_key(config, live_sheets)
@@ -0,0 +1,58 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import remove_textures, remove_textures_cache_stats, remove_textures_series
+from utils.utils import _remove_textures_from_string
+
+GOLDEN_CORPUS_PATH = os.path.join(
+    os.path.dirname(__file__), 'fixtures', 'remove_textures_golden.json')
+
+
+@pytest.fixture(scope='module')
+def golden_corpus():
+    """
+    Item codes paired with the output of the original, uncompiled
+    remove_textures, which every implementation must reproduce
+    """
+    with open(GOLDEN_CORPUS_PATH) as json_file:
+        entries = json.load(json_file)
+    return [entry['item'] for entry in entries], [entry['expected'] for entry in entries]
+
+
+def test_remove_textures_matches_golden_corpus(golden_corpus):
+    items, expected = golden_corpus
+    assert [remove_textures(item) for item in items] == expected
+
+
+def test_remove_textures_series_matches_golden_corpus(golden_corpus):
+    items, expected = golden_corpus
+    items = pd.Series(items, index=np.arange(len(items)) * 3)
+    base_products = remove_textures_series(items)
+    assert base_products.index.equals(items.index)
+    assert base_products.tolist() == expected
+
+
+def test_missing_items_are_stringified():
+    assert ['nan', 'none'] == [remove_textures(np.nan), remove_textures(None)]
+    missing_items = pd.Series([np.nan, None], dtype=object)
+    assert ['nan', 'none'] == remove_textures_series(missing_items).tolist()
+
+
+def test_memoized_lookups_match_golden_corpus(golden_corpus):
+    items, expected = golden_corpus
+    _remove_textures_from_string.cache_clear()
+    first_pass = [remove_textures(item) for item in items]
+    after_first_pass = remove_textures_cache_stats()
+    second_pass = [remove_textures(item) for item in items]
+    after_second_pass = remove_textures_cache_stats()
+    assert first_pass == second_pass == expected
+    distinct_strings = len({str(item) for item in items})
+    assert after_first_pass['misses'] == distinct_strings
+    assert after_first_pass['size'] == distinct_strings
+    # Every lookup of the second pass is answered from the memo
+    assert after_second_pass['misses'] == distinct_strings
+    assert after_second_pass['hits'] - after_first_pass['hits'] == len(items)
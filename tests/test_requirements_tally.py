@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from inventory_calculation import BrassStockRequirementsSummary
+from tests.support import StubPipelineContext
+from tests.support.legacy_tally import GROUP_COLUMNS, build_tally_inputs, legacy_volume_totals
+
+
+def summary_volume_totals(items_df, requirement_frames):
+    brass_requirements = {
+        f'category_{i}': frame for i, frame in enumerate(requirement_frames)
+    }
+    summary = BrassStockRequirementsSummary(
+        {}, {}, StubPipelineContext(items_df, brass_requirements))
+    return summary.aggregated_results.astype({column: str for column in GROUP_COLUMNS})
+
+
+def non_zero_sorted(totals):
+    # The wide lines also carry empty families, which add up to nothing
+    totals = totals[totals['Volume'] != 0]
+    return totals.sort_values(GROUP_COLUMNS).reset_index(drop=True)
+
+
+def assert_matches_legacy(items_df, requirement_frames):
+    pd.testing.assert_frame_equal(
+        non_zero_sorted(summary_volume_totals(items_df, requirement_frames)),
+        non_zero_sorted(legacy_volume_totals(items_df, requirement_frames)),
+        check_exact=False, rtol=1e-12
+    )
+
+
+def requirement_frame(codes, first, second, volumes, volume_column='Cylinder_1_Volume',
+                      lookup_column='Circular_Area_1_Matched'):
+    return pd.DataFrame({
+        'ITEM': [code.upper() for code in codes],
+        'Generic_Product_Code': codes,
+        f'{lookup_column}_FirstCol': first,
+        f'{lookup_column}_SecondCol': second,
+        volume_column: volumes,
+    })
+
+
+def test_last_category_listing_a_product_wins():
+    items_df = pd.DataFrame({
+        'ITEM': ['dp1', 'dp1', 'dp2', 'dp3', 'dp4'],
+        'QTY': [2, 3, 1, 4, 5],
+    })
+    items_df['Generic_Product_Code'] = items_df['ITEM']
+    requirement_frames = [
+        requirement_frame(
+            ['dp1', 'dp2', 'dp3'], ['Round Rod'] * 3, ['10MM', '12MM', '10MM'],
+            [100.0, 200.0, 300.0]),
+        # dp1 moves to another stock, dp2 is cleared, dp4 appears twice
+        requirement_frame(
+            ['dp1', 'dp2', 'dp4', 'dp4'], ['Hex Rod', 0, 'Hex Rod', 'Hex Rod'],
+            ['12MM', 0, '10MM', '12MM'], [50.0, 0.0, 10.0, 20.0]),
+        # Another family of dp3 is added alongside its cylinder
+        requirement_frame(
+            ['dp3'], ['Brass Patti'], ['20X5'], [70.0],
+            volume_column='Cuboid_1_Volume', lookup_column='Rectangular_Area_1_Matched'),
+    ]
+    totals = non_zero_sorted(summary_volume_totals(items_df, requirement_frames))
+    expected = pd.DataFrame({
+        'Volume Family': ['Cuboid_1_Volume', 'Cylinder_1_Volume', 'Cylinder_1_Volume',
+                          'Cylinder_1_Volume'],
+        'FirstCol': ['Brass Patti', 'Hex Rod', 'Hex Rod', 'Round Rod'],
+        'SecondCol': ['20X5', '12MM', '12MM', '10MM'],
+        'Volume': [280.0, 250.0, 100.0, 1200.0],
+    })
+    expected = expected.groupby(GROUP_COLUMNS)['Volume'].sum().reset_index()
+    pd.testing.assert_frame_equal(totals, non_zero_sorted(expected))
+    assert_matches_legacy(items_df, requirement_frames)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_component_table_matches_legacy_tally(seed):
+    items_df, requirement_frames = build_tally_inputs(400, 60, seed)
+    assert_matches_legacy(items_df, requirement_frames)
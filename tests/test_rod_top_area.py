@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import calculate_rod_top_area, calculate_rod_top_areas
+
+ROD_SHAPES = ['Round Rod', 'Hex Rod', 'Square Rod', 'Brass Patti']
+DIMENSIONS = ['12.0mm dia', '8 MM', '5.5', 'HEX 10MM', 'no size', '', np.nan, None, 16]
+
+
+@pytest.mark.parametrize('shape', ROD_SHAPES)
+@pytest.mark.parametrize('dimension', DIMENSIONS)
+def test_scalar_matches_vectorized(shape, dimension):
+    expected = calculate_rod_top_areas(
+        pd.Series([shape]), pd.Series([dimension], dtype=object))[0]
+    np.testing.assert_allclose(calculate_rod_top_area(shape, dimension), expected, rtol=1e-15)
+
+
+@pytest.mark.parametrize('dimension', ['no size', '', np.nan, None])
+def test_dimension_without_number_gives_nan(dimension):
+    assert np.isnan(calculate_rod_top_area('Round Rod', dimension))
@@ -0,0 +1,99 @@
+import os
+
+import pandas as pd
+import pytest
+
+from data_processing import GoogleSheetsClient, SheetSnapshotCache
+from tests.support import FakeSpreadsheet
+
+SPREADSHEET_KEY = 'spreadsheet-key'
+
+
+def live_sheets():
+    # Sheet headers may be blank or repeated
+    orders = pd.DataFrame(
+        [['1001', 'DP1', ''], ['1002', 'AP2', '3']], columns=['P.O', 'ITEM', ''])
+    stock = pd.DataFrame([['', 'ROUND ROD'], ['', '12MM']], columns=['A', 'A'])
+    return {'ORDERS': orders, 'STOCK': stock}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SheetSnapshotCache(str(tmp_path / 'snapshots'), ttl_seconds=60)
+
+
+def assert_sheets_equal(loaded, expected):
+    assert list(loaded) == list(expected)
+    for title, sheet in expected.items():
+        pd.testing.assert_frame_equal(loaded[title], sheet)
+
+
+def test_snapshot_round_trips_and_counts_hits(cache):
+    assert cache.load(SPREADSHEET_KEY, ['ORDERS', 'STOCK'], 'r1') is None
+    assert {'hits': 0, 'misses': 2} == cache.stats()
+    cache.store(SPREADSHEET_KEY, live_sheets(), 'r1')
+    assert_sheets_equal(cache.load(SPREADSHEET_KEY, ['ORDERS', 'STOCK'], 'r1'), live_sheets())
+    assert_sheets_equal(
+        cache.load(SPREADSHEET_KEY, ['STOCK'], 'r1'), {'STOCK': live_sheets()['STOCK']})
+    assert {'hits': 3, 'misses': 2} == cache.stats()
+
+
+def test_new_revision_invalidates_snapshot(cache):
+    cache.store(SPREADSHEET_KEY, live_sheets(), 'r1')
+    assert cache.load(SPREADSHEET_KEY, ['ORDERS'], 'r2') is None
+    assert cache.load('other-spreadsheet', ['ORDERS'], 'r1') is None
+    assert {'hits': 0, 'misses': 2} == cache.stats()
+
+
+def test_snapshot_without_revision_expires_after_ttl(cache, monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr('data_processing.sheet_snapshot_cache.time.time', lambda: clock[0])
+    cache.store(SPREADSHEET_KEY, live_sheets())
+    clock[0] += cache.ttl_seconds - 1
+    assert cache.load(SPREADSHEET_KEY, ['ORDERS']) is not None
+    # A revision only decides freshness when the snapshot recorded one too
+    assert cache.load(SPREADSHEET_KEY, ['ORDERS'], 'r1') is not None
+    clock[0] += 2
+    assert cache.load(SPREADSHEET_KEY, ['ORDERS']) is None
+    assert {'hits': 2, 'misses': 1} == cache.stats()
+
+
+def test_missing_titles_and_partial_snapshots_miss(cache):
+    cache.store(SPREADSHEET_KEY, live_sheets(), 'r1')
+    assert cache.load(SPREADSHEET_KEY, ['ORDERS', 'UNKNOWN'], 'r1') is None
+    # Only a snapshot of the whole spreadsheet can answer for every sheet
+    assert cache.load(SPREADSHEET_KEY, None, 'r1') is None
+    cache.store(SPREADSHEET_KEY, live_sheets(), 'r1', all_sheets=True)
+    assert_sheets_equal(cache.load(SPREADSHEET_KEY, None, 'r1'), live_sheets())
+
+
+def test_unreadable_sheet_file_misses(cache):
+    cache.store(SPREADSHEET_KEY, live_sheets(), 'r1')
+    spreadsheet_dir = cache._spreadsheet_dir(SPREADSHEET_KEY)
+    sheet_path = os.path.join(spreadsheet_dir, cache._sheet_file_name('STOCK'))
+    with open(sheet_path, 'wb') as sheet_file:
+        sheet_file.write(b'not an arrow file')
+    assert cache.load(SPREADSHEET_KEY, ['ORDERS', 'STOCK'], 'r1') is None
+    assert {'hits': 0, 'misses': 2} == cache.stats()
+
+
+def test_client_fetches_only_when_spreadsheet_changes(cache):
+    sheets = {'ORDERS': [['P.O', 'ITEM'], ['1001', 'DP1']]}
+
+    def fetch(spreadsheet, refresh=False):
+        return GoogleSheetsClient(
+            {'GOOGLE_SHEETS_URL_KEY': SPREADSHEET_KEY}, sheet_titles=['ORDERS'],
+            spreadsheet=spreadsheet, snapshot_cache=cache, refresh=refresh).live_sheets
+
+    first = FakeSpreadsheet(sheets, revision='r1')
+    fetched = fetch(first)
+    assert 2 == first.calls  # the revision and the values
+    unchanged = FakeSpreadsheet(sheets, revision='r1')
+    assert_sheets_equal(fetch(unchanged), fetched)
+    assert 1 == unchanged.calls  # the revision only
+    refreshed = FakeSpreadsheet(sheets, revision='r1')
+    fetch(refreshed, refresh=True)
+    assert 2 == refreshed.calls
+    edited = FakeSpreadsheet({'ORDERS': [['P.O', 'ITEM'], ['1001', 'DP2']]}, revision='r2')
+    assert ['DP2'] == fetch(edited)['ORDERS']['ITEM'].tolist()
+    assert 2 == edited.calls
@@ -0,0 +1,92 @@
+import os
+
+import pandas as pd
+import pytest
+
+from data_processing import WorkbookSidecarCache
+
+
+@pytest.fixture
+def workbook_path(tmp_path):
+    path = str(tmp_path / 'materials.xlsx')
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({
+            'ITEM NAME': ['DP1', 'AP2', 'BTB3'],
+            'QTY': [1, 2, 3],
+            'MATERIALS SIZES(MM)': ['10 Dia', 12, '40 X 5'],
+        }).to_excel(writer, sheet_name='S1', index=False)
+        pd.DataFrame({
+            'ITEM NAME': ['TE4'],
+            'QTY': [4],
+            'MATERIALS SIZES(MM)': ['Scrap'],
+        }).to_excel(writer, sheet_name='S2', index=False)
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return WorkbookSidecarCache(str(tmp_path / 'sidecars'))
+
+
+@pytest.fixture
+def excel_reads(monkeypatch):
+    """Counts the workbooks openpyxl actually parses"""
+    reads = []
+    read_excel = pd.read_excel
+
+    def counting_read_excel(*args, **kwargs):
+        reads.append(args[0])
+        return read_excel(*args, **kwargs)
+
+    monkeypatch.setattr(pd, 'read_excel', counting_read_excel)
+    return reads
+
+
+@pytest.mark.parametrize('options', [
+    {}, {'all_sheets': True}, {'columns': ['ITEM NAME', 'MATERIALS SIZES(MM)']},
+])
+def test_sidecar_reads_like_excel_and_counts_hits(cache, workbook_path, excel_reads, options):
+    first = cache.read_workbook(workbook_path, **options)
+    second = cache.read_workbook(workbook_path, **options)
+    pd.testing.assert_frame_equal(second, first)
+    assert 1 == len(excel_reads)
+    assert {'hits': 1, 'misses': 1} == cache.stats()
+
+
+def test_sidecars_are_keyed_by_sheets_and_columns(cache, workbook_path, excel_reads):
+    assert 3 == len(cache.read_workbook(workbook_path))
+    assert 4 == len(cache.read_workbook(workbook_path, all_sheets=True))
+    assert ['QTY'] == list(cache.read_workbook(workbook_path, columns=['QTY']).columns)
+    assert 3 == len(excel_reads)
+    assert {'hits': 0, 'misses': 3} == cache.stats()
+
+
+def test_modified_time_invalidates_sidecar(cache, workbook_path, excel_reads):
+    cache.read_workbook(workbook_path)
+    stat = os.stat(workbook_path)
+    os.utime(workbook_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    cache.read_workbook(workbook_path)
+    assert 2 == len(excel_reads)
+    assert {'hits': 0, 'misses': 2} == cache.stats()
+
+
+def test_size_invalidates_sidecar(cache, workbook_path, excel_reads):
+    cache.read_workbook(workbook_path)
+    stat = os.stat(workbook_path)
+    pd.DataFrame({'ITEM NAME': ['KN5'], 'QTY': [5]}).to_excel(workbook_path, index=False)
+    # Same modified time, so only the size tells the workbooks apart
+    os.utime(workbook_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.stat(workbook_path).st_size != stat.st_size
+    assert ['KN5'] == cache.read_workbook(workbook_path)['ITEM NAME'].tolist()
+    assert {'hits': 0, 'misses': 2} == cache.stats()
+
+
+def test_unreadable_sidecar_is_rebuilt(cache, workbook_path, excel_reads):
+    expected = cache.read_workbook(workbook_path)
+    for file_name in os.listdir(cache.cache_dir):
+        with open(os.path.join(cache.cache_dir, file_name), 'wb') as sidecar_file:
+            sidecar_file.write(b'not a feather file')
+    pd.testing.assert_frame_equal(cache.read_workbook(workbook_path), expected)
+    pd.testing.assert_frame_equal(cache.read_workbook(workbook_path), expected)
+    assert 2 == len(excel_reads)
+    assert {'hits': 1, 'misses': 2} == cache.stats()
@@ -1,5 +1,7 @@
 from .utils import (
-    remove_textures, combine_products_creation_information,
-    calculate_rod_top_area, get_column_by_keyword, calculate_volume_from_weight,
-    convert_inches_to_mm, compute_volume,
+    remove_textures, remove_textures_series, remove_textures_cache_stats,
+    combine_products_creation_information,
+    calculate_rod_top_area, calculate_rod_top_areas, get_column_by_keyword, calculate_volume_from_weight,
+    convert_inches_to_mm, compute_volume, with_columns,
 )
+from .instrumentation import Instrumentation, count_rows, instrumentation
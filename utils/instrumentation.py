@@ -0,0 +1,219 @@
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+
+def count_rows(value: Any) -> Optional[int]:
+    """
+    Counts the rows of a DataFrame, or of every DataFrame held in a
+    dict, list or tuple. Returns None when there is nothing to count
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (list, tuple)):
+        counts = [count_rows(item) for item in value]
+        counts = [count for count in counts if count is not None]
+        return sum(counts) if counts else None
+    return None
+
+
+class StageRecord:
+    """Measurements of one run of an instrumented stage"""
+    def __init__(self, stage: str, depth: int, rows_in: Optional[int]) -> None:
+        self.stage = stage
+        self.depth = depth
+        self.rows_in = rows_in
+        self.rows_out: Optional[int] = None
+        self.seconds: Optional[float] = None
+        self.peak_memory_bytes: Optional[int] = None
+        self._start_time = 0.0
+        self._start_memory = 0
+        self._peak_memory = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'stage': self.stage,
+            'depth': self.depth,
+            'seconds': self.seconds,
+            'peak_memory_mb': None if self.peak_memory_bytes is None
+            else round(self.peak_memory_bytes / 2 ** 20, 3),
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+        }
+
+
+class _DisabledStage:
+    """Stands in for a stage while instrumentation is off"""
+    __slots__ = ()
+
+    @property
+    def rows_out(self):
+        return None
+
+    @rows_out.setter
+    def rows_out(self, value):
+        # Outputs are not kept alive while instrumentation is off
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class _Stage:
+    def __init__(self, instrumentation: 'Instrumentation', record: StageRecord) -> None:
+        self.instrumentation = instrumentation
+        self.record = record
+
+    def __enter__(self) -> StageRecord:
+        self.instrumentation._start(self.record)
+        return self.record
+
+    def __exit__(self, *exc_info):
+        self.instrumentation._finish(self.record)
+        return False
+
+
+class Instrumentation:
+    """
+    Records wall time, peak traced memory and row counts of pipeline stages.
+
+    Stages can nest; the peak memory of a stage includes its inner stages.
+    Nesting is tracked per thread, so stages running concurrently are
+    recorded side by side. While disabled, stages cost a single attribute check
+    """
+    _DISABLED_STAGE = _DisabledStage()
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.trace_memory = False
+        self.records: List[StageRecord] = []
+        self._local = threading.local()
+        self._started_tracemalloc = False
+
+    @property
+    def _open_records(self) -> List[StageRecord]:
+        """The stages open in the calling thread, innermost last"""
+        if not hasattr(self._local, 'open_records'):
+            self._local.open_records = []
+        return self._local.open_records
+
+    def enable(self, trace_memory: bool = True) -> None:
+        self.enabled = True
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def disable(self) -> None:
+        self.enabled = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def reset(self) -> None:
+        self.records = []
+        self._local = threading.local()
+
+    def stage(self, name: str, rows_in: Any = None):
+        """
+        Context manager measuring the block it wraps. The yielded record's
+        'rows_out' can be set to the block's output, or its row count
+        """
+        if not self.enabled:
+            return self._DISABLED_STAGE
+        return _Stage(self, StageRecord(name, len(self._open_records), count_rows(rows_in)))
+
+    def _start(self, record: StageRecord) -> None:
+        self.records.append(record)
+        if self.trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if self._open_records:
+                parent = self._open_records[-1]
+                parent._peak_memory = max(parent._peak_memory, peak)
+            tracemalloc.reset_peak()
+            record._start_memory = record._peak_memory = current
+        self._open_records.append(record)
+        record._start_time = time.perf_counter()
+
+    def _finish(self, record: StageRecord) -> None:
+        record.seconds = round(time.perf_counter() - record._start_time, 6)
+        self._open_records.remove(record)
+        if self.trace_memory and tracemalloc.is_tracing():
+            record._peak_memory = max(
+                record._peak_memory, tracemalloc.get_traced_memory()[1])
+            record.peak_memory_bytes = record._peak_memory - record._start_memory
+            if self._open_records:
+                parent = self._open_records[-1]
+                parent._peak_memory = max(parent._peak_memory, record._peak_memory)
+        if not isinstance(record.rows_out, int):
+            record.rows_out = count_rows(record.rows_out)
+
+    def instrumented(
+        self, name: str, rows_in: Callable[..., Any] = None,
+        rows_out: Callable[..., Any] = None
+    ) -> Callable:
+        """
+        Decorator measuring every call of a function as a stage
+
+        Parameters:
+        - name (str): Name of the stage
+        - rows_in (Callable): Picks the input to count from the call's
+        arguments. By default the DataFrames among the arguments are counted
+        - rows_out (Callable): Picks the output to count from the result
+        and the call's arguments. By default the result is counted
+        """
+        def decorator(function: Callable) -> Callable:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                inputs = rows_in(*args, **kwargs) if rows_in is not None else [
+                    value for value in list(args) + list(kwargs.values())
+                    if isinstance(value, (pd.DataFrame, dict))
+                ]
+                with self.stage(name, inputs) as record:
+                    result = function(*args, **kwargs)
+                    record.rows_out = rows_out(result, *args, **kwargs) \
+                        if rows_out is not None else result
+                return result
+            return wrapper
+        return decorator
+
+    def report(self) -> List[Dict[str, Any]]:
+        return [record.to_dict() for record in self.records]
+
+    def write_jsonl(self, file_path: str) -> None:
+        """Appends one JSON line per recorded stage"""
+        with open(file_path, 'a') as jsonl_file:
+            for record in self.report():
+                jsonl_file.write(json.dumps(record) + '\n')
+
+    def summary_table(self) -> str:
+        """
+        Formats the records as a table, with inner stages indented
+        under the stage that ran them
+        """
+        header = f"{'Stage':<48}{'Seconds':>10}{'Peak MB':>10}{'Rows in':>10}{'Rows out':>10}"
+        lines = [header, '-' * len(header)]
+        for record in self.report():
+            stage = ('  ' * record['depth'] + record['stage'])[:47]
+            peak = '' if record['peak_memory_mb'] is None else f"{record['peak_memory_mb']:.2f}"
+            seconds = '' if record['seconds'] is None else f"{record['seconds']:.3f}"
+            rows_in = '' if record['rows_in'] is None else str(record['rows_in'])
+            rows_out = '' if record['rows_out'] is None else str(record['rows_out'])
+            lines.append(f'{stage:<48}{seconds:>10}{peak:>10}{rows_in:>10}{rows_out:>10}')
+        return '\n'.join(lines)
+
+
+# Shared by every instrumented stage of the pipeline
+instrumentation = Instrumentation()
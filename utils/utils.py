@@ -1,9 +1,32 @@
 import re
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Dict, Optional
 
 import numpy as np
 import pandas as pd
 
+def with_columns(df: pd.DataFrame, columns: Dict[str, Any]) -> pd.DataFrame:
+    """
+    A new DataFrame holding the columns of 'df' plus 'columns', which are
+    added or replace the columns of the same name. The other columns are
+    shared with 'df' rather than copied, with or without copy-on-write, and
+    'df' itself is left untouched.
+
+    Whole columns of the result may be replaced, but without copy-on-write
+    the shared columns must not be written in place (e.g. with .loc)
+
+    Parameters:
+    - df (pd.DataFrame): The frame to extend
+    - columns (Dict[str, Any]): New column values keyed by column name
+
+    Returns:
+    - pd.DataFrame: The extended frame
+    """
+    result = df.copy(deep=False)
+    for column, values in columns.items():
+        result[column] = values
+    return result
+
 def convert_inches_to_mm(value_in_inches):
     """
     Converts a value from inches to millimeters
@@ -12,12 +35,22 @@ def convert_inches_to_mm(value_in_inches):
 
 def calculate_volume_from_weight(weight_in_kg, density=8.5):
     """
-    Calculates the volume of an item using its weight
+    Calculates the volume of an item using its weight. Takes a single
+    weight, or an array, list or Series of weights converted all at once
     """
+    if isinstance(weight_in_kg, (list, tuple)):
+        weight_in_kg = np.asarray(weight_in_kg, dtype=float)
     weight_in_grams = weight_in_kg * 1000
     volume_in_cubic_cm = weight_in_grams/ density
     return volume_in_cubic_cm
 
+# Texture suffixes are project specific
+TEXTURES = 'LH|RH|KH|RT|H|K|B|R|T|HR|HL|ES|S|RR|RL|HO|HI|HA|NL|L'
+# 'LH' or 'RH' at the end of each string
+HAND_SUFFIX_PATTERN = re.compile(r'(LH|RH)$', re.IGNORECASE)
+# Textures that follow the numeric part in a string
+TEXTURE_PATTERN = re.compile(rf'(\d+)({TEXTURES})(?=\.\d+|$)', re.IGNORECASE)
+
 def remove_textures(product):
     """
     Removes anything categorized as a texture from a product
@@ -28,18 +61,51 @@ def remove_textures(product):
     Returns:
     - base product: The base category or parent product without textures
     """
-    string = str(product).replace('\'\'', '"').replace('-','')
-    # Remove 'LH' or 'RH' at the end of each string
-    # This rule is project specific
-    string = re.sub(r'(LH|RH)$', '', string, flags=re.IGNORECASE)
-    # identify the textures in products
-    textures = 'LH|RH|KH|RT|H|K|B|R|T|HR|HL|ES|S|RR|RL|HO|HI|HA|NL|L'
-    pattern = re.compile(f'(\d+)({textures})(?=\.\d+|$)', re.IGNORECASE)
-    # Find all textures that follow the numeric part in a string
+    return _remove_textures_from_string(str(product))
+
+@lru_cache(maxsize=65536)
+def _remove_textures_from_string(string):
+    string = string.replace('\'\'', '"').replace('-','')
+    string = HAND_SUFFIX_PATTERN.sub('', string)
     # Keep only the numeric part
-    string = pattern.sub(r'\1', string)
+    string = TEXTURE_PATTERN.sub(r'\1', string)
     return string.lower()
 
+def remove_textures_cache_stats():
+    """
+    Reports how often remove_textures was answered from its memo
+    """
+    info = _remove_textures_from_string.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits, 'misses': info.misses,
+        'hit_rate': info.hits / lookups if lookups else 0.0,
+        'size': info.currsize, 'max_size': info.maxsize,
+    }
+
+def remove_textures_series(products: pd.Series) -> pd.Series:
+    """
+    Vectorized remove_textures for a whole column of products.
+    Each distinct product is only processed once
+
+    Parameters:
+    - products (pd.Series): the products or skews to be processed
+
+    Returns:
+    - pd.Series: base products aligned with the input index
+    """
+    codes, uniques = pd.factorize(products.astype(str))
+    base_products = (
+        pd.Series(uniques, dtype=object)
+        .str.replace('\'\'', '"', regex=False)
+        .str.replace('-', '', regex=False)
+        .str.replace(HAND_SUFFIX_PATTERN, '', regex=True)
+        .str.replace(TEXTURE_PATTERN, r'\1', regex=True)
+        .str.lower()
+    )
+    return pd.Series(
+        base_products.to_numpy()[codes], index=products.index, dtype=object)
+
 def get_column_by_keyword(df, keyword):
     """
     Identifies the first column in the DataFrame that contains a given keyword.
@@ -57,17 +123,70 @@ def get_column_by_keyword(df, keyword):
         print(f'No {keyword} column found')
         return None
 
+# The top area of each rod shape from the number in its dimension
+ROD_TOP_AREAS = {
+    'Round Rod': lambda size: np.pi*((size/2)**2),
+    'Hex Rod': lambda size: (3*np.sqrt(3)//2)*(size**2),
+    'Square Rod': lambda size: size**2,
+}
+ROD_SIZE_PATTERN = re.compile(r'(\d+\.?\d*)')
+
 def calculate_rod_top_area(shape, dimension):
-    #Extract the numeric part of the string
-    numeric_part = float(re.findall(r'\d+\.?\d*', dimension)[0])
-    if 'Round Rod' == shape:
-        radius = numeric_part/2
-        top_area = np.pi*(radius**2)
-    elif 'Hex Rod' == shape:
-        top_area = (3*np.sqrt(3)//2)*(numeric_part**2)
-    elif 'Square Rod' == shape:
-        top_area = numeric_part**2
-    return top_area
+    """
+    Calculates the top area of a rod from its shape and dimension
+
+    Returns:
+    - float: The top area, or NaN when there is no formula for the shape
+    or the dimension holds no number
+    """
+    rod_top_area = ROD_TOP_AREAS.get(shape)
+    if rod_top_area is None:
+        print(f'No top area formula for rod shape {shape}')
+        return np.nan
+    #Extract the numeric part of the string, missing dimensions included
+    size_match = ROD_SIZE_PATTERN.search(str(dimension))
+    if size_match is None:
+        return np.nan
+    return rod_top_area(float(size_match.group(1)))
+
+def calculate_rod_top_areas(shapes: pd.Series, dimensions: pd.Series) -> np.ndarray:
+    """
+    Vectorized calculate_rod_top_area for a whole column of rods. The
+    formula is picked once per stock type category, and applied to every
+    rod of that category at once
+
+    Parameters:
+    - shapes (pd.Series): The stock type of each rod
+    - dimensions (pd.Series): The dimension of each rod, e.g. '12.0mm dia'
+
+    Returns:
+    - np.ndarray: The top area of each rod, NaN for rods of a shape with
+    no formula or whose dimension holds no number
+    """
+    shapes = shapes.astype('category')
+    shape_codes = shapes.cat.codes.to_numpy()
+    sizes = (
+        pd.Series(dimensions.to_numpy(), dtype=object).astype(str)
+        .str.extract(ROD_SIZE_PATTERN, expand=False).astype(float).to_numpy()
+    )
+    top_areas = np.full(len(sizes), np.nan)
+    unrecognized_shapes = []
+    for code, shape in enumerate(shapes.cat.categories):
+        is_shape = shape_codes == code
+        if not is_shape.any():
+            continue
+        rod_top_area = ROD_TOP_AREAS.get(shape)
+        if rod_top_area is None:
+            unrecognized_shapes.append(shape)
+            continue
+        top_areas[is_shape] = rod_top_area(sizes[is_shape])
+    if (shape_codes == -1).any():
+        unrecognized_shapes.append('missing')
+    if unrecognized_shapes:
+        print(f'No top area formula for rod shapes: {unrecognized_shapes}')
+    if np.isnan(sizes).any():
+        print(f'No size found in {int(np.isnan(sizes).sum())} rod dimensions')
+    return top_areas
 
 def combine_products_creation_information(
     regular_items_df: pd.DataFrame, items_on_order_df: pd.DataFrame
@@ -99,8 +218,10 @@ def combine_products_creation_information(
     items_on_order_df_renamed = items_on_order_df.rename(columns=rename_dictionary)
     columns_to_keep = [item_column_reg, 'WORK METHOD', 'MATERIALS SIZES(MM)']
     orders_df_relevant_columns = items_on_order_df_renamed[columns_to_keep]
-    # Concatenate the DataFrames
-    concatenated_df = pd.concat([regular_items_df, orders_df_relevant_columns])
+    # Concatenate the DataFrames; both number their rows from 0, so the
+    # rows are renumbered to keep one row per index label downstream
+    concatenated_df = pd.concat(
+        [regular_items_df, orders_df_relevant_columns], ignore_index=True)
     return concatenated_df
 
 def compute_volume(
@@ -108,16 +229,16 @@ def compute_volume(
 ) -> pd.DataFrame:
     
     """Helper function to calculate volume if area and height columns are present."""
-    df_copy = df.copy()
     # Ensure the area and height columns are numeric, convert non-numeric to NaN
-    df_copy[area_column] = pd.to_numeric(df_copy[area_column], errors='coerce')
-    df_copy[height_column] = pd.to_numeric(df_copy[height_column], errors='coerce')
+    areas = pd.to_numeric(df[area_column], errors='coerce')
+    heights = pd.to_numeric(df[height_column], errors='coerce')
 
     # Calculate volume only where both area and height columns have numeric values
-    mask = df_copy[area_column].notna() & df_copy[height_column].notna()
-    df_copy.loc[mask, volume_column] = df_copy.loc[mask, area_column] * df_copy.loc[mask, height_column]
-
-    return df_copy
+    volumes = areas * heights
+    if volume_column in df.columns:
+        volumes = volumes.where(areas.notna() & heights.notna(), df[volume_column])
+    return with_columns(df, {
+        area_column: areas, height_column: heights, volume_column: volumes})
 
         
         
\ No newline at end of file